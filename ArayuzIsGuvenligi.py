@@ -1,233 +1,177 @@
+from startup import PROFILE  # Açılış profilinin sıfır noktası; ilk içe aktarma olmalı
 import sys
-import cv2
-from ultralytics import YOLO
+import argparse
 import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QLabel, QVBoxLayout, 
-                             QWidget, QPushButton, QHBoxLayout, QTextEdit, 
+                             QWidget, QPushButton, QHBoxLayout, 
                              QFileDialog, QProgressBar)
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QObject,pyqtSlot
-from PyQt6.QtGui import QImage, QPixmap
-import logging
-# --- AYARLAR ---
-# Modellerin yolları
-MODEL_HELMET_PATH = 'best.pt'
-MODEL_PERSON_PATH = 'yolov8n.pt'
-
-# Güven eşikleri
-HELMET_GUVEN_ESIGI = 0.80 
-PERSON_GUVEN_ESIGI = 0.25 
-
-# Uyarı Süresi
-UYARI_SURESI = 10  # saniye
+from PyQt6.QtCore import QThread, pyqtSignal, Qt, QObject,pyqtSlot, QTimer
+from PyQt6.QtGui import QPixmap
 
-log_format = "%(asctime)s [%(levelname)s] - %(message)s"
-formatter = logging.Formatter(log_format)
+from capture import LatestFrameCapture
+from display import FrameDisplayPool, LatestFrameSlot
+from drawing import draw_detections
+from live_config import CONFIG_FILE, DEFAULTS, ConfigApplier, ConfigWatcher, camera_config
+from log_view import LogView
+from logging_setup import log_event, setup_logging
+from model_pool import ModelPool
+from motion import MotionGate
+from violations import ViolationTracker
 
-# Dosya yöneticisini (handler) oluştur
-file_handler = logging.FileHandler("is_guvenligi.log", mode='a', encoding='utf-8')
-file_handler.setFormatter(formatter)
+PROFILE.mark("arayüz modülleri içe aktarıldı")
 
-# Kök (root) logger'ı al
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-if logger.hasHandlers():
-    logger.handlers.clear()
-    
-# Sadece bizim dosya handler'ımızı ekle
-logger.addHandler(file_handler)
+# --- AYARLAR ---
+# Model yolları, güven eşikleri, uyarı süresi ve omuz bandı live_config.CONFIG_FILE'dan okunur;
+# dosyada verilmeyenler için tüm ön uçların ortak sabitleri (live_config.DEFAULTS) kullanılır.
+# Dosya çalışırken değiştirilirse yeni ayarlar yeniden başlatmadan uygulanır
+CAMERA_ID = "cam0"  # Yapılandırma dosyasında bu kaynağın kamera adı
+
+# Kaynağın her N karesinin biri işlenir; atlanan kareler çözülmeden geçilir
+# (ör. 25 fps arşivi 5 fps denetlemek için 5). İhlal süreleri video zamanıyla ölçülür
+FRAME_STRIDE = 1
+
+# Baret modeli her N karede bir çalışır; ara karelerde baretler kişi takibiyle taşınır
+HELMET_STRIDE = 1
+
+# 'full': baret modeli tüm karede, 'crop': sadece kişilerin baş bölgesi kırpıntılarında,
+# 'tiled': 4K kameralarda kare örtüşen karolara bölünerek tam çözünürlükte çalışır
+HELMET_MODE = 'full'
+HELMET_CROP_IMGSZ = 160
+HELMET_TILE_SIZE = 640
+HELMET_TILE_OVERLAP = 0.2
+HELMET_TILE_PERSONS_ONLY = False  # True: sadece kişilerin baş bölgesine değen karolar çalışır
+
+# False: baretler kare başına tespit edilir (ikinci takipçi çalışmaz), baretin kimliği
+# atandığı kişinin takip ID'sidir
+HELMET_TRACKING = True
+
+# Çıkarım arka ucu: 'auto' (ilk açılışta kurulu arka uçlar ölçülür ve en hızlısı
+# kaydedilir), 'pytorch', 'onnx', 'openvino' veya 'openvino-int8' (quantize.py ile üretilir)
+INFERENCE_BACKEND = 'auto'
+
+# Hareket kapısı: sahne değişmeyen karelerde modeller çalışmaz, son sonuçlar kullanılır
+MOTION_GATE = False
+MOTION_MAX_SKIP = 15  # Hareketsiz sahnede en fazla bu kadar kare üst üste atlanır
+
+# Görüntü ve sayaçların arayüzde yenilenme hızı (Hz); çıkarım bu hızla sınırlanmaz
+DISPLAY_REFRESH_HZ = 15
+
+# Log dosyası boyut/süre dolunca döndürülür, eskiler .gz olarak saklanır;
+# dosyaya yazma arka plan iş parçacığında yapılır
+LOG_FILE = "is_guvenligi.log"
+LOG_VIEW_MAX_LINES = 2000  # Log kutusunda tutulan en fazla satır
 # --- / LOGLAMA AYARI ---
 
 
-
-
-# Renkler (BGR formatında)
-RENKLER = {
-    'takan': (0, 255, 0),     # Yeşil
-    'takmayan': (0, 0, 255),   # Kırmızı
-    'unassigned': (128, 128, 128) # Gri
-}
-
-# --- YARDIMCI FONKSİYONLAR ---
-# Bu fonksiyonlar değişmeden kalıyor
-def get_bbox_center(bbox):
-    x1, y1, x2, y2 = bbox
-    cx = int((x1 + x2) / 2)
-    cy = int((y1 + y2) / 2)
-    return cx, cy
-
-def is_on_shoulders(head_or_helmet_bbox, person_bbox, top_percentage=0.3):
-    h_cx, h_cy = get_bbox_center(head_or_helmet_bbox)
-    p_x1, p_y1, p_x2, p_y2 = person_bbox
-    is_horizontally_aligned = (p_x1 < h_cx < p_x2)
-    person_height = p_y2 - p_y1
-    shoulder_level = p_y1 + (person_height * top_percentage)
-    is_vertically_aligned = (p_y1 < h_cy < shoulder_level)
-    return is_horizontally_aligned and is_vertically_aligned
-# --- / YARDIMCI FONKSİYONLAR ---
-
-
 # --- VİDEO İŞ PARÇACIĞI (WORKER THREAD) ---
 # Tüm ağır video işleme yükü bu sınıfta
 class VideoThread(QThread):
     # Arayüzü güncellemek için Sinyaller
-    change_pixmap_signal = pyqtSignal(QImage)
-    update_counts_signal = pyqtSignal(int, int) # (takan, takmayan)
-    alert_signal = pyqtSignal(str) # Terminal uyarısı için
+    alert_signal = pyqtSignal(str, str) # (mesaj, seviye): "INFO", "WARNING", "ERROR"...
     finished_signal = pyqtSignal() # İşlem bittiğinde
 
-    def __init__(self, source):
+    def __init__(self, source, pool, frame_slot):
         super().__init__()
         self.source = source
+        self.pool = pool
+        self.frame_slot = frame_slot  # Kare ve sayaçlar buraya yazılır, arayüz zamanlayıcıyla çeker
         self._running = True
-        self.ihlal_takip_listesi = {}
-        self.HELMET_CLASS_ID = None
-
-    def load_models(self):
+        self.violations = ViolationTracker(DEFAULTS['warn_after'])
+        # Yapılandırma değişiklikleri döngüde karelerin arasında uygulanır
+        self.config = ConfigApplier(pool, log=self.alert_signal.emit)
+
+    def acquire_pipeline(self):
+        # Modeller açılışta havuza bir kez yüklenir; yeni kaynakta sadece takip durumu sıfırlanır
+        if not self.pool.ready:
+            self.alert_signal.emit("Modeller hâlâ yükleniyor, bekleniyor...", "INFO")
         try:
-            self.alert_signal.emit(f"Kişi modeli ({MODEL_PERSON_PATH}) yükleniyor...")
-            self.model_person = YOLO(MODEL_PERSON_PATH)
-            
-            self.alert_signal.emit(f"Özel baret modeli ({MODEL_HELMET_PATH}) yükleniyor...")
-            self.model_helmet = YOLO(MODEL_HELMET_PATH)
-            
-            helmet_names = self.model_helmet.names
-            for class_id, name in helmet_names.items():
-                if name == 'helmet':
-                    self.HELMET_CLASS_ID = class_id
-                    break
-            
-            if self.HELMET_CLASS_ID is None:
-                self.alert_signal.emit(f"[HATA] Özel modelde 'helmet' sınıfı bulunamadı. Bulunanlar: {helmet_names}")
-                return False
-            
-            self.alert_signal.emit(f"'helmet' ID {self.HELMET_CLASS_ID} olarak bulundu. Kişi ID 0.")
+            self.pipeline = self.pool.acquire()
             return True
         except Exception as e:
-            self.alert_signal.emit(f"[HATA] Modeller yüklenemedi: {e}")
+            self.alert_signal.emit(f"[HATA] Modeller yüklenemedi: {e}", "ERROR")
             return False
 
     def run(self):
-        if not self.load_models():
+        if not self.acquire_pipeline():
             self.finished_signal.emit()
             return # Modeller yüklenemezse thread'i durdur
 
-        # Kaynağı aç
-        if self.source.isdigit():
-            cap = cv2.VideoCapture(int(self.source))
-        else:
-            cap = cv2.VideoCapture(self.source)
+        # Kaynağı aç (okuma ayrı iş parçacığında; canlı kaynakta eski kareler atılır,
+        # FRAME_STRIDE ile atlanan kareler çözülmez, kopan canlı kaynağa modeller
+        # kapatılmadan yeniden bağlanılır)
+        cap = LatestFrameCapture(self.source, stride=FRAME_STRIDE, on_status=self.alert_signal.emit)
 
         if not cap.isOpened():
-            self.alert_signal.emit(f"[HATA] Kaynak açılamadı: {self.source}")
+            self.alert_signal.emit(f"[HATA] Kaynak açılamadı: {self.source}", "ERROR")
+            cap.release()
             self.finished_signal.emit()
             return
+        cap.start()
             
-        self.alert_signal.emit(f"İşlem başlatıldı: {self.source}")
+        self.alert_signal.emit(f"İşlem başlatıldı: {self.source}", "INFO")
+        # Dosyadaki güncel ayarlar hemen, sonraki değişiklikler yeniden başlatmadan uygulanır
+        watcher = ConfigWatcher(CAMERA_ID, DEFAULTS, self.config.on_change, path=CONFIG_FILE,
+                                log=self.alert_signal.emit)
+        self.config.request(watcher.config)
+        watcher.start()
+        # İhlal süreleri işleme hızıyla değil karelerin video zamanıyla ölçülür
+        session_start = time.time()
 
         while self._running:
-            success, frame = cap.read()
+            if self.config.pending:
+                self.config.apply(self.pipeline, self.violations)
+            success, frame = cap.read(timeout=1.0)
             if not success:
-                self.alert_signal.emit("Video akışı sonlandı.")
-                break # Video bitti veya kamera kapandı
-            
-            # --- Burası önceki kodumuzdaki 'while' döngüsü ile aynı ---
+                if not cap.ended:
+                    continue # Kaynağa yeniden bağlanılıyor
+                self.alert_signal.emit("Video akışı sonlandı.", "INFO")
+                break # Video bitti veya durduruldu
             
-            # 1. Modelleri çalıştır
-            results_person = self.model_person.track(frame, persist=True, classes=[0], 
-                                                     conf=PERSON_GUVEN_ESIGI, verbose=False)
-            results_helmet = self.model_helmet.track(frame, persist=True, classes=[self.HELMET_CLASS_ID], 
-                                                     conf=HELMET_GUVEN_ESIGI, verbose=False)
-            
-            # 2. Tespitleri listele
-            persons = []
-            helmets = []
-            if results_person[0].boxes:
-                for box in results_person[0].boxes:
-                    if box.id is not None:
-                        persons.append({'id': int(box.id[0]), 'bbox': list(map(int, box.xyxy[0]))})
-
-            if results_helmet[0].boxes:
-                for box in results_helmet[0].boxes:
-                    if box.id is not None:
-                        helmets.append({'id': int(box.id[0]), 'bbox': list(map(int, box.xyxy[0]))})
-            
-            # 3. Kişi merkezli mantık
-            baret_takan_sayisi = 0
-            baret_takmayan_sayisi = 0
-            current_frame_person_ids_no_helmet = set()
-            drawn_helmet_ids = set()
-
-            for person in persons:
-                person_id = person['id']
-                person_bbox = person['bbox']
-                status = "takmayan"
-                matched_helmet_bbox = None
-
-                for helmet in helmets:
-                    if is_on_shoulders(helmet['bbox'], person_bbox):
-                        status = "takan"
-                        matched_helmet_bbox = helmet['bbox']
-                        drawn_helmet_ids.add(helmet['id'])
-                        break
-                
-                if status == "takan":
-                    baret_takan_sayisi += 1
-                    label = f"ID {person_id}: BARET TAKIYOR"
-                    cv2.rectangle(frame, (matched_helmet_bbox[0], matched_helmet_bbox[1]), (matched_helmet_bbox[2], matched_helmet_bbox[3]), RENKLER['takan'], 2)
-                    cv2.putText(frame, label, (matched_helmet_bbox[0], matched_helmet_bbox[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, RENKLER['takan'], 2)
-                else:
-                    baret_takmayan_sayisi += 1
-                    current_frame_person_ids_no_helmet.add(person_id)
-                    label = f"ID {person_id}: BARET YOK"
-                    cv2.rectangle(frame, (person_bbox[0], person_bbox[1]), (person_bbox[2], person_bbox[3]), RENKLER['takmayan'], 2)
-                    cv2.putText(frame, label, (person_bbox[0], person_bbox[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, RENKLER['takmayan'], 2)
-
-                    if person_id not in self.ihlal_takip_listesi:
-                        self.ihlal_takip_listesi[person_id] = {'start_time': time.time(), 'warned': False}
-                    else:
-                        data = self.ihlal_takip_listesi[person_id]
-                        gecen_sure = time.time() - data['start_time']
-                        
-                        if gecen_sure > UYARI_SURESI and not data['warned']:
-                            # Terminale/Log kutusuna UYARI SİNYALİ gönder
-                            self.alert_signal.emit(f"[UYARI] {time.strftime('%H:%M:%S')} - KISI ID {person_id} {UYARI_SURESI} saniyedir baret takmiyor!")
-                            data['warned'] = True
-            
-            # 4. İhlal listesi temizliği
-            for person_id in list(self.ihlal_takip_listesi.keys()):
-                if person_id not in current_frame_person_ids_no_helmet:
-                    if self.ihlal_takip_listesi[person_id]['warned']:
-                        self.alert_signal.emit(f"[BİLGİ] KISI ID {person_id} icin ihlal durumu sona erdi.")
-                    del self.ihlal_takip_listesi[person_id]
-            
-            # 5. İlişkisiz baretleri çiz
-            for helmet in helmets:
-                if helmet['id'] not in drawn_helmet_ids:
-                    bbox = helmet['bbox']
-                    label = f"ID {helmet['id']}: Iliskisiz Baret"
-                    cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), RENKLER['unassigned'], 2)
-                    cv2.putText(frame, label, (bbox[0], bbox[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, RENKLER['unassigned'], 2)
-            
-            # --- / Döngü Sonu ---
-
-            # Sinyalleri arayüze gönder
-            self.update_counts_signal.emit(baret_takan_sayisi, baret_takmayan_sayisi)
-            
-            # OpenCV (BGR) görüntüsünü QImage (RGB) formatına dönüştür
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            convert_to_qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            p = convert_to_qt_format.scaled(640, 480, Qt.AspectRatioMode.KeepAspectRatio)
-            self.change_pixmap_signal.emit(p)
+            # 1-2. Modelleri ortak ön işlemeyle çalıştır, tespitleri dizilere aktar ve ilişkilendir
+            det = self.pipeline.detect(frame)
+            no_helmet = det.person_helmet < 0
+            baret_takmayan_sayisi = int(no_helmet.sum())
+            baret_takan_sayisi = len(det.person_ids) - baret_takmayan_sayisi
+
+            # 3. Kişi ID'si bazlı ihlal zamanlayıcısı (video zamanıyla)
+            warned, resolved = self.violations.update(det.person_ids[no_helmet].tolist(),
+                                                      now=session_start + cap.timestamp)
+            for person_id in warned:
+                # Terminale/Log kutusuna UYARI SİNYALİ gönder
+                self.alert_signal.emit(f"[UYARI] {time.strftime('%H:%M:%S')} - KISI ID {person_id} {self.violations.warn_after:g} saniyedir baret takmiyor!", "WARNING")
+            for person_id in resolved:
+                self.alert_signal.emit(f"[BİLGİ] KISI ID {person_id} icin ihlal durumu sona erdi.", "INFO")
+
+            # 4. Kişileri, baretleri ve ilişkisiz baretleri çiz
+            draw_detections(frame, det, safe_text="BARET TAKIYOR", unsafe_text="BARET YOK",
+                            thickness=2, font_scale=0.7, label_unassigned=True)
+
+            # Kare etiket boyutuna burada bir kez küçültülür; QImage havuz tamponunu BGR olarak sarar.
+            # Sayaçlarla birlikte son-değer yuvasına yazılır, arayüz DISPLAY_REFRESH_HZ hızında çeker
+            display_frame = self.frame_slot.display_pool.render(frame)
+            self.frame_slot.publish(display_frame, (baret_takan_sayisi, baret_takmayan_sayisi))
 
         # Döngü bittiğinde kaynakları serbest bırak
+        if cap.frames_dropped:
+            self.alert_signal.emit(f"[BİLGİ] Atlanan kare: {cap.frames_dropped}/{cap.frames_captured}, "
+                                   f"ortalama gecikme: {cap.mean_age * 1000:.0f} ms", "INFO")
+        if cap.reconnects:
+            self.alert_signal.emit(f"[BİLGİ] Yeniden bağlanma: {cap.reconnects}, "
+                                   f"toplam kesinti: {cap.stall_seconds:.1f} sn", "INFO")
+        if cap.frames_skipped:
+            self.alert_signal.emit(f"[BİLGİ] Çözülmeden atlanan kare (adım {FRAME_STRIDE}): "
+                                   f"{cap.frames_skipped}", "INFO")
+        gate = self.pipeline.motion_gate
+        if gate is not None and gate.frames:
+            self.alert_signal.emit(f"[BİLGİ] Hareketsiz sahne nedeniyle model çalıştırılmayan kare: "
+                                   f"{gate.skipped}/{gate.frames} (%{gate.skipped_ratio * 100:.1f})", "INFO")
+        watcher.stop()
+        self.config.close()
         cap.release()
         self.finished_signal.emit()
 
     def stop(self):
-        self.alert_signal.emit("Durdurma sinyali alındı...")
+        self.alert_signal.emit("Durdurma sinyali alındı...", "INFO")
         self._running = False
         self.wait() # Thread'in bitmesini bekle
 
@@ -235,12 +179,20 @@ class VideoThread(QThread):
 # --- ANA ARAYÜZ SINIFI (MAIN WINDOW) ---
 # --- ANA ARAYÜZ SINIFI (MAIN WINDOW) ---
 class MainWindow(QMainWindow):
+    pool_log_signal = pyqtSignal(str, str)  # Model havuzunun arka plan iş parçacığından gelen loglar
+    pool_ready_signal = pyqtSignal(str)  # Havuz yüklemesi bitti (hata mesajı ya da boş)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("İş Güvenliği Takip Sistemi (YOLOv8)")
         self.setGeometry(100, 100, 1000, 750)
         
         self.thread = None
+        self.display = FrameDisplayPool()
+        self.frame_slot = LatestFrameSlot(self.display)
+        self.refresh_timer = QTimer()
+        self.refresh_timer.setInterval(int(1000 / DISPLAY_REFRESH_HZ))
+        self.refresh_timer.timeout.connect(self.refresh_display)
 
         # --- YENİ 'İŞ GÜVENLİĞİ' STİL SAYFASI (QSS) ---
         SAFETY_STYLESHEET = """
@@ -316,7 +268,7 @@ class MainWindow(QMainWindow):
             }
             
             /* Log Kutusu */
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #FFFFFF; /* Temiz beyaz */
                 border: 1px solid #CCCCCC;
                 border-radius: 5px;
@@ -365,8 +317,7 @@ class MainWindow(QMainWindow):
 
 
         # 4. Log/Uyarı Kutusu
-        self.log_box = QTextEdit()
-        self.log_box.setReadOnly(True)
+        self.log_box = LogView(LOG_VIEW_MAX_LINES)
         self.log_box.setFixedHeight(100)
         self.log_title = QLabel("Sistem Logları ve Uyarılar:") # Ayrı bir etiket olarak ekledik
 
@@ -389,8 +340,43 @@ class MainWindow(QMainWindow):
         self.btn_start_video.clicked.connect(self.start_video_file)
         self.btn_stop.clicked.connect(self.stop_processing)
 
+        # Modeller pencere göründükten sonra arka planda bir kez yüklenip ısıtılır
+        # (bkz. start_model_pool); o sırada kaynak seçilirse VideoThread yüklemeyi bekler
+        self.pool_log_signal.connect(self.log_alert)
+        self.pool_ready_signal.connect(self.model_pool_ready)
+        config = camera_config(CAMERA_ID, CONFIG_FILE, log=self.log_alert)
+        self.model_pool = ModelPool(
+            config['model_person_path'], config['model_helmet_path'], config['person_conf'],
+            config['helmet_conf'], backend=INFERENCE_BACKEND,
+            pipeline_kwargs={
+                'top_percentage': config['top_percentage'],
+                'helmet_stride': HELMET_STRIDE,
+                'helmet_mode': HELMET_MODE,
+                'crop_imgsz': HELMET_CROP_IMGSZ,
+                'tile_size': HELMET_TILE_SIZE,
+                'tile_overlap': HELMET_TILE_OVERLAP,
+                'tile_persons_only': HELMET_TILE_PERSONS_ONLY,
+                'track_helmets': HELMET_TRACKING,
+                'motion_gate': MotionGate(max_skip=MOTION_MAX_SKIP) if MOTION_GATE else None,
+            },
+            log=lambda message: self.pool_log_signal.emit(message, "INFO"),
+            on_ready=lambda error: self.pool_ready_signal.emit(str(error) if error else ""))
+        self.image_label.setText("Modeller yükleniyor... Kaynak şimdiden seçilebilir.")
+
     # --- Arayüz Fonksiyonları (Slotlar) ---
 
+    def start_model_pool(self):
+        self.model_pool.start()
+
+    @pyqtSlot(str)
+    def model_pool_ready(self, error):
+        if self.thread is not None:
+            return
+        if error:
+            self.image_label.setText(f"Modeller yüklenemedi: {error}")
+        else:
+            self.image_label.setText("Kaynak seçerek işlemi başlatın...")
+
     def start_webcam(self):
         self.start_processing("0")
 
@@ -401,60 +387,64 @@ class MainWindow(QMainWindow):
 
     def start_processing(self, source):
         if self.thread is not None and self.thread.isRunning():
-            self.log_alert("Zaten çalışan bir işlem var. Önce durdurun.")
+            self.log_alert("Zaten çalışan bir işlem var. Önce durdurun.", "WARNING")
             return
 
-        self.thread = VideoThread(source)
-        self.thread.change_pixmap_signal.connect(self.update_image)
-        self.thread.update_counts_signal.connect(self.update_counts)
+        size = self.image_label.contentsRect().size()
+        self.display.set_target_size(size.width(), size.height())
+        self.thread = VideoThread(source, self.model_pool, self.frame_slot)
         self.thread.alert_signal.connect(self.log_alert)
         self.thread.finished_signal.connect(self.processing_finished)
         
         self.btn_start_webcam.setEnabled(False)
         self.btn_start_video.setEnabled(False)
         self.btn_stop.setEnabled(True)
-        self.image_label.setText("Modeller yükleniyor, lütfen bekleyin...")
+        if self.model_pool.ready:
+            self.image_label.setText("Kaynak açılıyor...")
+        else:
+            self.image_label.setText("Modeller yükleniyor, lütfen bekleyin...")
         
         self.thread.start()
+        self.refresh_timer.start()
 
     def stop_processing(self):
         if self.thread:
             self.thread.stop()
         self.processing_finished()
 
-    @pyqtSlot(QImage)
-    def update_image(self, qt_image):
-        self.image_label.setPixmap(QPixmap.fromImage(qt_image))
+    @pyqtSlot()
+    def refresh_display(self):
+        display_frame, counts = self.frame_slot.take()
+        if counts is not None:
+            self.update_counts(*counts)
+        if display_frame is not None:
+            self.image_label.setPixmap(QPixmap.fromImage(display_frame.image))
+            self.display.release(display_frame)
 
     @pyqtSlot(int, int)
     def update_counts(self, takan_sayisi, takmayan_sayisi):
         self.label_takan.setText(f"Baret Takan: {takan_sayisi}")
         self.label_takmayan.setText(f"Baret Takmayan: {takmayan_sayisi}")
 
-    @pyqtSlot(str)
-    def log_alert(self, message):
-        self.log_box.append(message)
-        self.log_box.verticalScrollBar().setValue(self.log_box.verticalScrollBar().maximum())
-        clean_message = message.strip() # Baştaki/sondaki boşlukları temizle
-        if "[UYARI]" in clean_message:
-            logging.warning(clean_message)
-        elif "[HATA]" in clean_message:
-            logging.error(clean_message)
-        elif "[BİLGİ]" in clean_message:
-            logging.info(clean_message)
-        else:
-            logging.info(clean_message)
+    @pyqtSlot(str, str)
+    def log_alert(self, message, level):
+        message = message.strip() # Baştaki/sondaki boşlukları temizle
+        self.log_box.append_line(message, level)
+        log_event(message, level) # Seviye mesajdan ayrıştırılmaz, çağıran verir
+
     @pyqtSlot()
     def processing_finished(self):
-        self.log_alert("İşlem durduruldu veya bitti.")
+        self.log_alert("İşlem durduruldu veya bitti.", "INFO")
         self.btn_start_webcam.setEnabled(True)
         self.btn_start_video.setEnabled(True)
         self.btn_stop.setEnabled(False)
+        self.refresh_timer.stop()
         self.image_label.setText("Kaynak seçerek işlemi başlatın...")
         if self.thread:
             self.thread.quit()
             self.thread.wait()
             self.thread = None
+        self.frame_slot.clear()
 
     def closeEvent(self, event):
         self.stop_processing()
@@ -462,8 +452,19 @@ class MainWindow(QMainWindow):
 
 # --- Uygulamayı Başlat ---
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    arg_parser = argparse.ArgumentParser(description="İş Güvenliği Takip Sistemi arayüzü")
+    arg_parser.add_argument('--startup-profile', action='store_true',
+                            help="Açılışın aşamalarına göre süre raporunu yazdır")
+    args, qt_args = arg_parser.parse_known_args()
+    PROFILE.enabled = args.startup_profile
+    setup_logging(LOG_FILE)  # Sadece ana süreçte (içe aktarmada değil)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     
     window = MainWindow()
     window.show()
+    # Pencere çizilmeden arka plan yüklemesi başlamasın (torch içe aktarması GIL'i meşgul eder)
+    app.processEvents()
+    PROFILE.mark("pencere gösterildi")
+    window.start_model_pool()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Kişi - baret ilişkilendirme motoru.
+
+YOLO sonuçlarındaki tüm kutuları tek çağrıda NumPy dizilerine çeker, baret
+merkezlerinin kişi kutularının üst (omuz) bandına düşüp düşmediğini bütün
+kişi x baret çiftleri için vektörel olarak hesaplar ve her kişiye en fazla
+bir baret atar (bire bir, açgözlü eşleştirme).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Baret merkezinin, kişi kutusunun üstten bu oranı içinde olması gerekir
+TOP_PERCENTAGE = 0.3
+
+# person_helmet: her kişi için atanan baretin indeksi (-1 = baret yok)
+# helmet_used:   her baret için bir kişiye atanıp atanmadığı
+Association = namedtuple('Association', ['person_helmet', 'helmet_used'])
+
+
+# --- YARDIMCI FONKSİYONLAR ---
+def get_bbox_center(bbox):
+    """Bir sınırlayıcı kutunun (x1, y1, x2, y2) merkez noktasını (cx, cy) döndürür."""
+    x1, y1, x2, y2 = bbox
+    cx = int((x1 + x2) / 2)
+    cy = int((y1 + y2) / 2)
+    return cx, cy
+
+def is_on_shoulders(head_or_helmet_bbox, person_bbox, top_percentage=TOP_PERCENTAGE):
+    """Tek bir kutu çifti için omuz bandı kontrolü (shoulder_matrix'in skaler karşılığı)."""
+    h_cx, h_cy = get_bbox_center(head_or_helmet_bbox)
+    p_x1, p_y1, p_x2, p_y2 = person_bbox
+    is_horizontally_aligned = (p_x1 < h_cx < p_x2)
+    person_height = p_y2 - p_y1
+    shoulder_level = p_y1 + (person_height * top_percentage)
+    is_vertically_aligned = (p_y1 < h_cy < shoulder_level)
+    return is_horizontally_aligned and is_vertically_aligned
+# --- / YARDIMCI FONKSİYONLAR ---
+
+
+def empty_boxes():
+    """Tespit olmayan kareler için boş (kutular, id'ler, güven skorları) üçlüsü."""
+    return (np.zeros((0, 4), dtype=np.int32),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.float32))
+
+def extract_boxes(result, require_id=True, transform=None):
+    """
+    Bir ultralytics Results nesnesindeki kutuları tek seferde diziye çevirir.
+
+    (N, 4) int32 xyxy kutular, (N,) int64 takip ID'leri ve (N,) float32 güven
+    skorları döndürür. require_id=True iken takipçi henüz ID atamadıysa boş
+    sonuç döner; aksi halde ID'ler -1 ile doldurulur. transform verilirse
+    (ör. Letterboxed.to_frame) float kutular tamsayıya çevrilmeden önce ona
+    uygulanır.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_boxes()
+    if boxes.id is None:
+        if require_id:
+            return empty_boxes()
+        ids = np.full(len(boxes), -1, dtype=np.int64)
+    else:
+        ids = boxes.id.cpu().numpy().astype(np.int64)
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.float32)
+    if transform is not None:
+        xyxy = transform(xyxy)
+    xyxy = xyxy.astype(np.int32)
+    conf = boxes.conf.cpu().numpy().astype(np.float32)
+    return xyxy, ids, conf
+
+def box_centers(boxes):
+    """(N, 4) kutuların merkezlerini get_bbox_center ile aynı yuvarlamayla döndürür."""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    cx = np.trunc((boxes[:, 0] + boxes[:, 2]) / 2)
+    cy = np.trunc((boxes[:, 1] + boxes[:, 3]) / 2)
+    return cx, cy
+
+def shoulder_matrix(helmet_boxes, person_boxes, top_percentage=TOP_PERCENTAGE):
+    """
+    (P, H) boyutlu bool matris: [i, j] True ise j. baretin merkezi i. kişinin
+    omuz bandındadır. is_on_shoulders ile birebir aynı kuralı uygular.
+    """
+    person_boxes = np.asarray(person_boxes, dtype=np.float64).reshape(-1, 4)
+    h_cx, h_cy = box_centers(np.asarray(helmet_boxes).reshape(-1, 4))
+    p_x1 = person_boxes[:, 0:1]
+    p_y1 = person_boxes[:, 1:2]
+    p_x2 = person_boxes[:, 2:3]
+    p_y2 = person_boxes[:, 3:4]
+    shoulder_level = p_y1 + (p_y2 - p_y1) * top_percentage
+    horizontal = (p_x1 < h_cx) & (h_cx < p_x2)
+    vertical = (p_y1 < h_cy) & (h_cy < shoulder_level)
+    return horizontal & vertical
+
+def associate(person_boxes, helmet_boxes, top_percentage=TOP_PERCENTAGE):
+    """
+    Kişilere baretleri bire bir atar.
+
+    Aday çiftler shoulder_matrix ile bulunur; baret merkezinin kişinin beklenen
+    baş noktasına (omuz bandının ortası) uzaklığına göre sıralanıp açgözlü
+    biçimde eşleştirilir, böylece yan yana duran iki kişi aynı bareti paylaşamaz.
+    """
+    person_boxes = np.asarray(person_boxes).reshape(-1, 4)
+    helmet_boxes = np.asarray(helmet_boxes).reshape(-1, 4)
+    person_helmet = np.full(len(person_boxes), -1, dtype=np.int64)
+    helmet_used = np.zeros(len(helmet_boxes), dtype=bool)
+    if len(person_boxes) == 0 or len(helmet_boxes) == 0:
+        return Association(person_helmet, helmet_used)
+
+    match = shoulder_matrix(helmet_boxes, person_boxes, top_percentage)
+    person_idx, helmet_idx = np.nonzero(match)
+    if len(person_idx) == 0:
+        return Association(person_helmet, helmet_used)
+
+    # Beklenen baş noktası: kutunun yatay ortası, omuz bandının dikey ortası
+    p = person_boxes.astype(np.float64)
+    head_x = (p[:, 0] + p[:, 2]) / 2
+    head_y = p[:, 1] + (p[:, 3] - p[:, 1]) * top_percentage / 2
+    h_cx, h_cy = box_centers(helmet_boxes)
+    cost = ((h_cx[helmet_idx] - head_x[person_idx]) ** 2 +
+            (h_cy[helmet_idx] - head_y[person_idx]) ** 2)
+
+    # Sadece aday çiftler üzerinde döner (tipik olarak kişi sayısı kadar)
+    for k in np.argsort(cost, kind='stable'):
+        p_i = person_idx[k]
+        h_i = helmet_idx[k]
+        if person_helmet[p_i] < 0 and not helmet_used[h_i]:
+            person_helmet[p_i] = h_i
+            helmet_used[h_i] = True
+    return Association(person_helmet, helmet_used)
+
+def box_iou(box, boxes):
+    """Tek bir kutunun (4,) bir kutu dizisiyle (N, 4) IoU değerleri."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+def box_ios(box, boxes):
+    """Kesişimin küçük kutunun alanına oranı; karo kenarında kesilmiş yarım kutuları yakalar."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(np.minimum(area, areas), 1e-9)
+
+def nms(boxes, scores, iou_threshold=0.5, ios_threshold=None):
+    """
+    Açgözlü çakışma bastırma (NMS). Birden fazla kırpıntı/karo aynı bareti
+    bulduğunda kopyaları eler; tutulan indeksleri skora göre azalan sırada döndürür.
+    ios_threshold verilirse büyük ölçüde başka bir kutunun içinde kalan kutular
+    da elenir (komşu karolarda kesilmiş aynı baret).
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        if len(order) == 1:
+            break
+        rest = order[1:]
+        keep_mask = box_iou(boxes[i], boxes[rest]) <= iou_threshold
+        if ios_threshold is not None:
+            keep_mask &= box_ios(boxes[i], boxes[rest]) <= ios_threshold
+        order = rest[keep_mask]
+    return np.asarray(keep, dtype=np.int64)
@@ -0,0 +1,262 @@
+"""
+Çıkarım arka uçları: PyTorch, ONNX Runtime ve OpenVINO.
+
+Modeller ultralytics ile ONNX / OpenVINO biçimine dışa aktarılır ve
+model_cache/ altında ağırlık dosyasının içerik özetiyle (hash) anahtarlanan
+klasörlerde saklanır; yeniden eğitilen bir best.pt farklı bir özet üreteceği
+için dışa aktarma kendiliğinden yenilenir. Dışa aktarılan modeller yine
+YOLO(...) ile yüklenir, bu yüzden hat (pipeline.py) arka uçtan habersizdir.
+
+backend='auto' iken makinede kurulu her arka uç ilk çalıştırmada kısa bir
+ölçümle denenir ve en hızlısı model özetleriyle birlikte
+model_cache/backend_choice.json dosyasına yazılır; sonraki açılışlarda ölçüm
+tekrarlanmaz. Özet alınabilsin diye ağırlıklar önce yerelde çözülür
+(yolov8n.pt gibi ultralytics varlıkları gerekirse indirilir); bu yine de
+başarısız olursa seçim atlanır ve pytorch kullanılır.
+
+INT8 nicemlenmiş arka uçlar (openvino-int8) otomatik seçime katılmaz: doğruluk
+kaybı quantize.py raporuyla kontrol edildikten sonra açıkça seçilmelidir.
+Nicemleme kalibrasyon verisi gerektirdiği için bu modeller quantize.py
+tarafından önceden üretilir; load_models sadece önbellekteki kopyayı yükler.
+
+Kullanım (ölçümü elle tekrarlamak için):
+    python backends.py --model-person yolov8n.pt --model-helmet best.pt --rebenchmark
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+CACHE_DIR = 'model_cache'
+CHOICE_FILE = 'backend_choice.json'
+
+QUANTIZED_BACKENDS = ('openvino-int8',)
+BACKENDS = ('pytorch', 'onnx', 'openvino') + QUANTIZED_BACKENDS
+
+# Arka uç -> (ultralytics export biçimi, gerekli paketler, dışa aktarılan dosya/klasör adı)
+_EXPORTS = {
+    'onnx': ('onnx', ('onnxruntime',), '{stem}.onnx'),
+    'openvino': ('openvino', ('openvino',), '{stem}_openvino_model'),
+    'openvino-int8': ('openvino', ('openvino', 'nncf'), '{stem}_int8_openvino_model'),
+}
+
+
+def weights_hash(path, length=12):
+    """Ağırlık dosyasının SHA-256 özetinin ilk `length` karakteri."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def resolve_weights(path):
+    """
+    Ağırlık dosyasının yerel yolu. Dosya yoksa ultralytics'in varlık deposundan
+    indirilir (YOLO(...) ilk yüklemede aynısını yapar); indirilemezse
+    FileNotFoundError.
+    """
+    if os.path.isfile(path):
+        return path
+    from ultralytics.utils.downloads import attempt_download_asset
+
+    resolved = str(attempt_download_asset(path))
+    if not os.path.isfile(resolved):
+        raise FileNotFoundError(f"Ağırlık dosyası bulunamadı: {path}")
+    return resolved
+
+
+def available_backends(include_quantized=False):
+    """Bu makinede kullanılabilen arka uçlar (pytorch her zaman vardır)."""
+    found = ['pytorch']
+    for backend, (_, packages, _) in _EXPORTS.items():
+        if backend in QUANTIZED_BACKENDS and not include_quantized:
+            continue
+        if all(importlib.util.find_spec(package) is not None for package in packages):
+            found.append(backend)
+    return found
+
+
+def export_path(weights_path, backend, cache_dir=CACHE_DIR):
+    """Dışa aktarılmış modelin önbellekteki yolu (henüz var olmayabilir)."""
+    if backend == 'pytorch':
+        return weights_path
+    if backend not in _EXPORTS:
+        raise ValueError(f"Bilinmeyen arka uç: {backend} (seçenekler: {BACKENDS})")
+    stem = os.path.splitext(os.path.basename(weights_path))[0]
+    target_dir = os.path.join(cache_dir, f"{stem}-{weights_hash(weights_path)}")
+    return os.path.join(target_dir, _EXPORTS[backend][2].format(stem=stem))
+
+
+def export_model(weights_path, backend, imgsz=640, cache_dir=CACHE_DIR, data=None, fraction=1.0, force=False):
+    """
+    Modeli verilen arka uç için dışa aktarır (önbellekte varsa yeniden kullanır)
+    ve yüklenecek yolu döndürür. pytorch için ağırlık dosyasının kendisi döner.
+    Nicemlenmiş arka uçlar kalibrasyon için data (dataset.yaml) ister.
+    """
+    target = export_path(weights_path, backend, cache_dir)
+    if backend == 'pytorch':
+        return target
+    if os.path.exists(target) and not force:
+        return target
+    quantized = backend in QUANTIZED_BACKENDS
+    if quantized and data is None:
+        raise FileNotFoundError(f"{backend} modeli bulunamadı: {target}. "
+                                f"Önce 'python quantize.py' ile nicemlenmiş modeli üretin.")
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    elif os.path.exists(target):
+        os.remove(target)
+    fmt = _EXPORTS[backend][0]
+    target_dir = os.path.dirname(target)
+
+    from ultralytics import YOLO
+
+    # Dışa aktarma çıktıyı ağırlık dosyasının yanına yazar; bu yüzden ağırlıklar
+    # önce özet klasörüne kopyalanır ve aktarım orada yapılır
+    os.makedirs(target_dir, exist_ok=True)
+    local_weights = os.path.join(target_dir, os.path.basename(weights_path))
+    shutil.copy2(weights_path, local_weights)
+    try:
+        # dynamic=True: inference_server'ın toplu çağrıları ve 'crop' modunun
+        # küçük imgsz'si aynı dışa aktarılmış modelle çalışabilsin
+        extra = {'int8': True, 'data': data, 'fraction': fraction} if quantized else {}
+        exported = YOLO(local_weights).export(format=fmt, imgsz=imgsz, dynamic=True, **extra)
+    finally:
+        os.remove(local_weights)
+    if os.path.abspath(str(exported)) != os.path.abspath(target):
+        shutil.move(str(exported), target)
+    return target
+
+
+def load_model(weights_path, backend='pytorch', imgsz=640, cache_dir=CACHE_DIR):
+    """Modeli istenen arka uçla yükler; dönen nesne her durumda bir YOLO modelidir."""
+    from ultralytics import YOLO
+
+    return YOLO(export_model(weights_path, backend, imgsz, cache_dir), task='detect')
+
+
+def measure_latency(models, imgsz=640, runs=20, warmup=3):
+    """Verilen modellerin sentetik bir karede art arda çalışmasının medyan süresi (ms)."""
+    from preprocess import LetterboxPool
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(720, 1280, 3), dtype=np.uint8)
+    tensor = LetterboxPool(imgsz).prepare(frame).tensor
+    timings = []
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        for model in models:
+            model.predict(tensor, verbose=False)
+        if i >= warmup:
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def benchmark_backends(model_person_path, model_helmet_path, imgsz=640, runs=20, warmup=3,
+                       backends=None, cache_dir=CACHE_DIR, log=print):
+    """Her arka uç için iki modelin kare başına süresini ölçer: {arka_uç: ms}."""
+    results = {}
+    for backend in backends or available_backends():
+        try:
+            log(f"[{backend}] modeller hazırlanıyor...")
+            models = [load_model(path, backend, imgsz, cache_dir)
+                      for path in (model_person_path, model_helmet_path)]
+            results[backend] = measure_latency(models, imgsz, runs, warmup)
+            log(f"[{backend}] {results[backend]:.1f} ms/kare")
+        except Exception as e:
+            # Bir arka ucun aktarımı başarısız olursa diğerleriyle devam edilir
+            log(f"[{backend}] atlandı: {e}")
+    return results
+
+
+def _choice_key(model_person_path, model_helmet_path, imgsz):
+    return f"{weights_hash(model_person_path)}-{weights_hash(model_helmet_path)}-{imgsz}"
+
+
+def _read_choices(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def select_backend(model_person_path, model_helmet_path, imgsz=640, cache_dir=CACHE_DIR,
+                   rebenchmark=False, log=print):
+    """
+    Kayıtlı seçimi döndürür; yoksa (veya rebenchmark=True ise) kurulu arka uçları
+    ölçüp en hızlısını kaydeder.
+    """
+    choice_path = os.path.join(cache_dir, CHOICE_FILE)
+    try:
+        model_person_path = resolve_weights(model_person_path)
+        model_helmet_path = resolve_weights(model_helmet_path)
+        key = _choice_key(model_person_path, model_helmet_path, imgsz)
+    except Exception as e:
+        # İndirme/okuma hatası açılışı engellemesin; ölçüm yapılamıyorsa pytorch her zaman vardır
+        log(f"[UYARI] Ağırlıkların özeti alınamadı ({e}); arka uç seçimi atlanıp pytorch kullanılıyor")
+        return 'pytorch'
+    choices = _read_choices(choice_path)
+    if not rebenchmark and key in choices and choices[key]['backend'] in available_backends():
+        return choices[key]['backend']
+
+    log("Arka uçlar ölçülüyor (ilk çalıştırma, bir kez yapılır)...")
+    timings = benchmark_backends(model_person_path, model_helmet_path, imgsz,
+                                 cache_dir=cache_dir, log=log)
+    if not timings:
+        return 'pytorch'
+    best = min(timings, key=timings.get)
+    choices[key] = {
+        'backend': best,
+        'timings_ms': {name: round(ms, 2) for name, ms in timings.items()},
+        'measured_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(choice_path, 'w', encoding='utf-8') as f:
+        json.dump(choices, f, indent=2)
+    log(f"Seçilen arka uç: {best}")
+    return best
+
+
+def load_models(model_person_path, model_helmet_path, backend='auto', imgsz=640,
+                cache_dir=CACHE_DIR, log=print):
+    """
+    Kişi ve baret modellerini aynı arka uçla yükler.
+    Dönüş: (model_person, model_helmet, kullanılan_arka_uç)
+    """
+    if backend == 'auto':
+        backend = select_backend(model_person_path, model_helmet_path, imgsz, cache_dir, log=log)
+    elif backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen arka uç: {backend} (seçenekler: auto, {', '.join(BACKENDS)})")
+    if backend != 'pytorch':
+        # Dışa aktarma önbelleği ağırlık özetiyle anahtarlanır; dosya önce yerelde olmalı
+        model_person_path = resolve_weights(model_person_path)
+        model_helmet_path = resolve_weights(model_helmet_path)
+    model_person = load_model(model_person_path, backend, imgsz, cache_dir)
+    model_helmet = load_model(model_helmet_path, backend, imgsz, cache_dir)
+    return model_person, model_helmet, backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çıkarım arka uçlarını ölçer ve en hızlısını kaydeder")
+    parser.add_argument('--model-person', default='yolov8n.pt')
+    parser.add_argument('--model-helmet', default='best.pt')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--rebenchmark', action='store_true',
+                        help="Kayıtlı seçimi yok say ve ölçümü tekrarla")
+    args = parser.parse_args()
+
+    print(f"Kurulu arka uçlar: {', '.join(available_backends())}")
+    backend = select_backend(args.model_person, args.model_helmet, args.imgsz,
+                             rebenchmark=args.rebenchmark)
+    print(f"Kullanılacak arka uç: {backend}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Tespit hattı için aşama bazlı kıyaslama (benchmark) paketi.
+
+Kamera gerekmez: --source verilmezse hareketli dikdörtgenlerden oluşan
+sentetik bir klip üretilir (gerçek modeller bu klipte kişi bulmaz; model
+süreleri yine ölçülür, ilişkilendirme ve çizim için kayıtlı bir klip verin).
+Her (imgsz, adım, arka uç) bileşimi için klip baştan sona işlenir ve
+VideoThread.run'daki aşamaların kare başına gecikme yüzdelikleri ölçülür:
+kod çözme, letterbox, kişi ve baret modelleri, takip, kutu çıkarma,
+eşleştirme, çizim ve ekran karesinin hazırlanması (küçültme + QImage).
+
+Sonuçlar JSON olarak yazılır; farklı günlerin/sürümlerin çıktıları
+--compare ile karşılaştırılabilir. --helmet-tracking on off verilirse baret
+takipçili ve takipsiz (kare başına tespit) çalıştırmalar yan yana ölçülür ve
+takip aşamasında kare başına kazanılan süre yazdırılır; anlamlı sonuç için
+kalabalık bir kayıt (--source) kullanın.
+
+Kullanım:
+    python benchmark.py --imgsz 480 640 --strides 1 3 --backends pytorch onnx --output bench.json
+    python benchmark.py --source kayit.mp4 --compare bench_onceki.json
+    python benchmark.py --source kalabalik.mp4 --helmet-tracking on off
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from backends import BACKENDS, load_models
+from drawing import draw_detections
+from instrumentation import StageTimer
+from live_config import CONFIG_FILE, DEFAULT_CAMERA, DEFAULTS, camera_config
+from pipeline import HELMET_MODES, DetectionPipeline, find_helmet_class_id
+
+try:
+    from display import FrameDisplayPool
+except ImportError:  # Arayüzsüz sunucularda (PyQt6 yok) sadece küçültme ölçülür
+    FrameDisplayPool = None
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def make_synthetic_clip(path, frames=300, size=(1280, 720), fps=25):
+    """Gürültülü arka plan üzerinde hareket eden dikdörtgenlerden bir MJPG klip yazar."""
+    w, h = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    rng = np.random.default_rng(0)
+    background = rng.integers(60, 120, size=(h, w, 3), dtype=np.uint8)
+    for i in range(frames):
+        frame = background.copy()
+        for k in range(4):
+            x = int((i * (3 + k) + k * w // 4) % (w - 120))
+            y = h // 3 + k * 40
+            cv2.rectangle(frame, (x, y), (x + 80, y + 220), (40 + 50 * k, 80, 200), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+DISPLAY_SIZE = (960, 540)
+_display = FrameDisplayPool(target_size=DISPLAY_SIZE) if FrameDisplayPool is not None else None
+
+
+def to_qimage(frame):
+    """son.py'deki aktarım: etiket boyutuna küçültme ve BGR888 QImage (PyQt6 yoksa sadece küçültme)."""
+    if _display is None:
+        h, w = frame.shape[:2]
+        scale = min(DISPLAY_SIZE[0] / w, DISPLAY_SIZE[1] / h)
+        return cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    display_frame = _display.render(frame)
+    _display.release(display_frame)
+    return display_frame.image
+
+
+def run_config(source, models, helmet_class_id, imgsz, stride, helmet_mode, max_frames, warmup,
+               track_helmets=True, tiles=None, config=DEFAULTS):
+    """
+    Klibi bir kez işleyip {aşama: yüzdelikler} ve uçtan uca FPS döndürür.
+    tiles: 'tiled' modu için {'tile_size', 'tile_overlap', 'tile_persons_only'}.
+    config: eşikler ve omuz bandı (live_config.camera_config çıktısı).
+    """
+    model_person, model_helmet = models
+    tiles = tiles or {}
+    timer = StageTimer(window=max(1, max_frames or 100000))
+    pipeline = DetectionPipeline(model_person, model_helmet, helmet_class_id,
+                                 config['person_conf'], config['helmet_conf'],
+                                 top_percentage=config['top_percentage'], imgsz=imgsz,
+                                 helmet_stride=stride, helmet_mode=helmet_mode, timer=timer,
+                                 track_helmets=track_helmets, **tiles)
+    cap = cv2.VideoCapture(source)
+    frames = 0
+    measured = 0
+    elapsed = 0.0
+    warmup_regions = 0
+    while not max_frames or frames < max_frames + warmup:
+        start = time.perf_counter()
+        timer.begin()
+        success, frame = cap.read()
+        if not success:
+            break
+        timer.lap('decode')
+        det = pipeline.detect(frame)
+        draw_detections(frame, det)
+        timer.lap('draw')
+        to_qimage(frame)
+        timer.lap('qimage')
+        frames += 1
+        if frames <= warmup:
+            # Isınma kareleri (ilk çıkarımın tembel başlatmaları) ölçüme katılmaz
+            warmup_regions = pipeline.regions_processed
+            continue
+        timer.commit()
+        measured += 1
+        elapsed += time.perf_counter() - start
+    cap.release()
+
+    summary = timer.summary(PERCENTILES)
+    return {
+        'imgsz': imgsz,
+        'stride': stride,
+        'helmet_mode': helmet_mode,
+        'track_helmets': track_helmets,
+        **(tiles if helmet_mode == 'tiled' else {}),
+        'regions_per_frame': round((pipeline.regions_processed - warmup_regions) / measured, 2) if measured else 0.0,
+        'frames': measured,
+        'fps': measured / elapsed if elapsed else 0.0,
+        'stages': {stage: {k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()}
+                   for stage, row in summary.items()},
+    }
+
+
+def print_run(run):
+    tracking = "baret takipli" if run.get('track_helmets', True) else "baret takipsiz"
+    print(f"\n[{run['backend']}] imgsz={run['imgsz']} adım={run['stride']} mod={_mode_label(run)} {tracking} "
+          f"-> {run['fps']:.1f} FPS ({run['frames']} kare)")
+    if run.get('regions_per_frame'):
+        print(f"  Kare başına baret modeline verilen bölge: {run['regions_per_frame']:.2f}")
+    print(f"  {'Aşama':<14}" + "".join(f"{'p' + str(q):>9}" for q in PERCENTILES) + f"{'ort.':>9}{'n':>7}")
+    for stage, row in run['stages'].items():
+        print(f"  {stage:<14}" + "".join(f"{row['p' + str(q)]:>9.2f}" for q in PERCENTILES)
+              + f"{row['mean']:>9.2f}{row['n']:>7}")
+
+
+def _mode_label(run):
+    if run['helmet_mode'] != 'tiled':
+        return run['helmet_mode']
+    label = f"tiled({run['tile_size']}, örtüşme {run['tile_overlap']:g}"
+    return label + (", kişiler)" if run['tile_persons_only'] else ")")
+
+
+def _run_key(run):
+    return (run['backend'], run['imgsz'], run['stride'], _mode_label(run), run.get('track_helmets', True))
+
+
+def report_mode_throughput(runs):
+    """Her baret modunun FPS ve baret modeli süresini aynı bileşimin 'full' çalıştırmasıyla karşılaştırır."""
+    def without_mode(run):
+        key = _run_key(run)
+        return key[:3] + key[4:]
+
+    full_runs = {without_mode(run): run for run in runs if run['helmet_mode'] == 'full'}
+    for run in runs:
+        full = full_runs.get(without_mode(run))
+        if run['helmet_mode'] == 'full' or full is None or not full['fps']:
+            continue
+        print(f"\nTam kareye göre [{run['backend']}] imgsz={run['imgsz']} adım={run['stride']} "
+              f"mod={_mode_label(run)}: FPS {full['fps']:.1f} -> {run['fps']:.1f} "
+              f"({run['fps'] / full['fps']:.2f}x)")
+        before, after = full['stages'].get('helmet_model'), run['stages'].get('helmet_model')
+        if before and after:
+            print(f"  baret modeli ortalama {before['mean']:.2f} -> {after['mean']:.2f} ms, "
+                  f"kare başına {run['regions_per_frame']:.2f} bölge")
+
+
+def report_tracker_savings(runs):
+    """Aynı bileşimin baret takipli ve takipsiz çalıştırmaları arasındaki takip süresi farkı."""
+    by_key = {_run_key(run): run for run in runs}
+    for key, tracked in by_key.items():
+        if not key[-1]:
+            continue
+        untracked = by_key.get(key[:-1] + (False,))
+        if untracked is None or 'tracking' not in tracked['stages'] or 'tracking' not in untracked['stages']:
+            continue
+        before, after = tracked['stages']['tracking'], untracked['stages']['tracking']
+        print(f"\nBaret takipçisi kaldırıldığında [{key[0]}] imgsz={key[1]} adım={key[2]} mod={key[3]}:")
+        print(f"  takip p50 {before['p50']:.2f} -> {after['p50']:.2f} ms, ortalama {before['mean']:.2f} -> "
+              f"{after['mean']:.2f} ms (kare başına {before['mean'] - after['mean']:.2f} ms kazanç), "
+              f"FPS {tracked['fps']:.1f} -> {untracked['fps']:.1f}")
+
+
+def compare(runs, previous_path):
+    """Aynı bileşimler için önceki çıktıya göre p50 farklarını yazdırır."""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {_run_key(run): run for run in json.load(f)['runs']}
+    print(f"\nKarşılaştırma ({previous_path}), p50 ms: önceki -> şimdiki")
+    for run in runs:
+        old = previous.get(_run_key(run))
+        if old is None:
+            continue
+        print(f"[{run['backend']}] imgsz={run['imgsz']} adım={run['stride']} mod={run['helmet_mode']}: "
+              f"{old['fps']:.1f} -> {run['fps']:.1f} FPS")
+        for stage, row in run['stages'].items():
+            if stage in old['stages']:
+                before, after = old['stages'][stage]['p50'], row['p50']
+                change = (after - before) / before * 100 if before else 0.0
+                print(f"  {stage:<14} {before:>8.2f} -> {after:>8.2f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tespit hattı aşama bazlı kıyaslama")
+    parser.add_argument('--source', default=None, help="Kayıtlı klip (verilmezse sentetik klip üretilir)")
+    parser.add_argument('--imgsz', type=int, nargs='+', default=[640])
+    parser.add_argument('--strides', type=int, nargs='+', default=[1])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['pytorch'])
+    parser.add_argument('--helmet-mode', choices=HELMET_MODES, nargs='+', default=['full'],
+                        help="Birden fazla verilirse her mod 'full' ile karşılaştırılır (ör. full tiled)")
+    parser.add_argument('--tile-size', type=int, default=640, help="'tiled' modunda karo kenarı")
+    parser.add_argument('--tile-overlap', type=float, default=0.2, help="'tiled' modunda örtüşme oranı")
+    parser.add_argument('--tile-persons-only', action='store_true',
+                        help="'tiled' modunda sadece kişilere değen karoları çalıştır")
+    parser.add_argument('--helmet-tracking', choices=('on', 'off'), nargs='+', default=['on'],
+                        help="Baret takipçisi açık/kapalı (ikisi birden verilirse karşılaştırılır)")
+    parser.add_argument('--max-frames', type=int, default=200, help="0 = tüm klip")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--output', default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--compare', default=None, help="Karşılaştırılacak önceki JSON çıktısı")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Eşiklerin ve model yollarının okunduğu ayar dosyası")
+    parser.add_argument('--camera', default=DEFAULT_CAMERA, help="Ayar dosyasında kullanılacak kamera adı")
+    args = parser.parse_args()
+    config = camera_config(args.camera, args.config)
+
+    source = args.source
+    if source is None:
+        source = make_synthetic_clip(os.path.join(tempfile.gettempdir(), 'baret_bench_clip.avi'))
+        print(f"[BİLGİ] Sentetik klip kullanılıyor: {source}")
+
+    tiles = {'tile_size': args.tile_size, 'tile_overlap': args.tile_overlap,
+             'tile_persons_only': args.tile_persons_only}
+    runs = []
+    for backend in args.backends:
+        for imgsz in args.imgsz:
+            model_person, model_helmet, used_backend = load_models(config['model_person_path'],
+                                                                   config['model_helmet_path'],
+                                                                   backend, imgsz=imgsz)
+            helmet_class_id = find_helmet_class_id(model_helmet)
+            if helmet_class_id is None:
+                print(f"Hata: '{config['model_helmet_path']}' içinde 'helmet' sınıfı bulunamadı.")
+                return
+            for stride in args.strides:
+                for helmet_mode in args.helmet_mode:
+                    for tracking in args.helmet_tracking:
+                        run = run_config(source, (model_person, model_helmet), helmet_class_id, imgsz, stride,
+                                         helmet_mode, args.max_frames, args.warmup,
+                                         track_helmets=tracking == 'on', tiles=tiles, config=config)
+                        run['backend'] = used_backend
+                        print_run(run)
+                        runs.append(run)
+
+    report_tracker_savings(runs)
+    report_mode_throughput(runs)
+    if args.compare:
+        compare(runs, args.compare)
+    if args.output:
+        report = {
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'machine': {
+                'platform': platform.platform(),
+                'processor': platform.processor(),
+                'cpu_count': os.cpu_count(),
+                'python': platform.python_version(),
+            },
+            'source': args.source or 'synthetic',
+            'runs': runs,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n[BİLGİ] Sonuçlar '{args.output}' dosyasına yazıldı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Düşük gecikmeli kare yakalama.
+
+Kaynak ayrı bir iş parçacığında sürekli okunur ve tek gözlü bir yuvaya
+yazılır. Canlı kaynaklarda (webcam, RTSP/HTTP) yuva dolu iken yeni kare
+gelirse eskisi atılır; böylece çıkarım döngüsü her zaman en taze kareyi
+işler ve OpenCV'nin iç tamponu birikip saniyelerce geride kalmaz. Dosya
+kaynaklarında varsayılan olarak hiçbir kare atılmaz (üretici, tüketiciyi
+bekler).
+
+stride > 1 iken her stride karenin sadece biri çözülür: atlanan kareler
+grab() ile ilerletilir (retrieve/BGR dönüşümü yapılmaz); dosyalarda adım
+SEEK_MIN_STRIDE ve üstündeyse doğrudan zaman damgasına atlanır, aradaki
+kareler hiç çözülmez. Her karenin video zamanı timestamp'tan okunur; ihlal
+süreleri işleme hızından bağımsız olarak bu zamanla ölçülür.
+
+Canlı kaynaklarda okuma hatası akışın sonu sayılmaz: kaynak üstel artan
+bekleme süreleriyle (RECONNECT_INITIAL_DELAY'den RECONNECT_MAX_DELAY'e)
+yeniden açılır, bu sırada read() zaman aşımıyla döner ve çağıran döngü
+(modeller ve takipçi) ayakta kalır. loop=True verilen dosyalar bitince başa
+sarılır (test için). Ağ akışları düşük gecikme seçenekleriyle ve okuma zaman
+aşımıyla açılır; donan bir akış da kopmuş sayılıp yeniden bağlanılır.
+"""
+import logging
+import os
+import threading
+import time
+
+import cv2
+
+# Dosyalarda bu adımdan itibaren grab() yerine zaman damgasıyla atlanır. Konumlandırma
+# en yakın anahtar kareden çözmeye başlar; küçük adımlarda grab() daha ucuzdur.
+SEEK_MIN_STRIDE = 50
+
+RECONNECT_INITIAL_DELAY = 0.5  # İlk yeniden bağlanma denemesinden önceki bekleme (sn)
+RECONNECT_MAX_DELAY = 30.0  # Bekleme her başarısız denemede ikiye katlanır, en fazla bu kadar
+STREAM_TIMEOUT_MS = 5000  # Ağ akışı açma/okuma zaman aşımı (destekleyen OpenCV sürümlerinde)
+
+# FFmpeg'in ağ akışlarında kendi tamponunu büyütmemesi için (kullanıcı ortam değişkeniyle ezebilir)
+LOW_LATENCY_FFMPEG_OPTIONS = "rtsp_transport;tcp|fflags;nobuffer|flags;low_delay"
+
+
+def is_live_source(source):
+    """Webcam indeksi veya ağ akışı ise True, dosya ise False."""
+    source = str(source)
+    return source.isdigit() or '://' in source
+
+
+def open_capture(source):
+    """
+    '0' gibi sayısal kaynakları webcam indeksi olarak açar. Ağ akışları (RTSP/HTTP)
+    FFmpeg ile düşük gecikme seçenekleri ve açma/okuma zaman aşımıyla açılır.
+    """
+    source = str(source)
+    if source.isdigit():
+        return cv2.VideoCapture(int(source))
+    if '://' in source:
+        os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', LOW_LATENCY_FFMPEG_OPTIONS)
+        if hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
+            return cv2.VideoCapture(source, cv2.CAP_FFMPEG,
+                                    [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, STREAM_TIMEOUT_MS,
+                                     cv2.CAP_PROP_READ_TIMEOUT_MSEC, STREAM_TIMEOUT_MS])
+    return cv2.VideoCapture(source)
+
+
+class StridedReader:
+    """
+    cv2.VideoCapture'dan her stride karenin birini okuyan, atlananları çözmeden
+    geçen okuyucu. timestamp ve frame_index son okunan karenin video zamanı
+    (sn) ve kaynaktaki sırasıdır; canlı kaynaklarda zaman ilk kareden beri
+    geçen süredir, yeniden bağlanma kesintileri bu süreye sayılmaz (aksi halde
+    kesinti ihlal süresine eklenir ve takipteki herkes için yanlış uyarı çıkar).
+    """
+
+    def __init__(self, cap, stride=1, live=False, seek_min_stride=SEEK_MIN_STRIDE):
+        self.cap = cap
+        self.stride = max(1, int(stride))
+        self.live = live
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.seek = not live and self.stride >= seek_min_stride
+        self.timestamp = 0.0
+        self.frame_index = -1
+        self.frames_skipped = 0
+        self._start = None
+        self._position = 0.0
+        self._offset = 0.0
+        self._resumed = False
+
+    def reopen(self, cap):
+        """
+        Yeniden açılan ya da başa sarılan kaynakla devam eder; video zamanı geri
+        gitmez, canlı kaynakta kesinti boyunca da ilerlemez.
+        """
+        self.cap = cap
+        self._resumed = True
+        if not self.live:
+            self._offset = self.timestamp + 1.0 / self.fps
+            self._position = 0.0
+            self.frame_index = -1
+
+    def read(self):
+        skipped = 0
+        if self.frame_index >= 0 and self.stride > 1:
+            skipped = self._skip()
+            if skipped is None:
+                return False, None
+        success, frame = self.cap.read()
+        if not success:
+            return False, None
+        self.frame_index += skipped + 1
+        self.frames_skipped += skipped
+        self._position = self._frame_time()
+        self.timestamp = self._offset + self._position
+        return True, frame
+
+    def _skip(self):
+        """Sıradaki okunacak kareye ilerler; atlanan kare sayısını, akış bittiyse None döndürür."""
+        if self.seek:
+            target = self._position + self.stride / self.fps
+            if self.cap.set(cv2.CAP_PROP_POS_MSEC, target * 1000.0):
+                return self.stride - 1
+            self.seek = False  # Kaynak konumlandırmayı desteklemiyor; grab() ile devam edilir
+        for _ in range(self.stride - 1):
+            if not self.cap.grab():
+                return None
+        return self.stride - 1
+
+    def _frame_time(self):
+        if self.live:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now
+            elif self._resumed:
+                # Yeniden bağlanınca akış son kareden bir kare sonra devam ediyormuş gibi sayılır
+                self._start += max(0.0, (now - self._start) - (self._position + 1.0 / self.fps))
+            self._resumed = False
+            return now - self._start
+        position = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if self.frame_index > 0 and position <= self._position:
+            # Arka uç konum bildirmiyor; zaman kare sırasından hesaplanır
+            return self.frame_index / self.fps
+        return position
+
+
+class LatestFrameCapture:
+    """
+    cv2.VideoCapture'ı ayrı bir iş parçacığında boşaltan, en son kareyi
+    tutan yakalayıcı. read() arayüzü cv2.VideoCapture.read() ile aynıdır.
+
+    Sayaçlar:
+      frames_captured  kaynaktan okunan kare sayısı
+      frames_dropped   işlenmeden üzerine yazılan (atılan) kare sayısı
+      frames_skipped   stride nedeniyle çözülmeden geçilen kare sayısı
+      timestamp        read() ile dönen son karenin video zamanı (sn)
+      frame_index      read() ile dönen son karenin kaynaktaki sırası
+      last_age         son okunan karenin yakalanmasından read()'e kadar geçen süre (sn)
+      max_age          oturumdaki en büyük yakalama->çıkarım yaşı (sn)
+      reconnects       başarılı yeniden bağlanma sayısı
+      stall_seconds    kopma ile yeniden gelen ilk kare arasında geçen toplam süre (sn)
+      queued           okunmayı bekleyen kare (tek yuva: 0 ya da 1)
+
+    on_status(message, level) verilirse kopma ve yeniden bağlanma olayları
+    okuma iş parçacığından bu fonksiyonla bildirilir.
+    """
+
+    def __init__(self, source, drop_frames=None, stride=1, reconnect=None, loop=False, on_status=None):
+        self.source = source
+        self.live = is_live_source(source)
+        self.drop_frames = self.live if drop_frames is None else drop_frames
+        self.reconnect = self.live if reconnect is None else reconnect
+        self.loop = loop and not self.live
+        self.on_status = on_status
+        self.cap = self._open()
+        self.reader = StridedReader(self.cap, stride, live=self.live)
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        self._frame_position = (0.0, -1)
+        self._ended = False
+        self._running = False
+        self._thread = None
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.last_age = 0.0
+        self.max_age = 0.0
+        self.timestamp = 0.0
+        self.frame_index = -1
+        self.reconnects = 0
+        self.loops = 0
+        self.stall_seconds = 0.0
+        self._stall_start = None
+        self._reconnect_delay = RECONNECT_INITIAL_DELAY
+        self._age_sum = 0.0
+        self._frames_read = 0
+
+    @property
+    def frames_skipped(self):
+        return self.reader.frames_skipped
+
+    @property
+    def ended(self):
+        """Akış kalıcı olarak bitti mi (dosya sonu ya da durduruldu); kopan canlı akışta False."""
+        return self._ended or not self._running
+
+    @property
+    def queued(self):
+        return int(self._frame is not None)
+
+    @property
+    def stalled(self):
+        return self._stall_start is not None
+
+    def _open(self):
+        cap = open_capture(self.source)
+        if self.drop_frames:
+            # Sürücü tarafında da biriktirmeyi en aza indir (destekleyen arka uçlarda)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _status(self, message, level):
+        logging.log(logging.WARNING if level in ("WARNING", "ERROR") else logging.INFO, message)
+        if self.on_status is not None:
+            self.on_status(message, level)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, name=f"capture-{self.source}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _reader(self):
+        while self._running:
+            success, frame = self.reader.read()
+            now = time.monotonic()
+            if not success and self._restart():
+                continue
+            with self._cond:
+                if not success:
+                    self._ended = True
+                    self._cond.notify_all()
+                    return
+                if self._stall_start is not None:
+                    stall = now - self._stall_start
+                    self.stall_seconds += stall
+                    self._stall_start = None
+                    self._status(f"Kaynak yeniden bağlandı: {self.source} ({stall:.1f} sn kesinti)", "SUCCESS")
+                self.frames_captured += 1
+                if self._frame is not None:
+                    if self.drop_frames:
+                        self.frames_dropped += 1
+                    else:
+                        # Kayıpsız mod: tüketici kareyi alana kadar bekle
+                        while self._frame is not None and self._running:
+                            self._cond.wait(0.1)
+                self._frame = frame
+                self._frame_time = now
+                self._frame_position = (self.reader.timestamp, self.reader.frame_index)
+                self._cond.notify_all()
+
+    def _restart(self):
+        """
+        Okuma hatasından sonra dosyayı başa sarar ya da canlı kaynağa üstel artan
+        beklemelerle yeniden bağlanır. Devam edilecekse True döndürür.
+        """
+        if self.loop:
+            self.cap.release()
+            self.cap = self._open()
+            if not self.cap.isOpened():
+                return False
+            self.reader.reopen(self.cap)
+            self.loops += 1
+            return True
+        if not self.reconnect:
+            return False
+        if self._stall_start is None:
+            self._stall_start = time.monotonic()
+            self._reconnect_delay = RECONNECT_INITIAL_DELAY
+            self._status(f"Kaynak bağlantısı koptu: {self.source}, yeniden bağlanılıyor...", "WARNING")
+        while self._running:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running, timeout=self._reconnect_delay)
+            if not self._running:
+                break
+            # Bağlanıp hemen kopan kaynakta da bekleme büyür; ilk kare gelince sıfırlanır
+            self._reconnect_delay = min(self._reconnect_delay * 2, RECONNECT_MAX_DELAY)
+            self.cap.release()
+            cap = self._open()
+            if cap.isOpened():
+                self.cap = cap
+                self.reader.reopen(cap)
+                self.reconnects += 1
+                return True
+            cap.release()
+            self._status(f"Kaynak açılamadı: {self.source}, {self._reconnect_delay:.1f} sn sonra "
+                         f"tekrar denenecek", "WARNING")
+        return False
+
+    def read(self, timeout=5.0):
+        """
+        En taze kareyi döndürür; akış bittiyse veya zaman aşımında (False, None).
+        Canlı kaynak yeniden bağlanırken de zaman aşımıyla döner; ended ile ayırt edilir.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._frame is None:
+                if self._ended or not self._running:
+                    return False, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False, None
+                self._cond.wait(remaining)
+            frame = self._frame
+            self._frame = None
+            self.timestamp, self.frame_index = self._frame_position
+            age = time.monotonic() - self._frame_time
+            self._cond.notify_all()
+
+        self.last_age = age
+        self.max_age = max(self.max_age, age)
+        self._age_sum += age
+        self._frames_read += 1
+        return True, frame
+
+    @property
+    def mean_age(self):
+        return self._age_sum / self._frames_read if self._frames_read else 0.0
+
+    def release(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.cap.release()
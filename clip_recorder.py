@@ -0,0 +1,186 @@
+"""
+İhlal anının öncesini ve sonrasını kapsayan kanıt klibi kaydedici.
+
+Her kamera için son birkaç saniyenin kareleri JPEG olarak bellekte bir halka
+tamponda tutulur (süre ve MB sınırlı). Tespit döngüsü push() ile kareyi
+sadece kopyalayıp kodlayıcı iş parçacığının kuyruğuna bırakır; kayıt hızı
+(record_fps) dışındaki kareler hiç kopyalanmaz, kuyruk doluysa kare atlanır.
+Uyarı anında trigger() çağrılır: uyarıdan post_seconds sonra halka tampondaki
+[uyarı - pre_seconds, uyarı + post_seconds] kareleri ayrı bir yazıcı iş
+parçacığında video dosyasına yazılır. Klasör disk sınırını aşarsa en eski
+klipler silinir.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+CLIP_FOURCC = 'mp4v'
+CLIP_EXTENSION = '.mp4'
+
+
+class ClipRecorder:
+    """Bir kameranın JPEG halka tamponunu tutan ve uyarılarda klip yazan kaydedici."""
+
+    def __init__(self, camera, output_dir='ihlal_klipleri', pre_seconds=5.0, post_seconds=5.0,
+                 record_fps=10.0, max_width=960, jpeg_quality=80, buffer_mb=64, disk_mb=2048,
+                 on_saved=None):
+        self.camera = camera
+        self.output_dir = os.path.join(output_dir, camera)
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.record_fps = record_fps
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.buffer_bytes = int(buffer_mb * 1024 * 1024)
+        self.disk_bytes = int(disk_mb * 1024 * 1024)
+        self.on_saved = on_saved  # Klip yazılınca yol ile (yazıcı iş parçacığından) çağrılır
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._ring = deque()  # (monotonic zaman, jpeg baytları)
+        self._ring_bytes = 0
+        self._pending = []  # Sonrası beklenen klipler: {'at', 'wall', 'ids'}
+        self._lock = threading.Lock()
+        self._last_push = float('-inf')  # Video zamanı 0.0'daki ilk kare de alınsın
+        self.skipped = 0  # Kodlayıcı geride kaldığı için tampona alınmayan kareler
+        self.saved = 0
+
+        self._frames = queue.Queue(maxsize=2)
+        self._clips = queue.Queue()
+        self._encoder = threading.Thread(target=self._encode_loop, name=f"clip-encoder-{camera}", daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, name=f"clip-writer-{camera}", daemon=True)
+        self._encoder.start()
+        self._writer.start()
+
+    @property
+    def buffered_seconds(self):
+        with self._lock:
+            return self._ring[-1][0] - self._ring[0][0] if len(self._ring) > 1 else 0.0
+
+    @property
+    def queued_frames(self):
+        """Kodlayıcıyı bekleyen kareler (en fazla 2; dolunca yeni kareler atlanır)."""
+        return self._frames.qsize()
+
+    @property
+    def queued_clips(self):
+        """Yazıcıyı bekleyen klipler."""
+        return self._clips.qsize()
+
+    def push(self, frame, now=None):
+        """Tespit döngüsünden çağrılır; kayıt hızına göre kareyi kodlayıcıya bırakır."""
+        now = time.monotonic() if now is None else now
+        if now - self._last_push < 1.0 / self.record_fps:
+            return
+        self._last_push = now
+        try:
+            self._frames.put_nowait((now, frame.copy()))
+        except queue.Full:
+            self.skipped += 1
+
+    def trigger(self, person_id, now=None):
+        """Uyarı anını kaydeder; yakın zamanda bekleyen bir klip varsa kişi ona eklenir."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for clip in self._pending:
+                if now - clip['at'] <= self.post_seconds:
+                    clip['ids'].append(person_id)
+                    return
+            self._pending.append({'at': now, 'wall': time.time(), 'ids': [person_id]})
+
+    def close(self, timeout=10.0):
+        """Bekleyen klipleri eldeki karelerle yazar ve iş parçacıklarını durdurur."""
+        self._frames.put(None)
+        self._encoder.join(timeout)
+        self._clips.put(None)
+        self._writer.join(timeout)
+
+    # --- Kodlayıcı iş parçacığı ---
+    def _encode_loop(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        while True:
+            item = self._frames.get()
+            if item is None:
+                break
+            at, frame = item
+            h, w = frame.shape[:2]
+            if self.max_width and w > self.max_width:
+                frame = cv2.resize(frame, (self.max_width, int(h * self.max_width / w)),
+                                   interpolation=cv2.INTER_AREA)
+            ok, jpeg = cv2.imencode('.jpg', frame, params)
+            if not ok:
+                continue
+            data = jpeg.tobytes()
+            with self._lock:
+                self._ring.append((at, data))
+                self._ring_bytes += len(data)
+                # Süre ve bellek sınırı: bekleyen kliplerin öncesi en az pre_seconds korunur
+                keep_from = at - (self.pre_seconds + self.post_seconds)
+                while self._ring and (self._ring[0][0] < keep_from or self._ring_bytes > self.buffer_bytes):
+                    self._ring_bytes -= len(self._ring.popleft()[1])
+            self._flush(at)
+        self._flush(float('inf'))
+
+    def _flush(self, now):
+        """Sonrası tamamlanan klipleri yazıcıya gönderir."""
+        with self._lock:
+            ready, waiting = [], []
+            for clip in self._pending:
+                (ready if now >= clip['at'] + self.post_seconds else waiting).append(clip)
+            if not ready:
+                return
+            self._pending = waiting
+            for clip in ready:
+                start, end = clip['at'] - self.pre_seconds, clip['at'] + self.post_seconds
+                frames = [data for at, data in self._ring if start <= at <= end]
+                if frames:
+                    self._clips.put((clip, frames))
+
+    # --- Yazıcı iş parçacığı ---
+    def _write_loop(self):
+        while True:
+            item = self._clips.get()
+            if item is None:
+                break
+            clip, frames = item
+            try:
+                path = self._write_clip(clip, frames)
+            except Exception as e:
+                logging.error(f"[{self.camera}] İhlal klibi yazılamadı: {e}")
+                continue
+            self.saved += 1
+            self._enforce_disk_budget()
+            if self.on_saved is not None:
+                self.on_saved(path)
+
+    def _write_clip(self, clip, frames):
+        stamp = datetime.fromtimestamp(clip['wall']).strftime('%Y%m%d_%H%M%S')
+        ids = "-".join(str(person_id) for person_id in clip['ids'])
+        path = os.path.join(self.output_dir, f"{self.camera}_{stamp}_kisi{ids}{CLIP_EXTENSION}")
+        first = cv2.imdecode(np.frombuffer(frames[0], np.uint8), cv2.IMREAD_COLOR)
+        h, w = first.shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*CLIP_FOURCC), self.record_fps, (w, h))
+        try:
+            writer.write(first)
+            for data in frames[1:]:
+                writer.write(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+        finally:
+            writer.release()
+        return path
+
+    def _enforce_disk_budget(self):
+        clips = [entry for entry in os.scandir(self.output_dir)
+                 if entry.is_file() and entry.name.endswith(CLIP_EXTENSION)]
+        clips.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in clips)
+        for entry in clips[:-1]:  # En yeni klip her zaman kalır
+            if total <= self.disk_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
@@ -0,0 +1,109 @@
+"""
+İşçi iş parçacığından Qt arayüzüne kopyasız kare aktarımı.
+
+Kare, arayüz etiketinin gerçek boyutuna en-boy oranı korunarak işçide bir
+kez küçültülür ve önceden ayrılmış tamponlardan birine yazılır. QImage bu
+tamponu BGR888 biçiminde doğrudan sarar (BGR->RGB dönüşümü ve ek kopya
+yoktur). Tampon, arayüz kareyi çizip release() çağırana kadar başka bir kare
+için kullanılmaz; boş tampon yoksa (arayüz geride kalmışsa) kare ekrana
+gönderilmeden atlanır.
+
+İşçi her kareyi sinyalle göndermez: LatestFrameSlot'a yazar, arayüz bir
+QTimer ile sabit hızda (ör. 15 Hz) en son kareyi ve sayaçları çeker. Arayüz
+çekmeden üzerine yazılan kare havuza hemen geri verilir; böylece olay
+döngüsünde kare birikmez ve çıkarım hızı çizim hızıyla sınırlanmaz.
+"""
+import threading
+from collections import namedtuple
+
+import cv2
+import numpy as np
+from PyQt6.QtGui import QImage
+
+DisplayFrame = namedtuple('DisplayFrame', ['image', 'slot'])
+
+
+class FrameDisplayPool:
+    """Arayüze gönderilen kareler için yeniden kullanılan, sahiplik takipli tampon havuzu."""
+
+    def __init__(self, slots=3, target_size=(640, 480)):
+        self._lock = threading.Lock()
+        self._buffers = [None] * slots
+        self._free = list(range(slots))
+        self.target_size = target_size
+        self.dropped = 0  # Boş tampon olmadığı için ekrana gönderilmeyen kareler
+
+    def set_target_size(self, width, height):
+        """Arayüz iş parçacığından çağrılır; sonraki kareler bu boyuta sığdırılır."""
+        self.target_size = (max(1, int(width)), max(1, int(height)))
+
+    def fit_size(self, frame_shape):
+        h, w = frame_shape[:2]
+        target_w, target_h = self.target_size
+        scale = min(target_w / w, target_h / h)
+        return max(1, int(w * scale)), max(1, int(h * scale))
+
+    def render(self, frame):
+        """
+        BGR kareyi boş bir tampona sığdırıp onu saran DisplayFrame döndürür;
+        boş tampon yoksa None. Dönen kare arayüzde çizildikten sonra release()
+        ile geri verilmelidir.
+        """
+        with self._lock:
+            if not self._free:
+                self.dropped += 1
+                return None
+            slot = self._free.pop()
+        w, h = self.fit_size(frame.shape)
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.shape[:2] != (h, w):
+            # Sadece ilk karede ve etiket boyutu değiştiğinde ayrılır
+            buffer = self._buffers[slot] = np.empty((h, w, 3), dtype=np.uint8)
+        if frame.shape[:2] == (h, w):
+            np.copyto(buffer, frame)
+        else:
+            cv2.resize(frame, (w, h), dst=buffer, interpolation=cv2.INTER_AREA)
+        image = QImage(buffer.data, w, h, 3 * w, QImage.Format.Format_BGR888)
+        return DisplayFrame(image, slot)
+
+    def release(self, display_frame):
+        with self._lock:
+            self._free.append(display_frame.slot)
+
+
+class LatestFrameSlot:
+    """İşçinin yayınladığı en son kareyi ve sayaçları tutan tek elemanlı yuva."""
+
+    def __init__(self, display_pool):
+        self.display_pool = display_pool
+        self._lock = threading.Lock()
+        self._frame = None
+        self._counts = None
+        self.coalesced = 0  # Arayüz çekmeden yerine yenisi yazıldığı için gösterilmeyen kareler
+
+    def publish(self, display_frame=None, counts=None):
+        """İşçiden çağrılır; gösterilmemiş önceki kare havuza geri verilir."""
+        replaced = None
+        with self._lock:
+            if display_frame is not None:
+                replaced, self._frame = self._frame, display_frame
+            if counts is not None:
+                self._counts = counts
+        if replaced is not None:
+            self.coalesced += 1
+            self.display_pool.release(replaced)
+
+    def take(self):
+        """
+        Arayüz zamanlayıcısından çağrılır; son yayından beri yeni bir şey yoksa
+        (None, None). Dönen kare çizildikten sonra havuza release() edilmelidir.
+        """
+        with self._lock:
+            frame, counts = self._frame, self._counts
+            self._frame = self._counts = None
+        return frame, counts
+
+    def clear(self):
+        frame, _ = self.take()
+        if frame is not None:
+            self.display_pool.release(frame)
@@ -0,0 +1,46 @@
+"""
+Tespit kutularının kare üzerine çizimi.
+
+VideoThread ve kamera işçi süreçleri (process_mode.py) aynı çizimi üretsin
+diye ortak tutulur.
+"""
+import cv2
+
+# Renkler (BGR formatında)
+RENKLER = {
+    'takan': (0, 255, 0),
+    'takmayan': (0, 0, 255),
+    'unassigned': (128, 128, 128)
+}
+
+
+def draw_detections(frame, det, safe_text="GUVENLI", unsafe_text="TEHLIKE!",
+                    thickness=3, font_scale=0.8, label_unassigned=False):
+    """
+    Baret takanları yeşil baret kutusuyla, takmayanları kırmızı kişi kutusuyla,
+    hiçbir kişiye atanmamış baretleri gri kutuyla çizer (yerinde).
+    """
+    helmet_list = det.helmet_boxes.tolist()
+    for person_id, person_bbox, helmet_idx in zip(det.person_ids.tolist(), det.person_boxes.tolist(),
+                                                  det.person_helmet.tolist()):
+        if helmet_idx >= 0:
+            bbox = helmet_list[helmet_idx]
+            color = RENKLER['takan']
+            label = f"ID {person_id}: {safe_text}"
+        else:
+            bbox = person_bbox
+            color = RENKLER['takmayan']
+            label = f"ID {person_id}: {unsafe_text}"
+        cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), color, thickness)
+        cv2.putText(frame, label, (bbox[0], bbox[1] - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, 2)
+
+    unassigned = ~det.helmet_used
+    for helmet_id, bbox in zip(det.helmet_ids[unassigned].tolist(), det.helmet_boxes[unassigned].tolist()):
+        cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), RENKLER['unassigned'], 2)
+        if label_unassigned:
+            # Kırpıntı ve takipsiz modda ilişkisiz baretlerin ID'si yoktur (-1)
+            label = f"ID {helmet_id}: Iliskisiz Baret" if helmet_id >= 0 else "Iliskisiz Baret"
+            cv2.putText(frame, label, (bbox[0], bbox[1] - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, font_scale, RENKLER['unassigned'], 2)
+    return frame
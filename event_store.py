@@ -0,0 +1,211 @@
+"""
+İhlal olayları için yerel SQLite deposu.
+
+Tespit döngüsü olayları sadece bir kuyruğa bırakır (bloklamaz); ayrı bir
+yazıcı iş parçacığı kuyrukta biriken olayları tek işlemde (transaction)
+toplu olarak yazar. Veritabanı WAL kipindedir: birden fazla kamera süreci
+aynı dosyaya yazabilir, sorgular yazmaları beklemez.
+
+Her ihlal bir satırdır: uyarı anında başlangıç zamanı, kişi takip ID'si,
+kamera, kutu ve güvenle eklenir; ihlal bittiğinde bitiş zamanı ve süre
+güncellenir (bitmemiş ihlallerde end_time NULL'dır). Zamanlar Unix
+zamanıdır (saniye).
+
+Sorgu örnekleri:
+    python event_store.py --camera cam3 --last-days 7
+    python event_store.py --since 2026-10-01 --until 2026-10-08 --summary
+"""
+import argparse
+import contextlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+EVENT_DB = "ihlaller.db"
+MAX_BATCH = 500  # Tek işlemde yazılan en fazla olay
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY,
+    camera TEXT NOT NULL,
+    person_id INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    duration REAL,
+    x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS idx_violations_start ON violations (start_time);
+CREATE INDEX IF NOT EXISTS idx_violations_camera_start ON violations (camera, start_time);
+"""
+
+_INSERT = ("INSERT INTO violations (camera, person_id, start_time, x1, y1, x2, y2, confidence) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_END = ("UPDATE violations SET end_time = ?, duration = ? "
+        "WHERE camera = ? AND person_id = ? AND start_time = ? AND end_time IS NULL")
+
+
+def connect(path=EVENT_DB):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL ile güvenli; her işlemde fsync yapılmaz
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class EventStore:
+    """İhlal olaylarını arka plan iş parçacığında toplu olarak SQLite'a yazan depo."""
+
+    def __init__(self, path=EVENT_DB, max_batch=MAX_BATCH):
+        self.path = path
+        self.max_batch = max_batch
+        self.written = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="event-store", daemon=True)
+        self._thread.start()
+
+    @property
+    def queued(self):
+        """Yazıcının henüz veritabanına yazmadığı olay sayısı."""
+        return self._queue.qsize()
+
+    def violation_started(self, camera, person_id, start_time, bbox=None, confidence=None):
+        x1, y1, x2, y2 = (int(v) for v in bbox) if bbox is not None else (None,) * 4
+        self._queue.put(('start', (camera, int(person_id), float(start_time), x1, y1, x2, y2,
+                                   None if confidence is None else float(confidence))))
+
+    def violation_ended(self, camera, person_id, start_time, end_time):
+        self._queue.put(('end', (float(end_time), float(end_time - start_time), camera, int(person_id),
+                                 float(start_time))))
+
+    def close(self, timeout=5.0):
+        """Kuyrukta kalan olayları yazar ve yazıcıyı durdurur."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Yazıcı geride kaldıysa biriken olaylar tek işlemde yazılır
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            if batch:
+                self._write(conn, batch)
+        conn.close()
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                # Sıra korunur: aynı partide başlayıp biten ihlalin güncellemesi eklemeden sonra gelir
+                start = 0
+                while start < len(batch):
+                    kind = batch[start][0]
+                    end = start
+                    while end < len(batch) and batch[end][0] == kind:
+                        end += 1
+                    conn.executemany(_INSERT if kind == 'start' else _END,
+                                     [params for _, params in batch[start:end]])
+                    start = end
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            logging.error(f"İhlal olayları veritabanına yazılamadı ({len(batch)} olay): {e}")
+
+
+# --- Sorgular ---
+def _open_readonly(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _where(camera, since, until):
+    clauses, params = [], []
+    if camera is not None:
+        clauses.append("camera = ?")
+        params.append(camera)
+    if since is not None:
+        clauses.append("start_time >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("start_time < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query_violations(path=EVENT_DB, camera=None, since=None, until=None, limit=None):
+    """Zaman aralığındaki ihlalleri (yeniden eskiye) sözlük listesi olarak döndürür."""
+    where, params = _where(camera, since, until)
+    sql = f"SELECT * FROM violations{where} ORDER BY start_time DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    with contextlib.closing(_open_readonly(path)) as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
+
+
+def summarize(path=EVENT_DB, camera=None, since=None, until=None):
+    """Kamera başına ihlal sayısı, toplam ve ortalama süre (sadece bitmiş ihlallerin süresi)."""
+    where, params = _where(camera, since, until)
+    sql = (f"SELECT camera, COUNT(*) AS count, SUM(duration) AS total_duration, "
+           f"AVG(duration) AS mean_duration FROM violations{where} GROUP BY camera ORDER BY camera")
+    with contextlib.closing(_open_readonly(path)) as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
+
+
+def _parse_time(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İhlal olayları veritabanı sorgusu")
+    parser.add_argument('--db', default=EVENT_DB)
+    parser.add_argument('--camera', default=None)
+    parser.add_argument('--since', default=None, help="Başlangıç (ör. 2026-10-01 veya '2026-10-01 08:00')")
+    parser.add_argument('--until', default=None, help="Bitiş (hariç)")
+    parser.add_argument('--last-days', type=float, default=None, help="Son N gün (--since yerine)")
+    parser.add_argument('--summary', action='store_true', help="Kamera başına sayı ve süre özeti")
+    parser.add_argument('--limit', type=int, default=50, help="Listelenecek en fazla ihlal (0 = hepsi)")
+    args = parser.parse_args()
+
+    since = _parse_time(args.since) if args.since else None
+    if args.last_days is not None:
+        since = time.time() - args.last_days * 86400
+    until = _parse_time(args.until) if args.until else None
+
+    try:
+        if args.summary:
+            rows = summarize(args.db, args.camera, since, until)
+            print(f"{'Kamera':<16}{'İhlal':>8}{'Toplam sn':>12}{'Ort. sn':>10}")
+            for row in rows:
+                print(f"{row['camera']:<16}{row['count']:>8}{row['total_duration'] or 0:>12.0f}"
+                      f"{row['mean_duration'] or 0:>10.1f}")
+            return
+        rows = query_violations(args.db, args.camera, since, until, args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"Hata: '{args.db}' okunamadı: {e}")
+        return
+    print(f"{'Başlangıç':<20}{'Bitiş':<20}{'Kamera':<12}{'Kişi':>6}{'Süre sn':>9}{'Güven':>7}")
+    for row in rows:
+        duration = f"{row['duration']:.1f}" if row['duration'] is not None else "sürüyor"
+        confidence = f"{row['confidence']:.2f}" if row['confidence'] is not None else "-"
+        print(f"{_format_time(row['start_time']):<20}{_format_time(row['end_time']):<20}"
+              f"{row['camera']:<12}{row['person_id']:>6}{duration:>9}{confidence:>7}")
+
+
+if __name__ == "__main__":
+    main()
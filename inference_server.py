@@ -0,0 +1,246 @@
+"""
+Çok kameralı çıkarım sunucusu (kameralar arası dinamik toplama).
+
+Tek bir kişi modeli ve tek bir baret modeli yüklenir. Her kamera kaynağı
+register() ile bir CameraClient alır; istemci kareyi kendi iş parçacığında
+letterbox'lar ve ortak istek kuyruğuna bırakır. Sunucu iş parçacığı
+kuyruktan en fazla max_batch isteği, ilk istekten itibaren en fazla max_wait
+saniye bekleyerek toplar, her iki modeli tek bir toplu çağrıyla çalıştırır
+ve sonuçları kameranın kendi takipçi durumuyla işleyip o kameranın yanıt
+kuyruğuna yönlendirir.
+
+Kullanım (başsız deneme):
+    python inference_server.py --source 0 --source kamera2.mp4 --max-batch 8
+"""
+import argparse
+import queue
+import threading
+import time
+
+import torch
+
+from backends import BACKENDS, load_models
+from capture import LatestFrameCapture
+from live_config import CONFIG_FILE, camera_config
+from pipeline import DetectionPipeline, find_helmet_class_id
+
+
+class _Request:
+    __slots__ = ('client', 'lb', 'submitted')
+
+    def __init__(self, client, lb):
+        self.client = client
+        self.lb = lb
+        self.submitted = time.monotonic()
+
+
+class CameraClient:
+    """
+    Sunucuya kayıtlı tek bir kamera. detect() arayüzü DetectionPipeline.detect
+    ile aynıdır, bu yüzden VideoThread'ler tek başına hat yerine bunu kullanabilir.
+    """
+
+    def __init__(self, server, camera_id, pipeline):
+        self.server = server
+        self.camera_id = camera_id
+        self.pipeline = pipeline
+        self._replies = queue.Queue(maxsize=1)
+
+    def detect(self, frame, timeout=None):
+        lb = self.pipeline.letterbox.prepare(frame)
+        self.server._requests.put(_Request(self, lb))
+        ok, payload = self._replies.get(timeout=timeout)
+        if not ok:
+            raise payload
+        return payload
+
+    def close(self):
+        self.server.unregister(self.camera_id)
+
+
+class InferenceServer:
+    """Modellerin tek kopyasını tutan, kameralar arası toplu çıkarım yapan sunucu."""
+
+    def __init__(self, model_person, model_helmet, helmet_class_id, person_conf, helmet_conf,
+                 max_batch=8, max_wait=0.010, imgsz=640):
+        self.model_person = model_person
+        self.model_helmet = model_helmet
+        self.helmet_class_id = helmet_class_id
+        self.person_conf = person_conf
+        self.helmet_conf = helmet_conf
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.imgsz = imgsz
+
+        self._requests = queue.Queue()
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+        # İstatistikler
+        self.batches = 0
+        self.frames = 0
+        self.queue_wait_total = 0.0
+
+    @property
+    def mean_batch_size(self):
+        return self.frames / self.batches if self.batches else 0.0
+
+    @property
+    def mean_queue_wait(self):
+        return self.queue_wait_total / self.frames if self.frames else 0.0
+
+    def register(self, camera_id):
+        """Yeni bir kamera için ayrı letterbox tamponu ve takipçi durumu oluşturur."""
+        with self._lock:
+            if camera_id in self._clients:
+                raise ValueError(f"Kamera zaten kayıtlı: {camera_id}")
+            # Hatlar model nesnelerini paylaşır, sadece ön işleme ve takipçi kameraya özeldir.
+            # Farklı çözünürlükteki kameraların tensörleri birleştirilebilsin diye girdi karedir
+            pipeline = DetectionPipeline(self.model_person, self.model_helmet, self.helmet_class_id,
+                                         self.person_conf, self.helmet_conf, imgsz=self.imgsz,
+                                         square_input=True)
+            client = CameraClient(self, camera_id, pipeline)
+            self._clients[camera_id] = client
+            return client
+
+    def unregister(self, camera_id):
+        with self._lock:
+            self._clients.pop(camera_id, None)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="inference-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        # Bekleyen istemciler sonsuza kadar asılı kalmasın
+        while True:
+            try:
+                req = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            req.client._replies.put((False, RuntimeError("Çıkarım sunucusu durduruldu")))
+
+    def _collect_batch(self):
+        try:
+            first = self._requests.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _serve(self):
+        while self._running:
+            batch = self._collect_batch()
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        start = time.monotonic()
+        try:
+            tensor = torch.cat([req.lb.tensor for req in batch])
+            # Tüm kamera hatları aynı modelleri ve eşikleri paylaşır
+            head = batch[0].client.pipeline
+            results_person = head.predict_person(tensor)
+            results_helmet = head.predict_helmet(tensor)
+        except Exception as e:
+            for req in batch:
+                req.client._replies.put((False, e))
+            return
+
+        self.batches += 1
+        self.frames += len(batch)
+        for req, result_person, result_helmet in zip(batch, results_person, results_helmet):
+            self.queue_wait_total += start - req.submitted
+            try:
+                # Takipçi güncellemesi kameranın kendi durumuyla yapılır
+                det = req.client.pipeline.postprocess(result_person, result_helmet, req.lb)
+                req.client._replies.put((True, det))
+            except Exception as e:
+                req.client._replies.put((False, e))
+
+
+# --- Başsız çok kameralı deneme ---
+def _camera_loop(client, source, stats, stop_event):
+    cap = LatestFrameCapture(source)
+    if not cap.isOpened():
+        print(f"[HATA] Kaynak açılamadı: {source}")
+        return
+    cap.start()
+    while not stop_event.is_set():
+        success, frame = cap.read()
+        if not success:
+            break
+        det = client.detect(frame)
+        stats[client.camera_id]['frames'] += 1
+        stats[client.camera_id]['no_helmet'] += int((det.person_helmet < 0).sum())
+    cap.release()
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çok kameralı toplu çıkarım sunucusu")
+    parser.add_argument('--source', action='append', required=True,
+                        help="Kamera kaynağı (birden fazla kez verilebilir)")
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--max-wait-ms', type=float, default=10.0)
+    parser.add_argument('--backend', choices=('auto',) + BACKENDS, default='auto')
+    parser.add_argument('--config', default=CONFIG_FILE,
+                        help="Ayar dosyası; modeller kameralar arasında ortak olduğu için sadece 'defaults' okunur")
+    args = parser.parse_args()
+
+    config = camera_config(None, args.config)
+    model_person, model_helmet, backend = load_models(config['model_person_path'], config['model_helmet_path'],
+                                                      args.backend)
+    print(f"[BİLGİ] Çıkarım arka ucu: {backend}")
+    helmet_class_id = find_helmet_class_id(model_helmet)
+    if helmet_class_id is None:
+        print(f"Hata: '{config['model_helmet_path']}' içinde 'helmet' sınıfı bulunamadı.")
+        return
+
+    server = InferenceServer(model_person, model_helmet, helmet_class_id,
+                             config['person_conf'], config['helmet_conf'],
+                             max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000).start()
+    stop_event = threading.Event()
+    stats = {}
+    threads = []
+    for i, source in enumerate(args.source):
+        camera_id = f"cam{i}"
+        stats[camera_id] = {'frames': 0, 'no_helmet': 0}
+        client = server.register(camera_id)
+        t = threading.Thread(target=_camera_loop, args=(client, source, stats, stop_event), daemon=True)
+        t.start()
+        threads.append(t)
+
+    start = time.monotonic()
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(5)
+            elapsed = time.monotonic() - start
+            per_camera = ", ".join(f"{cid}: {s['frames'] / elapsed:.1f} FPS" for cid, s in stats.items())
+            print(f"[BİLGİ] {per_camera} | ortalama batch: {server.mean_batch_size:.2f}, "
+                  f"kuyruk bekleme: {server.mean_queue_wait * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        stop_event.set()
+        for t in threads:
+            t.join()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
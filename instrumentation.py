@@ -0,0 +1,103 @@
+"""
+Sıcak yol için hafif aşama zamanlayıcısı.
+
+Döngü her karenin başında begin() çağırır; her aşamanın sonunda lap(ad)
+son lap'ten beri geçen süreyi o aşamaya ekler, karenin sonunda commit()
+kare başına toplamları aşama başına sabit boyutlu halka tampona yazar. Aynı
+aşama bir karede birden fazla kez lap'lenebilir (toplanır). Kapalıyken
+(enabled=False) lap() tek bir öznitelik kontrolüyle döner; zamanlayıcı kare
+ortasında açılırsa ölçüm bir sonraki begin() ile başlar.
+
+DetectionPipeline kendi iç aşamalarını (letterbox, modeller, takip, kutu
+çıkarma, eşleştirme) aynı zamanlayıcıya yazar; döngüyü çalıştıran taraf
+kod çözme, çizim gibi dış aşamaları ekler. loop_diagnostics, aşama özetini
+yakalama sayaçları ve kuyruk derinlikleriyle birlikte tanılama paneline
+(süreç modunda kayıt kuyruğuna) gönderilecek sözlükte toplar.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+# Raporlardaki aşama sırası; listede olmayan aşamalar sona eklenir
+STAGE_ORDER = (
+    'capture', 'decode', 'motion_gate', 'letterbox', 'person_model', 'helmet_model',
+    'tracking', 'extract', 'association', 'violations', 'draw', 'clip', 'ring_write', 'qimage', 'ui_paint',
+)
+
+
+class StageTimer:
+    def __init__(self, window=300, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._samples = {}
+        self._current = {}
+        self._last = 0.0
+        self._frame_open = False
+
+    def begin(self):
+        self._frame_open = self.enabled
+        if self._frame_open:
+            self._current.clear()
+            self._last = time.perf_counter()
+
+    def lap(self, stage):
+        if not self._frame_open:
+            return
+        now = time.perf_counter()
+        self._current[stage] = self._current.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def commit(self):
+        if not self._frame_open:
+            return
+        self._frame_open = False
+        for stage, seconds in self._current.items():
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+        self._current.clear()
+
+    def reset(self):
+        self._samples.clear()
+        self._current.clear()
+        self._frame_open = False
+
+    def stages(self):
+        known = [stage for stage in STAGE_ORDER if stage in self._samples]
+        return known + sorted(stage for stage in self._samples if stage not in STAGE_ORDER)
+
+    def summary(self, percentiles=(50, 95)):
+        """{aşama: {'p50': ms, 'p95': ms, 'mean': ms, 'n': örnek}} (pencere içindeki kareler)."""
+        result = {}
+        for stage in self.stages():
+            samples = np.fromiter(self._samples[stage], dtype=np.float64) * 1000
+            row = {f"p{q}": float(v) for q, v in zip(percentiles, np.percentile(samples, percentiles))}
+            row['mean'] = float(samples.mean())
+            row['n'] = len(samples)
+            result[stage] = row
+        return result
+
+
+def loop_diagnostics(timer, cap, store=None, recorder=None):
+    """
+    Tanılama paneli için anlık görüntü: aşama özeti, yakalama sayaçları
+    (capture.LatestFrameCapture) ve arka plan kuyruklarının derinlikleri.
+    Sadece düz tür içerir; süreçler arası kuyruktan gönderilebilir.
+    """
+    queues = {'yakalama': cap.queued}
+    if store is not None:
+        queues['olay'] = store.queued
+    if recorder is not None:
+        queues['klip kare'] = recorder.queued_frames
+        queues['klip yazma'] = recorder.queued_clips
+    return {
+        'stages': timer.summary(),
+        'capture_age_ms': cap.last_age * 1000,
+        'dropped': cap.frames_dropped,
+        'captured': cap.frames_captured,
+        'reconnects': cap.reconnects,
+        'stall_s': cap.stall_seconds,
+        'queues': queues,
+    }
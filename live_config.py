@@ -0,0 +1,250 @@
+"""
+Kamera başına, çalışırken yeniden yüklenen YAML yapılandırması.
+
+Dosyada 'defaults' bölümü tüm kameralara, 'cameras' altındaki bölüm sadece o
+kameraya uygulanır; verilmeyen ayarlar tüm ön uçların (arayüzler, süreç modu,
+sunucu ve ölçüm araçları) paylaştığı DEFAULTS'tan gelir:
+
+    defaults:
+      person_conf: 0.25
+      helmet_conf: 0.80
+      warn_after: 10
+    cameras:
+      cam0:
+        helmet_conf: 0.70
+        top_percentage: 0.35
+        model_helmet_path: best_v2.pt
+
+ConfigWatcher dosyanın değişme zamanını arka plan iş parçacığında yoklar;
+değişiklik okunup doğrulandığında on_change(config, changed) çağrılır.
+Hatalı bir dosya loglanır ve son geçerli ayarlar kullanılmaya devam eder.
+ConfigApplier değişiklikleri işleme döngüsünde karelerin arasında uygular:
+LIVE_KEYS çalışan hatta ve ihlal zamanlayıcısına doğrudan uygulanır (ağırlıklar
+yeniden yüklenmez, takipçiler sıfırlanmaz); MODEL_KEYS değişince yeni
+ağırlıklar model havuzunda arka planda yüklenip hazır olunca hatta takılır.
+"""
+import functools
+import logging
+import os
+import threading
+
+import yaml
+
+from association import TOP_PERCENTAGE
+
+CONFIG_FILE = "kameralar.yaml"
+POLL_INTERVAL = 1.0  # Dosya değişikliğinin yoklanma aralığı (sn)
+DEFAULT_CAMERA = "cam0"
+
+# Dosyada verilmeyen ayarlar; tüm ön uçlar bu değerleri paylaşır
+DEFAULTS = {
+    'model_person_path': 'yolov8n.pt',
+    'model_helmet_path': 'best.pt',
+    'person_conf': 0.25,
+    'helmet_conf': 0.80,
+    'warn_after': 10,  # saniye
+    'top_percentage': TOP_PERCENTAGE,
+}
+
+LIVE_KEYS = ('person_conf', 'helmet_conf', 'warn_after', 'top_percentage')
+MODEL_KEYS = ('model_person_path', 'model_helmet_path')
+
+# Ayar -> (tür, en küçük, en büyük); yollar için sınır yok
+_SCHEMA = {
+    'person_conf': (float, 0.0, 1.0),
+    'helmet_conf': (float, 0.0, 1.0),
+    'warn_after': (float, 0.0, None),
+    'top_percentage': (float, 0.0, 1.0),
+    'model_person_path': (str, None, None),
+    'model_helmet_path': (str, None, None),
+}
+
+
+def _warn(message, level):
+    logging.warning(message)
+
+
+def _validate(section, values):
+    if not isinstance(values, dict):
+        raise ValueError(f"'{section}' bölümü anahtar: değer eşlemesi olmalı")
+    checked = {}
+    for key, value in values.items():
+        if key not in _SCHEMA:
+            raise ValueError(f"'{section}' içinde bilinmeyen ayar: {key} (geçerli: {', '.join(_SCHEMA)})")
+        kind, low, high = _SCHEMA[key]
+        if kind is float:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'{section}.{key}' sayı olmalı: {value!r}")
+            value = float(value)
+            if (low is not None and value < low) or (high is not None and value > high):
+                raise ValueError(f"'{section}.{key}' aralık dışında: {value}")
+        elif not isinstance(value, str) or not value:
+            raise ValueError(f"'{section}.{key}' dosya yolu olmalı: {value!r}")
+        checked[key] = value
+    return checked
+
+
+def load_camera_config(path, camera, defaults):
+    """
+    defaults üzerine dosyanın 'defaults' ve 'cameras.<camera>' bölümlerini uygular;
+    camera None ise (kameralar arası ortak araçlar) sadece 'defaults' uygulanır.
+    Dosya yoksa defaults döner; dosya hatalıysa ValueError yükseltir.
+    """
+    config = dict(defaults)
+    if not path or not os.path.exists(path):
+        return config
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(f"'{path}' okunamadı: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError(f"'{path}' en üst seviyede 'defaults' ve 'cameras' bölümleri içermeli")
+    config.update(_validate('defaults', data.get('defaults') or {}))
+    cameras = data.get('cameras') or {}
+    if not isinstance(cameras, dict):
+        raise ValueError("'cameras' bölümü kamera adı: ayarlar eşlemesi olmalı")
+    if camera is not None:
+        config.update(_validate(f"cameras.{camera}", cameras.get(camera) or {}))
+    return config
+
+
+def camera_config(camera=DEFAULT_CAMERA, path=CONFIG_FILE, defaults=DEFAULTS, log=None):
+    """Kameranın ayarları; dosya hatalıysa hata loglanır ve defaults döner."""
+    try:
+        return load_camera_config(path, camera, defaults)
+    except ValueError as e:
+        (log or _warn)(f"Yapılandırma hatası, sabitler kullanılıyor: {e}", "ERROR")
+        return dict(defaults)
+
+
+class ConfigWatcher:
+    """Yapılandırma dosyasını yoklayıp geçerli değişiklikleri bildiren izleyici."""
+
+    def __init__(self, camera, defaults, on_change, path=CONFIG_FILE, interval=POLL_INTERVAL, log=None):
+        self.camera = camera
+        self.defaults = defaults
+        self.on_change = on_change  # İzleyici iş parçacığından (config, değişen anahtarlar) ile çağrılır
+        self.path = path
+        self.interval = interval
+        self.log = log or _warn
+        self._mtime = self._stat()
+        self.config = camera_config(camera, path, defaults, self.log)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"config-{self.camera}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def check(self):
+        """Dosya değiştiyse yeniden okur; değişen anahtarları döndürür (yoksa boş)."""
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return []
+        self._mtime = mtime
+        try:
+            config = load_camera_config(self.path, self.camera, self.defaults)
+        except ValueError as e:
+            self.log(f"Yapılandırma uygulanmadı, önceki ayarlar geçerli: {e}", "ERROR")
+            return []
+        changed = [key for key in config if config[key] != self.config.get(key)]
+        if changed:
+            self.config = config
+            self.on_change(config, changed)
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+class ConfigApplier:
+    """
+    İzleyiciden gelen ayarları bekletip işleme döngüsünde karelerin arasında
+    uygular. pool (model_pool.ModelPool) verilirse model yolları değişince yeni
+    ağırlıklar havuzda arka planda yüklenir; verilmezse sadece LIVE_KEYS uygulanır.
+    """
+
+    def __init__(self, pool=None, log=None):
+        self.pool = pool
+        self.log = log or _warn
+        # İzleyici ve model yükleyici iş parçacıkları buraya yazar, döngü apply() ile uygular
+        self._lock = threading.Lock()
+        self._pending_config = None
+        self._pending_models = None
+        self._loading_paths = None
+
+    @property
+    def pending(self):
+        return self._pending_config is not None or self._pending_models is not None
+
+    def on_change(self, config, changed):
+        # ConfigWatcher iş parçacığından çağrılır
+        self.log("Yapılandırma güncellendi: " + ", ".join(f"{key}={config[key]}" for key in changed), "INFO")
+        if self.pool is None and any(key in MODEL_KEYS for key in changed):
+            self.log("Model yolu değişikliği yeniden başlatınca uygulanır", "WARNING")
+        self.request(config)
+
+    def request(self, config):
+        with self._lock:
+            self._pending_config = config
+            if self.pool is None:
+                return
+            paths = (config['model_person_path'], config['model_helmet_path'])
+            if paths == (self.pool.model_person_path, self.pool.model_helmet_path):
+                if self._loading_paths is not None:
+                    # Dosya çalışan modellere geri döndü; süren yükleme atılır
+                    self.pool.cancel_replacement()
+                    self._loading_paths = None
+            elif paths != self._loading_paths:
+                # Ağırlıklar arka planda yüklenir; hat bu sırada eski modellerle çalışmaya devam eder.
+                # Yeni istek, süren eski yüklemeyi geçersiz kılar
+                self._loading_paths = paths
+                self.pool.load_replacement(*paths, functools.partial(self._models_loaded, paths))
+
+    def _models_loaded(self, paths, replacement, error):
+        # Yükleme iş parçacığından çağrılır. Havuzun eskime kontrolüyle bu çağrı arasında
+        # yeni bir yükleme istenmiş olabilir; o zaman sonuç da durum da ona aittir
+        with self._lock:
+            if paths != self._loading_paths:
+                return
+            self._loading_paths = None
+            if error is None:
+                self._pending_models = replacement
+        if error is not None:
+            self.log(f"Yeni modeller yüklenemedi, eski modellerle devam ediliyor: {error}", "ERROR")
+
+    def apply(self, pipeline, violations):
+        """Bekleyen ayarları ve modelleri uygular; takipçiler sıfırlanmaz."""
+        with self._lock:
+            config, self._pending_config = self._pending_config, None
+            replacement, self._pending_models = self._pending_models, None
+        if config is not None:
+            pipeline.person_conf = config['person_conf']
+            pipeline.helmet_conf = config['helmet_conf']
+            pipeline.top_percentage = config['top_percentage']
+            violations.warn_after = config['warn_after']
+        # Havuz yolları sadece burada, modeller gerçekten takılınca güncellenir
+        if replacement is not None and self.pool.commit_replacement(pipeline, replacement):
+            self.log("Yeni modeller devreye alındı", "SUCCESS")
+
+    def close(self):
+        """Takılmayacak yüklemeyi atar; havuz çalışan modellerin yollarını bildirmeye devam eder."""
+        with self._lock:
+            if self.pool is not None and (self._loading_paths is not None or self._pending_models is not None):
+                self.pool.cancel_replacement()
+                self._loading_paths = None
+                self._pending_models = None
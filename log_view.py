@@ -0,0 +1,40 @@
+"""
+Uzun oturumlarda yavaşlamayan log konsolu.
+
+QTextEdit'e her mesajın HTML olarak eklenmesi, saatler içinde on binlerce
+zengin metin bloğu biriktirir. LogView bir QPlainTextEdit'tir: en fazla
+max_blocks satır tutar (eskiler baştan silinir), satırları HTML ayrıştırmadan
+düz metin olarak ekler ve sadece renk verilen seviyeler için karakter biçimi
+uygular. Kullanıcı yukarı kaydırmışsa yeni satırlar görünümü aşağı çekmez.
+"""
+from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor
+from PyQt6.QtWidgets import QPlainTextEdit
+
+LOG_VIEW_MAX_BLOCKS = 2000
+
+
+class LogView(QPlainTextEdit):
+    """Satır sayısı sınırlı, seviyeye göre renklendiren salt okunur log konsolu."""
+
+    def __init__(self, max_blocks=LOG_VIEW_MAX_BLOCKS, level_colors=None, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_blocks)
+        self._plain = QTextCharFormat()
+        self._formats = {}
+        for level, color in (level_colors or {}).items():
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            self._formats[level] = text_format
+
+    def append_line(self, text, level=None):
+        scrollbar = self.verticalScrollBar()
+        follow = scrollbar.value() >= scrollbar.maximum() - 4
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not self.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText(text, self._formats.get(level, self._plain))
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
@@ -0,0 +1,129 @@
+"""
+Arayüzü bekletmeyen log dosyası kurulumu.
+
+Kök logger'a sadece bir QueueHandler takılır: logging.info() çağrısı kaydı
+kuyruğa bırakıp hemen döner. Dosyaya yazma, döndürme (boyut ya da süre
+dolunca) ve eski dosyaların gzip ile sıkıştırılması QueueListener'ın kendi
+iş parçacığında yapılır; 24 saatlik bir oturumda bile arayüz ve işçi iş
+parçacıkları disk beklemez.
+
+Kamera işçi süreçleri (process_mode.py) dosyaya kendileri yazmaz: kök
+logger'larını setup_worker_logging() ile bir süreçler arası kuyruğa bağlar,
+ana süreçteki start_worker_log_listener() kayıtları buradaki yapılandırmaya
+aktarır. Böylece aynı dosyayı tek bir süreç yazar ve döndürür.
+
+Seviyeler arayüzden metin olarak ("INFO", "SUCCESS", "WARNING", "ERROR",
+"CRITICAL") gelir ve LOG_LEVELS ile doğrudan logging seviyesine çevrilir;
+mesaj içeriği taranmaz.
+"""
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] - %(message)s"
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Bu boyutu aşan dosya döndürülür
+LOG_BACKUP_COUNT = 14  # Saklanan en fazla sıkıştırılmış eski dosya
+LOG_ROTATE_SECONDS = 24 * 3600  # Boyut dolmasa da en fazla bu sürede bir döndürülür
+
+LOG_LEVELS = {
+    "INFO": logging.INFO,
+    "SUCCESS": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+_listener = None
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Boyut ya da süre dolunca dönen, eski dosyaları .gz olarak saklayan dosya yöneticisi."""
+
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                 rotate_seconds=LOG_ROTATE_SECONDS, encoding='utf-8'):
+        super().__init__(filename, mode='a', maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.rotate_seconds = rotate_seconds
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotator
+        self._rollover_at = self._next_rollover()
+
+    def _next_rollover(self):
+        return time.time() + self.rotate_seconds if self.rotate_seconds else float('inf')
+
+    def shouldRollover(self, record):
+        if time.time() >= self._rollover_at:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return True
+            self._rollover_at = self._next_rollover()  # Boş dosya döndürülmez
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._rollover_at = self._next_rollover()
+
+
+class _ForwardHandler(logging.Handler):
+    """Başka bir süreçten gelen kaydı bu sürecin logger'larına aktarır."""
+
+    def emit(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def log_event(message, level):
+    """Arayüz seviyesindeki mesajı karşılık gelen logging seviyesiyle yazar."""
+    logging.log(LOG_LEVELS.get(level, logging.INFO), message)
+
+
+def setup_logging(path="is_guvenligi.log", level=logging.INFO, max_bytes=LOG_MAX_BYTES,
+                  backup_count=LOG_BACKUP_COUNT, rotate_seconds=LOG_ROTATE_SECONDS):
+    """
+    Kök logger'ı kuyruk üzerinden arka plan dosya yazıcısına bağlar (bir kez).
+    Süreç kapanırken kuyrukta kalan kayıtlar dosyaya yazılır.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    file_handler = CompressingRotatingFileHandler(path, max_bytes, backup_count, rotate_seconds)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    if logger.hasHandlers():
+        logger.handlers.clear()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def start_worker_log_listener(log_queue):
+    """İşçi süreçlerin log_queue'ya bıraktığı kayıtları ana sürecin loglarına aktarır."""
+    listener = logging.handlers.QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def setup_worker_logging(log_queue, level=logging.INFO):
+    """İşçi süreçte kök logger'ı sadece ana sürece giden kuyruğa bağlar (dosya açılmaz)."""
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    logger.handlers.clear()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
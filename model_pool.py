@@ -0,0 +1,181 @@
+"""
+Uygulama ömrü boyunca bir kez yüklenen model havuzu.
+
+Arayüz açılırken kişi ve baret modelleri arka planda yüklenir ve sahte bir
+kareyle ısıtılır (ilk çıkarımdaki tembel başlatmalar burada ödenir). Her yeni
+VideoThread acquire() ile aynı DetectionPipeline'ı alır; kaynak değiştirirken
+sadece takipçi ve taşıma durumu sıfırlanır, ağırlıklar diskten yeniden
+okunmaz.
+
+torch ve ultralytics bu modülün içe aktarılmasıyla değil, yükleme iş
+parçacığında içe aktarılır; böylece arayüz penceresi bu ağır içe aktarmaları
+beklemeden açılır.
+
+Çalışırken model yolları değişirse load_replacement() yeni ağırlıkları ayrı
+bir iş parçacığında yükleyip ısıtır; çalışan hat bu sırada eski modellerle
+devam eder ve hazır olunca commit_replacement() ile geçer. Her yükleme bir
+nesil numarası alır; arada yeni bir yükleme istenir ya da iptal edilirse
+eskiyen yükleme atılır. Havuzun model yolları sadece modeller gerçekten hatta
+takıldığında güncellenir.
+"""
+import threading
+
+import numpy as np
+
+from startup import PROFILE
+
+
+class ModelPool:
+    """Modelleri bir kez yükleyip tek tespit hattını kaynaklar arasında yeniden kullandırır."""
+
+    def __init__(self, model_person_path, model_helmet_path, person_conf, helmet_conf,
+                 backend='auto', pipeline_kwargs=None, warmup_shape=(720, 1280, 3), log=print,
+                 on_ready=None):
+        self.model_person_path = model_person_path
+        self.model_helmet_path = model_helmet_path
+        self.person_conf = person_conf
+        self.helmet_conf = helmet_conf
+        self.backend = backend
+        self.pipeline_kwargs = pipeline_kwargs or {}
+        self.warmup_shape = warmup_shape
+        self.log = log
+        self.on_ready = on_ready  # Yükleme bitince (hata ya da None) ile çağrılır
+
+        self.pipeline = None
+        self.error = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._generation = 0  # Son istenen yeniden yüklemenin numarası
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Modelleri arka plan iş parçacığında yüklemeye başlar (bir kez)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="model-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            self.log("Çıkarım kütüphaneleri içe aktarılıyor...")
+            # Ağır içe aktarmalar açılış profilinde ayrı ayrı görünsün diye tek tek yapılır
+            import torch
+            PROFILE.mark("torch içe aktarıldı")
+            import ultralytics
+            PROFILE.mark("ultralytics içe aktarıldı")
+
+            from backends import load_models
+            from pipeline import DetectionPipeline, find_helmet_class_id
+            PROFILE.mark("hat modülleri içe aktarıldı")
+
+            self.log(f"Modeller yükleniyor (arka uç: {self.backend})...")
+            model_person, model_helmet, backend = load_models(
+                self.model_person_path, self.model_helmet_path, self.backend, log=self.log)
+            PROFILE.mark(f"modeller yüklendi ({backend})")
+            self.backend = backend
+            helmet_class_id = find_helmet_class_id(model_helmet)
+            if helmet_class_id is None:
+                raise ValueError(f"'{self.model_helmet_path}' içinde 'helmet' sınıfı bulunamadı. "
+                                 f"Bulunanlar: {model_helmet.names}")
+            pipeline = DetectionPipeline(model_person, model_helmet, helmet_class_id,
+                                         self.person_conf, self.helmet_conf, **self.pipeline_kwargs)
+            # Isıtma: ilk çıkarımın soğuk başlangıç maliyeti kullanıcı beklerken ödenmesin
+            pipeline.detect(np.zeros(self.warmup_shape, dtype=np.uint8))
+            pipeline.reset()
+            PROFILE.mark("ısıtma çıkarımı bitti")
+            self.pipeline = pipeline
+            self.log(f"Modeller yüklendi ve ısıtıldı (arka uç: {backend})")
+            if PROFILE.enabled:
+                report = PROFILE.report()
+                print(report)
+                self.log("Açılış profili:\n" + report)
+        except Exception as e:
+            self.error = e
+            self.log(f"Model yükleme hatası: {e}")
+        finally:
+            self._ready.set()
+            if self.on_ready is not None:
+                self.on_ready(self.error)
+
+    def load_replacement(self, model_person_path, model_helmet_path, on_done):
+        """
+        Yeni ağırlıkları arka planda yükleyip ısıtır. Bitince on_done(replacement, None)
+        ya da hata olursa on_done(None, hata) yükleme iş parçacığından çağrılır;
+        replacement commit_replacement() ile hatta takılır. Bu arada daha yeni bir
+        yükleme istenmişse ya da iptal edilmişse on_done hiç çağrılmaz.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        def load():
+            try:
+                from backends import load_models
+                from pipeline import DetectionPipeline, find_helmet_class_id
+
+                self.log(f"Yeni modeller yükleniyor: {model_person_path}, {model_helmet_path}")
+                model_person, model_helmet, _ = load_models(model_person_path, model_helmet_path,
+                                                            self.backend, log=self.log)
+                helmet_class_id = find_helmet_class_id(model_helmet)
+                if helmet_class_id is None:
+                    raise ValueError(f"'{model_helmet_path}' içinde 'helmet' sınıfı bulunamadı. "
+                                     f"Bulunanlar: {model_helmet.names}")
+                # Isıtma ayrı bir hatta yapılır; çalışan hattın takipçisine dokunulmaz
+                warmup = DetectionPipeline(model_person, model_helmet, helmet_class_id,
+                                           self.person_conf, self.helmet_conf,
+                                           **dict(self.pipeline_kwargs, motion_gate=None))
+                warmup.detect(np.zeros(self.warmup_shape, dtype=np.uint8))
+            except Exception as e:
+                if self._is_current(generation):
+                    on_done(None, e)
+                return
+            if not self._is_current(generation):
+                self.log(f"Eskimiş model yüklemesi atıldı: {model_person_path}, {model_helmet_path}")
+                return
+            on_done((generation, model_person_path, model_helmet_path,
+                     (model_person, model_helmet, helmet_class_id)), None)
+
+        thread = threading.Thread(target=load, name="model-pool-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def _is_current(self, generation):
+        with self._lock:
+            return generation == self._generation
+
+    def cancel_replacement(self):
+        """Süren ya da takılmayı bekleyen yeniden yüklemeyi geçersiz kılar."""
+        with self._lock:
+            self._generation += 1
+
+    def commit_replacement(self, pipeline, replacement):
+        """
+        Yüklenen modelleri hatta takar ve havuzun model yollarını günceller.
+        Yükleme bu arada eskidiyse hiçbir şey yapmaz ve False döndürür.
+        """
+        generation, model_person_path, model_helmet_path, models = replacement
+        with self._lock:
+            if generation != self._generation:
+                return False
+            pipeline.swap_models(*models)
+            self.model_person_path = model_person_path
+            self.model_helmet_path = model_helmet_path
+            return True
+
+    def acquire(self, timeout=None):
+        """
+        Yükleme bitene kadar bekler ve durumu sıfırlanmış hattı döndürür.
+        Yükleme başarısız olduysa hatayı yeniden yükseltir.
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Modeller henüz yüklenmedi")
+        if self.error is not None:
+            raise self.error
+        with self._lock:
+            self.pipeline.reset()
+            return self.pipeline
@@ -0,0 +1,80 @@
+"""
+Hareket kapısı: sahne değişmediğinde model çağrılarını atlar.
+
+Kare küçültülüp griye çevrilir ve en son *işlenen* karenin küçük kopyasıyla
+farkı alınır (bir önceki kareyle değil; böylece yavaş değişimler de birikip
+yakalanır). Değişen piksel oranı eşiğin altındaysa kare atlanır ve hat son
+sonuçları ile takipçi durumunu olduğu gibi kullanır. Kadrajda hareketsiz
+duran baretsiz bir kişi kaçmasın diye en fazla max_skip kare üst üste
+atlanır, ardından yenileme zorlanır.
+"""
+import cv2
+
+
+class MotionGate:
+    def __init__(self, width=160, pixel_threshold=25, min_changed_ratio=0.002, max_skip=15):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.max_skip = max_skip
+
+        self._size = None
+        self._small = None
+        self._gray = None
+        self._reference = None
+        self._diff = None
+        self._skipped_in_row = 0
+
+        self.frames = 0
+        self.skipped = 0
+
+    @property
+    def skipped_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def _allocate(self, frame_shape):
+        h, w = frame_shape[:2]
+        small_w = min(self.width, w)
+        small_h = max(1, int(round(h * small_w / w)))
+        self._size = (frame_shape[:2], (small_w, small_h))
+        self._small = None
+        self._gray = None
+        self._reference = None
+        self._diff = None
+
+    def should_process(self, frame):
+        """Kare modellerden geçirilmeli ise True, son sonuçlar yeterliyse False."""
+        self.frames += 1
+        if self._size is None or self._size[0] != frame.shape[:2]:
+            self._allocate(frame.shape)
+        small_size = self._size[1]
+
+        # Tamponlar ilk karede ayrılır, sonra dst ile yeniden kullanılır
+        self._small = cv2.resize(frame, small_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        self._gray = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        self._gray = cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._gray)
+
+        if self._reference is None:
+            return self._accept()
+
+        self._diff = cv2.absdiff(self._gray, self._reference, dst=self._diff)
+        _, self._diff = cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+        changed_ratio = cv2.countNonZero(self._diff) / self._diff.size
+
+        if changed_ratio >= self.min_changed_ratio or self._skipped_in_row >= self.max_skip:
+            return self._accept()
+        self._skipped_in_row += 1
+        self.skipped += 1
+        return False
+
+    def _accept(self):
+        # İşlenen kare yeni referans olur; tamponlar kopyalanmadan yer değiştirir
+        self._gray, self._reference = self._reference, self._gray
+        self._skipped_in_row = 0
+        return True
+
+    def reset(self):
+        self._reference = None
+        self._skipped_in_row = 0
+        self.frames = 0
+        self.skipped = 0
@@ -0,0 +1,337 @@
+"""
+Çift modelli tespit hattı.
+
+Kareyi LetterboxPool ile tek sefer hazırlar, aynı tensörü kişi (yolov8n.pt) ve
+baret (best.pt) modellerine verir, kutuları bir kez kare koordinatlarına
+çevirir ve association modülüyle kişi-baret eşleştirmesini yapar. Ön uçlar
+(son.py, ArayuzIsGuvenligi.py, İsGüvenligi.py) sadece Detections dizilerini
+çizer ve ihlal zamanlayıcısını yürütür.
+
+Modeller sadece tespit (predict) yapar; takip ID'leri hattın kendi
+TrackerState'inden gelir. Böylece aynı model nesneleri birden fazla kamera
+hattı arasında paylaşılabilir (bkz. inference_server.py).
+
+helmet_stride > 1 iken baret modeli sadece her N karede bir çalışır; aradaki
+karelerde son eşleşen baretler, sahibi olan kişinin takip kutusunun yer
+değiştirmesi kadar kaydırılarak taşınır (kişi modeli her karede çalışır).
+
+helmet_mode='crop' iken baret modeli tüm kareyi taramaz: her kişi kutusunun
+üst (omuz) bandı dolgu payıyla orijinal kareden kesilir, kırpıntılar küçük bir
+imgsz ile tek toplu çağrıda baret modeline verilir ve tespitler kare
+koordinatlarına geri taşınır. Kırpıntı modunda baretler takip edilmez.
+
+helmet_mode='tiled' yüksek çözünürlüklü (4K) kameralar içindir: kare,
+tile_overlap oranında örtüşen tile_size boyutlu karolara bölünür ve karolar
+küçültülmeden tek toplu çağrıda baret modeline verilir; böylece uzaktaki
+küçük baretler tam kare girdisinde birkaç piksele inmez. Karo sınırında iki
+karoya bölünen baretler NMS'te hem IoU hem de "küçük kutunun içinde kalma"
+oranıyla elenir. tile_persons_only=True iken sadece bir kişinin baş bölgesine
+değen karolar çalıştırılır. Karo modunda da baretler takip edilmez.
+
+track_helmets=False iken baretler için ikinci bir takipçi çalışmaz: baretler
+kare başına tespittir (takipçinin henüz ID vermediği baretler de eşleştirmeye
+girer) ve baretin kimliği atandığı kişinin takip ID'sidir. Kırpıntı modunda
+ve takipsiz modda kimsenin kafasında olmayan baretlerin ID'si -1'dir.
+
+motion_gate verilirse (motion.MotionGate) sahne değişmeyen karelerde modeller
+hiç çalışmaz; son Detections ve takipçi durumu olduğu gibi kullanılır.
+
+Hat, iç aşamalarının sürelerini self.timer'a (instrumentation.StageTimer)
+yazar; varsayılan zamanlayıcı kapalıdır ve maliyeti yok denecek kadar azdır.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from association import TOP_PERCENTAGE, associate, empty_boxes, extract_boxes, nms
+from instrumentation import StageTimer
+from preprocess import LetterboxPool
+from tracking import DEFAULT_TRACKER_CFG, TrackerState
+
+# COCO modelinde 'person' sınıfı her zaman 0'dır
+PERSON_CLASS_ID = 0
+
+HELMET_MODES = ('full', 'crop', 'tiled')
+
+Detections = namedtuple('Detections', [
+    'person_boxes', 'person_ids', 'person_confs',
+    'helmet_boxes', 'helmet_ids', 'helmet_confs',
+    'person_helmet', 'helmet_used',
+])
+
+
+def find_helmet_class_id(model_helmet, class_name='helmet'):
+    """Baret modelindeki 'helmet' sınıfının ID'sini döndürür (bulunamazsa None)."""
+    for class_id, name in model_helmet.names.items():
+        if name == class_name:
+            return class_id
+    return None
+
+
+def head_regions(person_boxes, frame_shape, top_percentage=TOP_PERCENTAGE, padding=0.25):
+    """
+    Kişi kutularının üst bandını (baret merkezinin aranacağı bölge) dolgu
+    payıyla genişletip kareye kırparak (N, 4) int32 bölgeler döndürür.
+    """
+    boxes = np.asarray(person_boxes, dtype=np.float32).reshape(-1, 4)
+    band_h = (boxes[:, 3] - boxes[:, 1]) * top_percentage
+    width = boxes[:, 2] - boxes[:, 0]
+    pad_x = width * padding
+    pad_y = band_h * padding
+    h, w = frame_shape[:2]
+    regions = np.stack([
+        np.clip(boxes[:, 0] - pad_x, 0, w - 1),
+        np.clip(boxes[:, 1] - pad_y, 0, h - 1),
+        np.clip(boxes[:, 2] + pad_x, 1, w),
+        np.clip(boxes[:, 1] + band_h + pad_y, 1, h),
+    ], axis=1).astype(np.int32)
+    # Boş kırpıntı oluşmasın
+    regions[:, 2] = np.maximum(regions[:, 2], regions[:, 0] + 2)
+    regions[:, 3] = np.maximum(regions[:, 3], regions[:, 1] + 2)
+    return regions
+
+
+def owner_ids(person_helmet, person_ids, n_helmets):
+    """Her barete atandığı kişinin takip ID'sini verir (atanmamışlara -1)."""
+    helmet_ids = np.full(n_helmets, -1, dtype=np.int64)
+    owners = person_helmet >= 0
+    helmet_ids[person_helmet[owners]] = person_ids[owners]
+    return helmet_ids
+
+
+def tile_grid(frame_shape, tile_size, overlap=0.2):
+    """
+    Kareyi örtüşen karolarla kaplayan (N, 4) int32 bölgeler döndürür. Son
+    satır/sütun kare kenarına hizalanır; kare karodan küçükse tek karo kullanılır.
+    """
+    h, w = frame_shape[:2]
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, step))
+        positions.append(length - tile_size)
+        return positions
+
+    regions = [(x, y, min(x + tile_size, w), min(y + tile_size, h))
+               for y in starts(h) for x in starts(w)]
+    return np.asarray(regions, dtype=np.int32)
+
+
+def tiles_touching(tiles, regions):
+    """Bölgelerden (ör. kişi baş bölgeleri) en az birine değen karoları döndürür."""
+    if len(regions) == 0:
+        return tiles[:0]
+    overlap_x = (tiles[:, None, 0] < regions[None, :, 2]) & (regions[None, :, 0] < tiles[:, None, 2])
+    overlap_y = (tiles[:, None, 1] < regions[None, :, 3]) & (regions[None, :, 1] < tiles[:, None, 3])
+    return tiles[(overlap_x & overlap_y).any(axis=1)]
+
+
+class DetectionPipeline:
+    """Kişi ve baret modellerini ortak ön işlemeyle çalıştırıp eşleştiren hat."""
+
+    def __init__(self, model_person, model_helmet, helmet_class_id,
+                 person_conf, helmet_conf, top_percentage=TOP_PERCENTAGE, imgsz=640,
+                 tracker_cfg=DEFAULT_TRACKER_CFG, helmet_stride=1,
+                 helmet_mode='full', crop_imgsz=160, crop_padding=0.25, motion_gate=None, timer=None,
+                 track_helmets=True, tile_size=640, tile_overlap=0.2, tile_persons_only=False,
+                 square_input=False):
+        if helmet_mode not in HELMET_MODES:
+            raise ValueError(f"Geçersiz baret modu: {helmet_mode} (seçenekler: {HELMET_MODES})")
+        self.model_person = model_person
+        self.model_helmet = model_helmet
+        self.helmet_class_id = helmet_class_id
+        self.person_conf = person_conf
+        self.helmet_conf = helmet_conf
+        self.top_percentage = top_percentage
+        # square_input: tüm karelerin aynı girdi boyutunda olması gereken toplu çıkarım için
+        self.letterbox = LetterboxPool(imgsz, square=square_input)
+        self.track_helmets = track_helmets
+        self.trackers = TrackerState(tracker_cfg, track_helmets=track_helmets)
+        self.helmet_stride = max(1, int(helmet_stride))
+        self.helmet_mode = helmet_mode
+        self.crop_imgsz = crop_imgsz
+        self.crop_padding = crop_padding
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_persons_only = tile_persons_only
+        self.regions_processed = 0  # Baret modeline verilen kırpıntı/karo sayısı (toplam)
+        self.motion_gate = motion_gate
+        self.timer = timer if timer is not None else StageTimer(enabled=False)
+        self._last_det = None
+        self._frame_index = 0
+        # Taşınan baretler: sahibi kişinin ID'si ve o anki kutusu ile birlikte
+        self._carry_person_ids = np.zeros(0, dtype=np.int64)
+        self._carry_person_boxes = np.zeros((0, 4), dtype=np.float32)
+        self._carry_helmets = empty_boxes()
+
+    def swap_models(self, model_person, model_helmet, helmet_class_id):
+        """Karelerin arasında yeni ağırlıklara geçer; takip ve taşıma durumu korunur."""
+        self.model_person = model_person
+        self.model_helmet = model_helmet
+        self.helmet_class_id = helmet_class_id
+
+    def predict_person(self, tensor):
+        return self.model_person.predict(tensor, classes=[PERSON_CLASS_ID],
+                                         conf=self.person_conf, verbose=False)
+
+    def predict_helmet(self, tensor):
+        return self.model_helmet.predict(tensor, classes=[self.helmet_class_id],
+                                         conf=self.helmet_conf, verbose=False)
+
+    def detect(self, frame):
+        """Bir BGR kare için kişi/baret kutularını ve eşleştirmeyi döndürür."""
+        timer = self.timer
+        if self.motion_gate is not None:
+            # İlk kare de kapıdan geçer ki referans olsun; ikinci kare onunla karşılaştırılır
+            process = self.motion_gate.should_process(frame)
+            timer.lap('motion_gate')
+            if not process and self._last_det is not None:
+                return self._last_det
+        lb = self.letterbox.prepare(frame)
+        timer.lap('letterbox')
+        run_helmet = self.helmet_due()
+
+        # Aynı hazır tensör iki modele de verilir; ultralytics tensör girdide
+        # letterbox/normalizasyon adımlarını tekrar yapmaz
+        results_person = self.predict_person(lb.tensor)
+        timer.lap('person_model')
+        if not run_helmet:
+            return self.postprocess(results_person[0], None, lb)
+        if self.helmet_mode in ('crop', 'tiled'):
+            # Baretler, kişi kutuları takip edildikten sonra kırpıntılarda/karolarda aranır
+            return self.postprocess(results_person[0], None, lb, frame=frame)
+        results_helmet = self.predict_helmet(lb.tensor)
+        timer.lap('helmet_model')
+        return self.postprocess(results_person[0], results_helmet[0], lb)
+
+    def reset(self):
+        """Yeni bir kaynağa geçerken takip ve taşıma durumunu sıfırlar; modeller yüklü kalır."""
+        self.trackers.reset()
+        self._frame_index = 0
+        self._last_det = None
+        self._carry_person_ids = np.zeros(0, dtype=np.int64)
+        self._carry_person_boxes = np.zeros((0, 4), dtype=np.float32)
+        self._carry_helmets = empty_boxes()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def helmet_due(self):
+        """Bu karede baret modelinin çalışıp çalışmayacağını döndürür ve kare sayacını ilerletir."""
+        due = self._frame_index % self.helmet_stride == 0
+        self._frame_index += 1
+        return due
+
+    def postprocess(self, result_person, result_helmet, lb, frame=None):
+        """
+        Tek bir karenin model çıktılarını takip eder, kare koordinatlarına çevirir
+        ve eşleştirir. result_helmet None ise: frame verilmişse baretler kişi baş
+        bölgesi kırpıntılarında ya da karolarda aranır, verilmemişse önceki
+        kareden taşınır.
+        """
+        timer = self.timer
+        self.trackers.update(result_person, result_helmet)
+        timer.lap('tracking')
+        person_boxes, person_ids, person_confs = extract_boxes(result_person, transform=lb.to_frame)
+        if result_helmet is not None:
+            helmet_boxes, helmet_ids, helmet_confs = extract_boxes(
+                result_helmet, require_id=self.track_helmets, transform=lb.to_frame)
+            timer.lap('extract')
+        elif frame is not None:
+            timer.lap('extract')
+            if self.helmet_mode == 'tiled':
+                helmet_boxes, helmet_ids, helmet_confs = self.detect_helmets_in_tiles(frame, person_boxes)
+            else:
+                helmet_boxes, helmet_ids, helmet_confs = self.detect_helmets_in_crops(frame, person_boxes)
+            timer.lap('helmet_model')
+        else:
+            helmet_boxes, helmet_ids, helmet_confs = self._propagate_helmets(person_boxes, person_ids)
+            timer.lap('extract')
+        person_helmet, helmet_used = associate(person_boxes, helmet_boxes, self.top_percentage)
+        if not self.track_helmets:
+            helmet_ids = owner_ids(person_helmet, person_ids, len(helmet_boxes))
+        timer.lap('association')
+        det = Detections(person_boxes, person_ids, person_confs,
+                         helmet_boxes, helmet_ids, helmet_confs,
+                         person_helmet, helmet_used)
+        if self.helmet_stride > 1:
+            self._remember_helmets(det)
+        self._last_det = det
+        return det
+
+    def detect_helmets_in_crops(self, frame, person_boxes):
+        """
+        Kişilerin baş bölgelerini orijinal kareden keser, tek toplu çağrıda küçük
+        imgsz ile baret modeline verir ve kutuları kare koordinatlarına taşır.
+        Komşu kişilerin kırpıntıları çakışabildiği için kopyalar NMS ile elenir.
+        """
+        if len(person_boxes) == 0:
+            return empty_boxes()
+        regions = head_regions(person_boxes, frame.shape, self.top_percentage, self.crop_padding)
+        return self._detect_helmets_in_regions(frame, regions, self.crop_imgsz)
+
+    def detect_helmets_in_tiles(self, frame, person_boxes):
+        """
+        Kareyi örtüşen karolara bölüp (tile_persons_only iken sadece kişilerin baş
+        bölgelerine değenleri) tek toplu çağrıda tam çözünürlükte baret modeline verir.
+        """
+        tiles = tile_grid(frame.shape, self.tile_size, self.tile_overlap)
+        if self.tile_persons_only:
+            heads = head_regions(person_boxes, frame.shape, self.top_percentage, self.crop_padding)
+            tiles = tiles_touching(tiles, heads)
+        if len(tiles) == 0:
+            return empty_boxes()
+        return self._detect_helmets_in_regions(frame, tiles, self.tile_size, ios_threshold=0.7)
+
+    def _detect_helmets_in_regions(self, frame, regions, imgsz, ios_threshold=None):
+        """Bölgeleri tek toplu çağrıda baret modeline verir, kutuları kareye taşıyıp NMS uygular."""
+        self.regions_processed += len(regions)
+        # Dilimler görünümdür; kopyayı ultralytics'in kendi letterbox'u yapar
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions.tolist()]
+        results = self.model_helmet.predict(crops, imgsz=imgsz, classes=[self.helmet_class_id],
+                                            conf=self.helmet_conf, verbose=False)
+        all_boxes = []
+        all_confs = []
+        for result, (x1, y1, _, _) in zip(results, regions.tolist()):
+            boxes, _, confs = extract_boxes(result, require_id=False)
+            if len(boxes):
+                all_boxes.append(boxes + np.array([x1, y1, x1, y1], dtype=np.int32))
+                all_confs.append(confs)
+        if not all_boxes:
+            return empty_boxes()
+        boxes = np.concatenate(all_boxes)
+        confs = np.concatenate(all_confs)
+        keep = nms(boxes, confs, ios_threshold=ios_threshold)
+        return boxes[keep], np.full(len(keep), -1, dtype=np.int64), confs[keep]
+
+    def _remember_helmets(self, det):
+        """Bir kişiye atanmış baretleri, sonraki atlanan karelerde taşımak üzere saklar."""
+        owners = det.person_helmet >= 0
+        helmet_idx = det.person_helmet[owners]
+        self._carry_person_ids = det.person_ids[owners]
+        self._carry_person_boxes = det.person_boxes[owners].astype(np.float32)
+        self._carry_helmets = (det.helmet_boxes[helmet_idx], det.helmet_ids[helmet_idx],
+                               det.helmet_confs[helmet_idx])
+
+    def _propagate_helmets(self, person_boxes, person_ids):
+        """
+        Saklanan baretleri, sahibi kişinin bu karedeki kutusuna göre kaydırır:
+        yatayda kutu merkezinin, dikeyde kutu üst kenarının yer değiştirmesi kadar.
+        Sahibi bu karede görünmeyen baretler düşürülür.
+        """
+        if len(self._carry_person_ids) == 0 or len(person_ids) == 0:
+            return empty_boxes()
+        index = {person_id: i for i, person_id in enumerate(person_ids.tolist())}
+        keep = [k for k, person_id in enumerate(self._carry_person_ids.tolist()) if person_id in index]
+        if not keep:
+            return empty_boxes()
+        current = person_boxes[[index[person_id] for person_id in self._carry_person_ids[keep].tolist()]]
+        current = current.astype(np.float32)
+        previous = self._carry_person_boxes[keep]
+        dx = ((current[:, 0] + current[:, 2]) - (previous[:, 0] + previous[:, 2])) / 2
+        dy = current[:, 1] - previous[:, 1]
+        boxes, ids, confs = self._carry_helmets
+        shift = np.stack([dx, dy, dx, dy], axis=1)
+        moved = (boxes[keep].astype(np.float32) + shift).astype(np.int32)
+        return moved, ids[keep], confs[keep]
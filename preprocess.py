@@ -0,0 +1,109 @@
+"""
+Ortak ön işleme: bir kare tek sefer letterbox'lanır ve aynı tensör hem kişi
+hem baret modeline verilir.
+
+Kare, uzun kenarı imgsz olacak şekilde küçültülür ve her kenarı sadece
+model adımının (32) katına tamamlanır (ultralytics'in kendi tahminindeki gibi;
+16:9 bir kare 640 için 384x640 olur). Letterbox tuvali, yeniden boyutlandırma
+tamponu ve CHW float32 tamponları kare boyutu değişene kadar kareler arasında
+yeniden kullanılır; kare başına yeni bellek ayrılmaz. Modellerin döndürdüğü
+kutular to_frame ile orijinal kare koordinatlarına geri çevrilir.
+"""
+import math
+
+import cv2
+import numpy as np
+import torch
+
+# Ultralytics'in letterbox dolgu rengi
+PAD_COLOR = 114
+STRIDE = 32  # Model girdisinin kenarları bu sayının katı olmalı
+
+
+class Letterboxed:
+    """Letterbox'lanmış bir kare: model girdisi tensör ve geri dönüşüm bilgisi."""
+    __slots__ = ('tensor', 'gain', 'pad_x', 'pad_y', 'frame_shape')
+
+    def __init__(self, tensor, gain, pad_x, pad_y, frame_shape):
+        self.tensor = tensor
+        self.gain = gain
+        self.pad_x = pad_x
+        self.pad_y = pad_y
+        self.frame_shape = frame_shape
+
+    def to_frame(self, xyxy):
+        """Letterbox uzayındaki (N, 4) kutuları kare koordinatlarına çevirir (yerinde)."""
+        xyxy[:, [0, 2]] -= self.pad_x
+        xyxy[:, [1, 3]] -= self.pad_y
+        xyxy /= self.gain
+        h, w = self.frame_shape[:2]
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, w)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, h)
+        return xyxy
+
+
+class LetterboxPool:
+    """
+    Kareleri adım hizalı en küçük dikdörtgene letterbox'layan, tamponlarını
+    yeniden kullanan ön işleyici.
+
+    square=True iken her kare imgsz x imgsz boyutuna tamamlanır; farklı
+    kameraların tensörlerini tek toplu çağrıda birleştiren inference_server
+    için tüm kameralarda aynı girdi boyutu gerekir.
+
+    pool_size kadar CHW tamponu sırayla kullanılır; böylece bir önceki karenin
+    tensörü hâlâ bir tüketicide (ör. toplu çıkarım kuyruğu) beklerken üzerine
+    yazılmaz.
+    """
+
+    def __init__(self, imgsz=640, pool_size=2, square=False):
+        self.imgsz = imgsz
+        self.pool_size = pool_size
+        self.square = square
+        self._canvas = None
+        self._pool = None
+        self._tensors = None
+        self._index = 0
+        self._layout = None   # (frame_h, frame_w) -> hesaplanmış yerleşim
+        self._resized = None
+
+    def _prepare_layout(self, frame_shape):
+        h, w = frame_shape[:2]
+        gain = min(self.imgsz / h, self.imgsz / w)
+        new_w, new_h = int(round(w * gain)), int(round(h * gain))
+        if self.square:
+            canvas_w = canvas_h = self.imgsz
+        else:
+            canvas_w = math.ceil(new_w / STRIDE) * STRIDE
+            canvas_h = math.ceil(new_h / STRIDE) * STRIDE
+        pad_x = (canvas_w - new_w) // 2
+        pad_y = (canvas_h - new_h) // 2
+        # Kare boyutu değişince tuval ve tamponlar yeni boyutla ayrılır (dolgu da sıfırdan boyanır)
+        if self._canvas is None or self._canvas.shape[:2] != (canvas_h, canvas_w):
+            self._canvas = np.empty((canvas_h, canvas_w, 3), dtype=np.uint8)
+            self._pool = [np.empty((3, canvas_h, canvas_w), dtype=np.float32) for _ in range(self.pool_size)]
+            self._tensors = [torch.from_numpy(buf).unsqueeze(0) for buf in self._pool]
+            self._index = 0
+        self._canvas[:] = PAD_COLOR
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._layout = ((h, w), gain, new_w, new_h, pad_x, pad_y)
+
+    def prepare(self, frame):
+        """BGR kareyi letterbox'lar ve (1, 3, H, W) RGB 0-1 tensör döndürür (H, W adımın katı)."""
+        if self._layout is None or self._layout[0] != frame.shape[:2]:
+            self._prepare_layout(frame.shape)
+        _, gain, new_w, new_h, pad_x, pad_y = self._layout
+
+        if (new_w, new_h) == (frame.shape[1], frame.shape[0]):
+            self._canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = frame
+        else:
+            cv2.resize(frame, (new_w, new_h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+            self._canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = self._resized
+
+        # BGR -> RGB, HWC -> CHW ve 0-1 normalizasyonu tek adımda, hazır tampona
+        chw = self._pool[self._index]
+        np.multiply(self._canvas[..., ::-1].transpose(2, 0, 1), 1.0 / 255.0,
+                    out=chw, casting='unsafe')
+        tensor = self._tensors[self._index]
+        self._index = (self._index + 1) % len(self._pool)
+        return Letterboxed(tensor, gain, pad_x, pad_y, frame.shape)
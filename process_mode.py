@@ -0,0 +1,447 @@
+"""
+Kamera başına ayrı süreç (process) ile çalışma modu.
+
+Her kamera hattı (yakalama, iki model, ilişkilendirme, çizim) kendi işçi
+sürecinde çalışır; böylece kameralar GIL'i ve arayüz sürecini paylaşmaz.
+İşaretlenmiş kareler multiprocessing.shared_memory üzerindeki bir halka
+tampona yazılır (kareler pickle'lanmaz), kuyruktan sadece küçük tespit ve
+uyarı kayıtları geçer.
+
+Kayıt biçimleri (records kuyruğu):
+    ('frame', camera_id, seq, takan, takmayan)
+    ('fps', camera_id, fps, yakalama_yasi_ms, atilan_kare)
+    ('alert', camera_id, message, level)
+    ('diagnostics', camera_id, instrumentation.loop_diagnostics sözlüğü)
+    ('finished', camera_id)
+
+Tanılama kayıtları sadece CameraProcess.set_diagnostics(True) ile açıldığında,
+saniyede bir gönderilir; kapalıyken işçinin aşama zamanlayıcısı da kapalıdır.
+
+settings['clips'] verilirse (ClipRecorder argümanları) her işçi kendi
+kamerasının son saniyelerini bellekte tutar ve uyarılarda klip yazar.
+
+settings['config_file'] verilirse işçi bu dosyayı kendisi izler; eşik, uyarı
+süresi ve omuz bandı değişiklikleri yeniden başlatmadan uygulanır, model yolu
+değişirse yeni ağırlıklar işçide arka planda yüklenip hatta takılır.
+
+İhlaller settings['event_db'] verilirse her işçide ayrı bir EventStore ile
+aynı SQLite dosyasına yazılır (WAL kipi eşzamanlı süreç yazmalarına izin verir).
+
+Kullanım (başsız, çok kameralı):
+    python process_mode.py --source 0 --source rtsp://kamera2/stream --event-db ihlaller.db
+    (kamera adları cam0, cam1, ...; ayarlar kameralar.yaml'daki bu adlardan okunur)
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from backends import BACKENDS, select_backend
+from live_config import CONFIG_FILE, DEFAULTS, camera_config
+from logging_setup import setup_worker_logging, start_worker_log_listener
+
+# Qt ve torch ile güvenli olması için işçiler 'spawn' ile başlatılır
+_CTX = mp.get_context('spawn')
+
+DEFAULT_RING_SHAPE = (1080, 1920, 3)
+DEFAULT_RING_SLOTS = 4
+
+_log_queue = None  # İşçilerin log kayıtları bu kuyrukla ana sürece gelir
+
+
+def worker_log_queue():
+    """Ana süreçte işçi log kuyruğunu ve aktarıcısını bir kez oluşturur."""
+    global _log_queue
+    if _log_queue is None:
+        _log_queue = _CTX.Queue()
+        start_worker_log_listener(_log_queue)
+    return _log_queue
+
+
+class SharedFrameRing:
+    """
+    Sabit üst boyutlu karelerden oluşan paylaşımlı bellek halka tamponu.
+
+    Başlık: [son_seq, (slot_seq, h, w) x slots] int64. Yazıcı bir slota
+    yazarken slot_seq'i -1 yapar, yazma bitince kare numarasını koyar; okuyucu
+    kopyalamadan önce ve sonra slot_seq'i karşılaştırarak yırtık kareleri
+    eler (seqlock). Tek yazıcı, çok okuyucu içindir.
+    """
+
+    def __init__(self, name=None, slots=DEFAULT_RING_SLOTS, max_shape=DEFAULT_RING_SHAPE, create=True):
+        self.slots = slots
+        self.max_shape = tuple(max_shape)
+        header_len = 1 + slots * 3
+        header_bytes = header_len * 8
+        frame_bytes = int(np.prod(self.max_shape))
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self._header = np.ndarray((header_len,), dtype=np.int64, buffer=self.shm.buf)
+        self._frames = np.ndarray((slots,) + self.max_shape, dtype=np.uint8,
+                                  buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self._header[:] = 0
+
+    def _meta(self, slot):
+        return self._header[1 + slot * 3: 4 + slot * 3]
+
+    def fit(self, frame):
+        """Kare tampona sığmıyorsa en-boy oranını koruyarak küçültür."""
+        h, w = frame.shape[:2]
+        max_h, max_w = self.max_shape[:2]
+        if h <= max_h and w <= max_w:
+            return frame
+        scale = min(max_h / h, max_w / w)
+        return cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    def write(self, frame):
+        """Kareyi bir sonraki slota yazar ve kare numarasını döndürür."""
+        frame = self.fit(frame)
+        h, w = frame.shape[:2]
+        seq = int(self._header[0]) + 1
+        meta = self._meta(seq % self.slots)
+        meta[0] = -1
+        self._frames[seq % self.slots, :h, :w] = frame
+        meta[1] = h
+        meta[2] = w
+        meta[0] = seq
+        self._header[0] = seq
+        return seq
+
+    def read_latest(self, last_seq=0, retries=3):
+        """
+        last_seq'ten yeni bir kare varsa (seq, kopya) döndürür, yoksa (last_seq, None).
+        Dönen kopya çağırana aittir; slotun üzerine yazılması onu etkilemez.
+        """
+        for _ in range(retries):
+            seq = int(self._header[0])
+            if seq <= last_seq:
+                return last_seq, None
+            slot = seq % self.slots
+            meta = self._meta(slot)
+            if int(meta[0]) != seq:
+                continue
+            h, w = int(meta[1]), int(meta[2])
+            frame = self._frames[slot, :h, :w].copy()
+            if int(meta[0]) == seq:
+                return seq, frame
+        return last_seq, None
+
+    def close(self):
+        # ndarray görünümleri serbest bırakılmadan shm kapatılamaz
+        self._header = None
+        self._frames = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def camera_worker(camera_id, source, ring_name, ring_slots, ring_shape, records, stop_event, settings,
+                  log_queue=None, diagnostics_event=None):
+    """İşçi süreç giriş noktası: tek bir kameranın tüm hattını çalıştırır."""
+    if log_queue is not None:
+        setup_worker_logging(log_queue)
+    # Ağır içe aktarmalar sadece işçi süreçte yapılır
+    import torch
+
+    from association import TOP_PERCENTAGE
+    from capture import LatestFrameCapture
+    from clip_recorder import ClipRecorder
+    from drawing import draw_detections
+    from event_store import EventStore
+    from instrumentation import StageTimer, loop_diagnostics
+    from live_config import ConfigApplier, ConfigWatcher
+    from model_pool import ModelPool
+    from motion import MotionGate
+    from violations import ViolationTracker
+
+    def alert(message, level):
+        records.put(('alert', camera_id, message, level))
+
+    ring = SharedFrameRing(ring_name, ring_slots, ring_shape, create=False)
+    cap = None
+    session_start = None
+    store = None
+    recorder = None
+    watcher = None
+    applier = None
+    try:
+        if settings.get('torch_threads'):
+            torch.set_num_threads(settings['torch_threads'])
+
+        alert("Modeller yükleniyor...", "INFO")
+        # Havuz, yapılandırmada model yolu değişince yeni ağırlıkları da arka planda yükler
+        pool = ModelPool(settings['model_person_path'], settings['model_helmet_path'],
+                         settings['person_conf'], settings['helmet_conf'],
+                         backend=settings.get('backend', 'pytorch'),
+                         pipeline_kwargs={
+                             'top_percentage': settings.get('top_percentage', TOP_PERCENTAGE),
+                             'helmet_stride': settings.get('helmet_stride', 1),
+                             'helmet_mode': settings.get('helmet_mode', 'full'),
+                             'crop_imgsz': settings.get('crop_imgsz', 160),
+                             'tile_size': settings.get('tile_size', 640),
+                             'tile_overlap': settings.get('tile_overlap', 0.2),
+                             'tile_persons_only': settings.get('tile_persons_only', False),
+                             'track_helmets': settings.get('track_helmets', True),
+                             'motion_gate': (MotionGate(max_skip=settings.get('motion_max_skip', 15))
+                                             if settings.get('motion_gate') else None),
+                         },
+                         log=lambda message: alert(message, "INFO"))
+        pipeline = pool.acquire()
+        backend = pool.backend
+        # Ana süreçteki tanılama paneli açıkken ölçülür; kapalıyken lap() hemen döner
+        timer = StageTimer(enabled=False)
+        pipeline.timer = timer
+        if settings.get('event_db'):
+            store = EventStore(settings['event_db'])
+        violations = ViolationTracker(settings['warn_after'], store=store, camera=camera_id)
+        if settings.get('clips'):
+            recorder = ClipRecorder(camera_id, on_saved=lambda path: alert(f"İhlal klibi kaydedildi: {path}", "INFO"),
+                                    **settings['clips'])
+        alert(f"Modeller başarıyla yüklendi (arka uç: {backend})", "SUCCESS")
+
+        applier = ConfigApplier(pool, log=alert)
+        if settings.get('config_file'):
+            # Her okuma ana süreçteki gibi ortak DEFAULTS üzerine yapılır; dosyadan silinen ayar
+            # varsayılanına döner. Komut satırından verilen model yolları dosyayı ezmeye devam eder
+            overrides = settings.get('model_overrides') or {}
+
+            def on_change(config, changed):
+                changed = [key for key in changed if key not in overrides]
+                if changed:
+                    applier.on_change(dict(config, **overrides), changed)
+
+            watcher = ConfigWatcher(camera_id, DEFAULTS, on_change, path=settings['config_file'],
+                                    log=alert).start()
+
+        cap = LatestFrameCapture(source, stride=settings.get('frame_stride', 1), loop=settings.get('loop', False),
+                                 on_status=alert)
+        if not cap.isOpened():
+            alert(f"Kaynak açılamadı: {source}", "ERROR")
+            return
+        cap.start()
+        alert("İzleme başlatıldı", "SUCCESS")
+
+        session_start = time.time()  # İhlal süreleri karelerin video zamanıyla ölçülür
+        fps_start = time.time()
+        fps_counter = 0
+        diagnostics_time = time.monotonic()
+        while not stop_event.is_set():
+            if diagnostics_event is not None and diagnostics_event.is_set() != timer.enabled:
+                timer.enabled = not timer.enabled
+                timer.reset()
+            if applier.pending:
+                applier.apply(pipeline, violations)
+            timer.begin()
+            success, frame = cap.read(timeout=1.0)
+            if not success:
+                if not cap.ended:
+                    continue  # Kaynağa yeniden bağlanılıyor; modeller ayakta kalır
+                alert("Video akışı sonlandı", "WARNING")
+                break
+            timer.lap('capture')
+
+            fps_counter += 1
+            if fps_counter % 30 == 0:
+                fps = 30 / (time.time() - fps_start)
+                _put_nowait(records, ('fps', camera_id, fps, cap.last_age * 1000, cap.frames_dropped))
+                fps_start = time.time()
+
+            det = pipeline.detect(frame)
+            no_helmet = det.person_helmet < 0
+            warned, resolved = violations.update(det.person_ids[no_helmet].tolist(),
+                                                 now=session_start + cap.timestamp,
+                                                 boxes=det.person_boxes[no_helmet].tolist(),
+                                                 confs=det.person_confs[no_helmet].tolist())
+            for person_id in warned:
+                alert(f"KISI ID {person_id} - {violations.warn_after:g} saniyedir baret takmiyor!", "CRITICAL")
+                if recorder is not None:
+                    recorder.trigger(person_id, now=cap.timestamp)
+            for person_id in resolved:
+                alert(f"KISI ID {person_id} - İhlal durumu düzeltildi", "INFO")
+            timer.lap('violations')
+
+            draw_detections(frame, det)
+            timer.lap('draw')
+            if recorder is not None:
+                recorder.push(frame, now=cap.timestamp)
+                timer.lap('clip')
+            seq = ring.write(frame)
+            timer.lap('ring_write')
+            timer.commit()
+            takmayan = int(no_helmet.sum())
+            # Kare kayıtları kaybedilebilir; arayüz geride kalırsa en yenisini okur
+            _put_nowait(records, ('frame', camera_id, seq, len(det.person_ids) - takmayan, takmayan))
+            if timer.enabled and time.monotonic() - diagnostics_time >= 1.0:
+                diagnostics_time = time.monotonic()
+                _put_nowait(records, ('diagnostics', camera_id, loop_diagnostics(timer, cap, store, recorder)))
+        if cap.reconnects:
+            alert(f"Yeniden bağlanma: {cap.reconnects}, toplam kesinti: {cap.stall_seconds:.1f} sn", "INFO")
+        gate = pipeline.motion_gate
+        if gate is not None and gate.frames:
+            alert(f"Hareketsiz sahne nedeniyle model çalıştırılmayan kare: {gate.skipped}/{gate.frames} "
+                  f"(%{gate.skipped_ratio * 100:.1f})", "INFO")
+    except Exception as e:
+        alert(f"İşçi süreç hatası: {e}", "ERROR")
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if applier is not None:
+            applier.close()
+        if cap is not None:
+            cap.release()
+        if store is not None:
+            violations.finish(now=session_start + cap.timestamp if session_start is not None else None)
+            store.close()
+        if recorder is not None:
+            recorder.close()
+        ring.close()
+        records.put(('finished', camera_id))
+
+
+def _put_nowait(records, record):
+    try:
+        records.put_nowait(record)
+    except queue.Full:
+        pass
+
+
+class CameraProcess:
+    """Bir kameranın işçi sürecini ve çıktı halka tamponunu yöneten denetleyici."""
+
+    def __init__(self, camera_id, source, settings, records=None,
+                 ring_slots=DEFAULT_RING_SLOTS, ring_shape=DEFAULT_RING_SHAPE):
+        self.camera_id = camera_id
+        self.source = source
+        self.ring = SharedFrameRing(slots=ring_slots, max_shape=ring_shape, create=True)
+        self.records = records if records is not None else _CTX.Queue(maxsize=256)
+        self._stop_event = _CTX.Event()
+        self._diagnostics = _CTX.Event()
+        self.process = _CTX.Process(
+            target=camera_worker, name=f"camera-{camera_id}", daemon=True,
+            args=(camera_id, source, self.ring.name, ring_slots, ring_shape,
+                  self.records, self._stop_event, settings, worker_log_queue(), self._diagnostics))
+        self._last_seq = 0
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def set_diagnostics(self, enabled):
+        """İşçinin aşama ölçümünü ve 'diagnostics' kayıtlarını açar/kapatır."""
+        if enabled:
+            self._diagnostics.set()
+        else:
+            self._diagnostics.clear()
+
+    def read_frame(self):
+        """Son işaretlenmiş kareyi döndürür (yeni kare yoksa None)."""
+        self._last_seq, frame = self.ring.read_latest(self._last_seq)
+        return frame
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.ring.close()
+        self.ring.unlink()
+
+
+def default_torch_threads(camera_count):
+    """Çekirdekleri kameralar arasında paylaştırır (en az 1)."""
+    return max(1, (os.cpu_count() or 1) // max(1, camera_count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kamera başına süreçle başsız izleme")
+    parser.add_argument('--source', action='append', required=True,
+                        help="Kamera kaynağı (birden fazla kez verilebilir)")
+    parser.add_argument('--config', default=CONFIG_FILE,
+                        help="Kamera başına ayarların okunduğu ve izlendiği YAML dosyası")
+    parser.add_argument('--model-person', default=None, help="Verilirse yapılandırmadaki yolu ezer")
+    parser.add_argument('--model-helmet', default=None, help="Verilirse yapılandırmadaki yolu ezer")
+    parser.add_argument('--loop', action='store_true', help="Video dosyaları bitince başa sarılır (test için)")
+    parser.add_argument('--frame-stride', type=int, default=1,
+                        help="Her N karenin biri işlenir; atlanan kareler çözülmez")
+    parser.add_argument('--helmet-stride', type=int, default=1)
+    parser.add_argument('--helmet-mode', choices=['full', 'crop', 'tiled'], default='full')
+    parser.add_argument('--tile-size', type=int, default=640, help="'tiled' modunda karo kenarı")
+    parser.add_argument('--tile-overlap', type=float, default=0.2, help="'tiled' modunda örtüşme oranı")
+    parser.add_argument('--tile-persons-only', action='store_true',
+                        help="'tiled' modunda sadece kişilere değen karoları çalıştır")
+    parser.add_argument('--motion-gate', action='store_true')
+    parser.add_argument('--no-helmet-tracking', action='store_true',
+                        help="Baretleri takip etmeden kare başına tespit olarak kullan")
+    parser.add_argument('--backend', choices=('auto',) + BACKENDS, default='auto')
+    parser.add_argument('--event-db', default=None, help="İhlallerin yazılacağı SQLite dosyası")
+    parser.add_argument('--clip-dir', default=None, help="Uyarı kliplerinin klasörü (verilmezse kayıt yok)")
+    parser.add_argument('--clip-seconds', type=float, nargs=2, default=(5.0, 5.0), metavar=('ONCE', 'SONRA'),
+                        help="Klipte uyarıdan önceki ve sonraki süre (sn)")
+    parser.add_argument('--clip-buffer-mb', type=float, default=64, help="Kamera başına bellek sınırı")
+    parser.add_argument('--clip-disk-mb', type=float, default=2048, help="Kamera başına disk sınırı")
+    args = parser.parse_args()
+
+    model_overrides = {key: path for key, path in (('model_person_path', args.model_person),
+                                                   ('model_helmet_path', args.model_helmet)) if path}
+    configs = [dict(camera_config(f"cam{i}", args.config), **model_overrides) for i in range(len(args.source))]
+
+    backend = args.backend
+    if backend == 'auto':
+        # Ölçüm işçiler başlamadan bir kez yapılır; aksi halde her işçi aynı anda ölçer
+        backend = select_backend(configs[0]['model_person_path'], configs[0]['model_helmet_path'])
+
+    settings = {
+        'backend': backend,
+        'config_file': args.config,
+        'model_overrides': model_overrides,
+        'frame_stride': args.frame_stride,
+        'loop': args.loop,
+        'helmet_stride': args.helmet_stride,
+        'helmet_mode': args.helmet_mode,
+        'tile_size': args.tile_size,
+        'tile_overlap': args.tile_overlap,
+        'tile_persons_only': args.tile_persons_only,
+        'track_helmets': not args.no_helmet_tracking,
+        'motion_gate': args.motion_gate,
+        'event_db': args.event_db,
+        'clips': ({'output_dir': args.clip_dir, 'pre_seconds': args.clip_seconds[0],
+                   'post_seconds': args.clip_seconds[1], 'buffer_mb': args.clip_buffer_mb,
+                   'disk_mb': args.clip_disk_mb} if args.clip_dir else None),
+        'torch_threads': default_torch_threads(len(args.source)),
+    }
+    records = _CTX.Queue(maxsize=1024)
+    cameras = [CameraProcess(f"cam{i}", source, dict(settings, **config), records=records).start()
+               for i, (source, config) in enumerate(zip(args.source, configs))]
+    running = {camera.camera_id for camera in cameras}
+    try:
+        while running:
+            try:
+                record = records.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            kind, camera_id = record[0], record[1]
+            if kind == 'alert':
+                print(f"[{camera_id}] [{record[3]}] {record[2]}")
+            elif kind == 'fps':
+                print(f"[{camera_id}] FPS: {record[2]:.1f}, gecikme: {record[3]:.0f} ms")
+            elif kind == 'finished':
+                running.discard(camera_id)
+    except KeyboardInterrupt:
+        pass
+    for camera in cameras:
+        camera.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Baret (ve kişi) modelini INT8'e nicemleyen ve FP32 ile karşılaştıran araç.
+
+Kalibrasyon görüntüleri dataset.yaml'daki train klasöründen alınır; doğruluk
+(mAP) aynı veri setinin val bölümünde ölçülür, böylece kalibrasyon ile
+değerlendirme aynı görüntüleri kullanmaz. Nicemlenmiş modeller backends.py
+önbelleğine (model_cache/) yazılır ve rapor kabul edilebilirse
+INFERENCE_BACKEND = 'openvino-int8' ile yüklenir.
+
+Kişi modeli COCO üzerinde eğitildiği için baret veri setinde mAP'i
+ölçülmez; kişi modeli için sadece gecikme ve boyut raporlanır.
+
+Kullanım:
+    python quantize.py --data dataset.yaml --dataset-root baret_dataset
+"""
+import argparse
+import os
+
+import yaml
+
+from backends import CACHE_DIR, available_backends, export_model, load_model, measure_latency
+from live_config import DEFAULTS
+
+INT8_BACKEND = 'openvino-int8'
+
+
+def resolve_dataset(data_path, dataset_root, out_dir=CACHE_DIR):
+    """
+    dataset.yaml'ı mutlak yollu iki kopyaya çevirir: değerlendirme için (val
+    bölümü aynen) ve kalibrasyon için (val yerine train görüntüleri).
+    Dönüş: (eval_yaml, calib_yaml)
+    """
+    with open(data_path, encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+    root = os.path.abspath(dataset_root or data.get('path') or os.path.dirname(data_path))
+    for split in ('train', 'val'):
+        if split not in data:
+            raise ValueError(f"'{data_path}' içinde '{split}' bölümü yok")
+        if not os.path.isdir(os.path.join(root, data[split])):
+            raise FileNotFoundError(f"{split} klasörü bulunamadı: {os.path.join(root, data[split])}")
+    data['path'] = root
+
+    os.makedirs(out_dir, exist_ok=True)
+    eval_yaml = os.path.join(out_dir, 'dataset_eval.yaml')
+    calib_yaml = os.path.join(out_dir, 'dataset_calib.yaml')
+    with open(eval_yaml, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(data, f, allow_unicode=True)
+    # Nicemleme kalibrasyonu veri setinin val bölümünü okur
+    with open(calib_yaml, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(dict(data, val=data['train']), f, allow_unicode=True)
+    return eval_yaml, calib_yaml
+
+
+def model_size_mb(path):
+    """Model dosyasının ya da klasörünün (OpenVINO) toplam boyutu."""
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1e6
+    total = 0
+    for folder, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(folder, name)) for name in files)
+    return total / 1e6
+
+
+def evaluate(weights_path, backend, imgsz, eval_yaml=None):
+    """Bir modelin (mAP50, mAP50-95, ms/kare, MB) satırı; eval_yaml yoksa mAP None."""
+    model = load_model(weights_path, backend, imgsz)
+    map50 = map50_95 = None
+    if eval_yaml is not None:
+        metrics = model.val(data=eval_yaml, imgsz=imgsz, batch=1, plots=False, verbose=False)
+        map50, map50_95 = metrics.box.map50, metrics.box.map
+    latency = measure_latency([model], imgsz)
+    # pytorch arka ucunda ağırlık dosyasının kendisi ölçülür
+    return map50, map50_95, latency, model_size_mb(export_model(weights_path, backend, imgsz))
+
+
+def print_report(rows):
+    print(f"{'Model':<12} {'Arka uç':<15} {'mAP50':>7} {'mAP50-95':>9} {'ms/kare':>9} {'MB':>8}")
+    for name, backend, (map50, map50_95, latency, size) in rows:
+        map50 = f"{map50:.3f}" if map50 is not None else '-'
+        map50_95 = f"{map50_95:.3f}" if map50_95 is not None else '-'
+        print(f"{name:<12} {backend:<15} {map50:>7} {map50_95:>9} {latency:>9.1f} {size:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelleri INT8'e nicemler ve FP32 ile karşılaştırır")
+    parser.add_argument('--data', default='dataset.yaml')
+    parser.add_argument('--dataset-root', default=None,
+                        help="train/val yollarının göreli olduğu klasör (varsayılan: yaml'daki 'path' ya da yaml klasörü)")
+    parser.add_argument('--model-helmet', default=DEFAULTS['model_helmet_path'])
+    parser.add_argument('--model-person', default=DEFAULTS['model_person_path'])
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--fraction', type=float, default=1.0,
+                        help="Kalibrasyonda kullanılacak train görüntülerinin oranı")
+    parser.add_argument('--skip-person', action='store_true', help="Sadece baret modelini nicemle")
+    args = parser.parse_args()
+
+    if INT8_BACKEND not in available_backends(include_quantized=True):
+        print("Hata: INT8 nicemleme için 'openvino' ve 'nncf' paketleri gerekli "
+              "(pip install openvino nncf).")
+        return
+
+    eval_yaml, calib_yaml = resolve_dataset(args.data, args.dataset_root)
+    models = [('baret', args.model_helmet, eval_yaml)]
+    if not args.skip_person:
+        models.append(('kişi', args.model_person, None))
+
+    rows = []
+    for name, weights_path, model_eval_yaml in models:
+        print(f"[{name}] {weights_path} INT8'e nicemleniyor...")
+        # Veri seti değişmiş olabileceği için önbellekteki kopya her zaman yenilenir
+        export_model(weights_path, INT8_BACKEND, args.imgsz, data=calib_yaml,
+                     fraction=args.fraction, force=True)
+        for backend in ('pytorch', 'openvino', INT8_BACKEND):
+            print(f"[{name}] {backend} ölçülüyor...")
+            rows.append((name, backend, evaluate(weights_path, backend, args.imgsz, model_eval_yaml)))
+
+    print()
+    print_report(rows)
+    print(f"\nRapor kabul edilebilirse ön uçlarda INFERENCE_BACKEND = '{INT8_BACKEND}' "
+          f"(komut satırında --backend {INT8_BACKEND}) ile nicemlenmiş modeller yüklenir.")
+
+
+if __name__ == "__main__":
+    main()
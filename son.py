@@ -1,219 +1,249 @@
+from startup import PROFILE  # Açılış profilinin sıfır noktası; ilk içe aktarma olmalı
 import sys
-import cv2
-from ultralytics import YOLO
+import argparse
+import queue
 import time
 from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QLabel, QVBoxLayout, 
-                             QWidget, QPushButton, QHBoxLayout, QTextEdit, 
+                             QWidget, QPushButton, QHBoxLayout, 
                              QFileDialog, QFrame, QGridLayout, QGroupBox, QSplitter)
 from PyQt6.QtCore import QThread, pyqtSignal, Qt, pyqtSlot, QTimer
-from PyQt6.QtGui import QImage, QPixmap, QFont, QIcon
-import logging
+from PyQt6.QtGui import QPixmap, QFont, QIcon
+
+from capture import LatestFrameCapture
+from clip_recorder import ClipRecorder
+from display import FrameDisplayPool, LatestFrameSlot
+from event_store import EventStore
+from drawing import draw_detections
+from instrumentation import StageTimer, loop_diagnostics
+from live_config import CONFIG_FILE, DEFAULTS, ConfigApplier, ConfigWatcher, camera_config
+from log_view import LogView
+from logging_setup import log_event, setup_logging
+from model_pool import ModelPool
+from motion import MotionGate
+from process_mode import CameraProcess
+from violations import ViolationTracker
+
+PROFILE.mark("arayüz modülleri içe aktarıldı")
 
 # --- AYARLAR ---
-MODEL_HELMET_PATH = 'best.pt'
-MODEL_PERSON_PATH = 'yolov8n.pt'
-HELMET_GUVEN_ESIGI = 0.80 
-PERSON_GUVEN_ESIGI = 0.25 
-UYARI_SURESI = 10  # saniye
-
-# Loglama ayarları
-log_format = "%(asctime)s [%(levelname)s] - %(message)s"
-formatter = logging.Formatter(log_format)
-file_handler = logging.FileHandler("is_guvenligi.log", mode='a', encoding='utf-8')
-file_handler.setFormatter(formatter)
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-if logger.hasHandlers():
-    logger.handlers.clear()
-logger.addHandler(file_handler)
-
-# Renkler (BGR formatında)
-RENKLER = {
-    'takan': (0, 255, 0),
-    'takmayan': (0, 0, 255),
-    'unassigned': (128, 128, 128)
+CAMERA_ID = "cam0"  # İhlal veritabanında ve yapılandırma dosyasında bu kaynağın kamera adı
+# Kamera başına ayarlar (eşikler, uyarı süresi, omuz bandı, model yolları) live_config.CONFIG_FILE'dan
+# okunur, dosyada verilmeyenler live_config.DEFAULTS'tan gelir; çalışırken yapılan değişiklikler yeniden
+# başlatmadan uygulanır
+EVENT_DB = "ihlaller.db"  # İhlallerin yazıldığı SQLite dosyası (None: kapalı)
+CLIP_DIR = "ihlal_klipleri"  # Uyarı anının öncesi/sonrası kliplerinin klasörü (None: kapalı)
+CLIP_PRE_SECONDS = 5  # Klipte uyarıdan önceki süre
+CLIP_POST_SECONDS = 5  # Klipte uyarıdan sonraki süre
+CLIP_BUFFER_MB = 64  # Kamera başına JPEG halka tamponunun bellek sınırı
+CLIP_DISK_MB = 2048  # Kamera başına kliplerin disk sınırı (aşılınca en eskiler silinir)
+SOURCE_LOOP = False  # True: video dosyası bitince başa sarılır (kesintisiz test için)
+FRAME_STRIDE = 1  # Kaynağın her N karesinin biri işlenir; atlananlar çözülmez (ör. 25 fps arşivde 5 -> 5 fps)
+HELMET_STRIDE = 1  # Baret modeli her N karede bir çalışır (ara karelerde takiple taşınır)
+HELMET_MODE = 'full'  # 'full': tüm kare, 'crop': kişilerin baş bölgesi kırpıntıları, 'tiled': örtüşen karolar (4K)
+HELMET_CROP_IMGSZ = 160  # 'crop' modunda kırpıntıların model girdi boyutu
+HELMET_TILE_SIZE = 640  # 'tiled' modunda karo kenarı (piksel, küçültülmeden modele verilir)
+HELMET_TILE_OVERLAP = 0.2  # Komşu karoların örtüşme oranı
+HELMET_TILE_PERSONS_ONLY = False  # True: sadece kişilerin baş bölgesine değen karolar çalışır
+HELMET_TRACKING = True  # False: baretler için ayrı takipçi çalışmaz, baret kimliği sahibi kişiden gelir
+INFERENCE_BACKEND = 'auto'  # 'auto' (ilk açılışta ölçülür), 'pytorch', 'onnx', 'openvino' veya 'openvino-int8'
+MOTION_GATE = False  # True: sahne değişmeyen karelerde modeller çalışmaz, son sonuçlar kullanılır
+MOTION_MAX_SKIP = 15  # Hareketsiz sahnede en fazla bu kadar kare üst üste atlanır
+DISPLAY_REFRESH_HZ = 15  # Görüntü ve sayaçların arayüzde yenilenme hızı (çıkarım hızından bağımsız)
+
+LOG_FILE = "is_guvenligi.log"  # Boyut/süre dolunca döndürülür, eskiler .gz olarak saklanır
+LOG_VIEW_MAX_LINES = 2000  # Log konsolunda tutulan en fazla satır
+
+# Log konsolunda seviye renkleri (INFO/SUCCESS konsolun varsayılan yeşiliyle yazılır)
+LOG_COLORS = {
+    "WARNING": "#FFB300",
+    "ERROR": "#ff0000",
+    "CRITICAL": "#ff0000",
+}
+LOG_SYMBOLS = {
+    "INFO": "ℹ",
+    "SUCCESS": "✓",
+    "WARNING": "⚠",
+    "ERROR": "✗",
+    "CRITICAL": "🚨",
 }
 
-# --- YARDIMCI FONKSİYONLAR ---
-def get_bbox_center(bbox):
-    x1, y1, x2, y2 = bbox
-    cx = int((x1 + x2) / 2)
-    cy = int((y1 + y2) / 2)
-    return cx, cy
-
-def is_on_shoulders(head_or_helmet_bbox, person_bbox, top_percentage=0.3):
-    h_cx, h_cy = get_bbox_center(head_or_helmet_bbox)
-    p_x1, p_y1, p_x2, p_y2 = person_bbox
-    is_horizontally_aligned = (p_x1 < h_cx < p_x2)
-    person_height = p_y2 - p_y1
-    shoulder_level = p_y1 + (person_height * top_percentage)
-    is_vertically_aligned = (p_y1 < h_cy < shoulder_level)
-    return is_horizontally_aligned and is_vertically_aligned
+def clip_settings():
+    """ClipRecorder argümanları (kayıt kapalıysa None)."""
+    if not CLIP_DIR:
+        return None
+    return {'output_dir': CLIP_DIR, 'pre_seconds': CLIP_PRE_SECONDS, 'post_seconds': CLIP_POST_SECONDS,
+            'buffer_mb': CLIP_BUFFER_MB, 'disk_mb': CLIP_DISK_MB}
 
 # --- VİDEO İŞ PARÇACIĞI ---
 class VideoThread(QThread):
-    change_pixmap_signal = pyqtSignal(QImage)
-    update_counts_signal = pyqtSignal(int, int)
     alert_signal = pyqtSignal(str, str)  # (message, level)
     finished_signal = pyqtSignal()
     fps_signal = pyqtSignal(float)
+    capture_signal = pyqtSignal(float, int)  # (yakalama->çıkarım yaşı ms, atılan kare)
+    diagnostics_signal = pyqtSignal(dict)  # Aşama p50/p95 (ms), yakalama yaşı, atılan kare, kuyruklar
 
-    def __init__(self, source):
+    def __init__(self, source, pool, frame_slot, event_store=None):
         super().__init__()
         self.source = source
+        self.pool = pool
+        self.frame_slot = frame_slot  # Kare ve sayaçlar buraya yazılır, arayüz zamanlayıcıyla çeker
+        self.event_store = event_store
         self._running = True
-        self.ihlal_takip_listesi = {}
-        self.HELMET_CLASS_ID = None
+        # Uyarılan ihlaller veritabanına arka planda yazılır; döngü beklemez
+        self.violations = ViolationTracker(DEFAULTS['warn_after'], store=event_store, camera=CAMERA_ID)
+        # Tanılama paneli kapalıyken zamanlayıcı da kapalıdır (lap() hemen döner)
+        self.timer = StageTimer(enabled=False)
+        self._timer_reset = False
+        # Yapılandırma değişiklikleri döngüde karelerin arasında uygulanır
+        self.config = ConfigApplier(pool, log=self.alert_signal.emit)
         self.frame_count = 0
         self.start_time = time.time()
 
-    def load_models(self):
+    def acquire_pipeline(self):
+        # Modeller uygulama açılışında havuza yüklenir; burada sadece takip durumu sıfırlanır
+        if not self.pool.ready:
+            self.alert_signal.emit("Modeller hâlâ yükleniyor, bekleniyor...", "INFO")
         try:
-            self.alert_signal.emit(f"Kişi modeli yükleniyor...", "INFO")
-            self.model_person = YOLO(MODEL_PERSON_PATH)
-            
-            self.alert_signal.emit(f"Baret modeli yükleniyor...", "INFO")
-            self.model_helmet = YOLO(MODEL_HELMET_PATH)
-            
-            helmet_names = self.model_helmet.names
-            for class_id, name in helmet_names.items():
-                if name == 'helmet':
-                    self.HELMET_CLASS_ID = class_id
-                    break
-            
-            if self.HELMET_CLASS_ID is None:
-                self.alert_signal.emit(f"HATA: 'helmet' sınıfı bulunamadı!", "ERROR")
-                return False
-            
-            self.alert_signal.emit(f"Modeller başarıyla yüklendi", "SUCCESS")
+            self.pipeline = self.pool.acquire()
             return True
         except Exception as e:
             self.alert_signal.emit(f"Model yükleme hatası: {e}", "ERROR")
             return False
 
+    def set_diagnostics(self, enabled):
+        # Arayüz iş parçacığından çağrılır; örnekler işçi döngüsünde temizlenir
+        self.timer.enabled = enabled
+        self._timer_reset = True
+
     def run(self):
-        if not self.load_models():
+        if not self.acquire_pipeline():
             self.finished_signal.emit()
             return
+        # Hat iç aşamalarını (letterbox, modeller, takip, eşleştirme) aynı zamanlayıcıya yazar
+        self.pipeline.timer = self.timer
+        timer = self.timer
 
-        if self.source.isdigit():
-            cap = cv2.VideoCapture(int(self.source))
-        else:
-            cap = cv2.VideoCapture(self.source)
+        # Kaynak ayrı iş parçacığında okunur; canlı kaynaklarda hep en taze kare işlenir.
+        # FRAME_STRIDE ile atlanan kareler çözülmeden geçilir. Kopan canlı kaynağa
+        # arka planda yeniden bağlanılır; modeller ve takipçi bu sırada ayakta kalır
+        cap = LatestFrameCapture(self.source, stride=FRAME_STRIDE, loop=SOURCE_LOOP,
+                                 on_status=self.alert_signal.emit)
 
         if not cap.isOpened():
             self.alert_signal.emit(f"Kaynak açılamadı: {self.source}", "ERROR")
+            cap.release()
             self.finished_signal.emit()
             return
-            
+        cap.start()
+
+        # Son saniyeler JPEG olarak bellekte tutulur; uyarıda klip arka planda yazılır
+        recorder = None
+        clips = clip_settings()
+        if clips is not None:
+            recorder = ClipRecorder(
+                CAMERA_ID, on_saved=lambda path: self.alert_signal.emit(f"İhlal klibi kaydedildi: {path}", "INFO"),
+                **clips)
+            
+        # Yapılandırma dosyası izlenir; dosyadaki güncel ayarlar hemen, sonraki değişiklikler
+        # yeniden başlatmadan uygulanır
+        watcher = ConfigWatcher(CAMERA_ID, DEFAULTS, self.config.on_change, path=CONFIG_FILE,
+                                log=self.alert_signal.emit)
+        self.config.request(watcher.config)
+        watcher.start()
+
         self.alert_signal.emit(f"İzleme başlatıldı", "SUCCESS")
+        # İhlal süreleri işleme hızıyla değil karelerin video zamanıyla ölçülür
+        session_start = time.time()
         fps_start = time.time()
         fps_counter = 0
+        diagnostics_time = time.monotonic()
 
         while self._running:
-            success, frame = cap.read()
+            if self._timer_reset:
+                self._timer_reset = False
+                timer.reset()
+            if self.config.pending:
+                self.config.apply(self.pipeline, self.violations)
+            timer.begin()
+            success, frame = cap.read(timeout=1.0)
             if not success:
+                if not cap.ended:
+                    continue  # Yeniden bağlanılıyor; durdurma isteği kontrol edilir
                 self.alert_signal.emit("Video akışı sonlandı", "WARNING")
                 break
+            timer.lap('capture')
             
             # FPS hesaplama
             fps_counter += 1
             if fps_counter % 30 == 0:
                 fps = 30 / (time.time() - fps_start)
                 self.fps_signal.emit(fps)
+                self.capture_signal.emit(cap.last_age * 1000, cap.frames_dropped)
                 fps_start = time.time()
 
-            # Model çalıştırma
-            results_person = self.model_person.track(frame, persist=True, classes=[0], 
-                                                     conf=PERSON_GUVEN_ESIGI, verbose=False)
-            results_helmet = self.model_helmet.track(frame, persist=True, classes=[self.HELMET_CLASS_ID], 
-                                                     conf=HELMET_GUVEN_ESIGI, verbose=False)
-            
-            persons = []
-            helmets = []
-            if results_person[0].boxes:
-                for box in results_person[0].boxes:
-                    if box.id is not None:
-                        persons.append({'id': int(box.id[0]), 'bbox': list(map(int, box.xyxy[0]))})
-
-            if results_helmet[0].boxes:
-                for box in results_helmet[0].boxes:
-                    if box.id is not None:
-                        helmets.append({'id': int(box.id[0]), 'bbox': list(map(int, box.xyxy[0]))})
-            
-            baret_takan_sayisi = 0
-            baret_takmayan_sayisi = 0
-            current_frame_person_ids_no_helmet = set()
-            drawn_helmet_ids = set()
-
-            for person in persons:
-                person_id = person['id']
-                person_bbox = person['bbox']
-                status = "takmayan"
-                matched_helmet_bbox = None
-
-                for helmet in helmets:
-                    if is_on_shoulders(helmet['bbox'], person_bbox):
-                        status = "takan"
-                        matched_helmet_bbox = helmet['bbox']
-                        drawn_helmet_ids.add(helmet['id'])
-                        break
-                
-                if status == "takan":
-                    baret_takan_sayisi += 1
-                    label = f"ID {person_id}: GUVENLI"
-                    cv2.rectangle(frame, (matched_helmet_bbox[0], matched_helmet_bbox[1]), 
-                                (matched_helmet_bbox[2], matched_helmet_bbox[3]), RENKLER['takan'], 3)
-                    cv2.putText(frame, label, (matched_helmet_bbox[0], matched_helmet_bbox[1] - 10), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, RENKLER['takan'], 2)
-                else:
-                    baret_takmayan_sayisi += 1
-                    current_frame_person_ids_no_helmet.add(person_id)
-                    label = f"ID {person_id}: TEHLIKE!"
-                    cv2.rectangle(frame, (person_bbox[0], person_bbox[1]), 
-                                (person_bbox[2], person_bbox[3]), RENKLER['takmayan'], 3)
-                    cv2.putText(frame, label, (person_bbox[0], person_bbox[1] - 10), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, RENKLER['takmayan'], 2)
-
-                    if person_id not in self.ihlal_takip_listesi:
-                        self.ihlal_takip_listesi[person_id] = {'start_time': time.time(), 'warned': False}
-                    else:
-                        data = self.ihlal_takip_listesi[person_id]
-                        gecen_sure = time.time() - data['start_time']
-                        
-                        if gecen_sure > UYARI_SURESI and not data['warned']:
-                            timestamp = datetime.now().strftime('%H:%M:%S')
-                            self.alert_signal.emit(
-                                f"KISI ID {person_id} - {UYARI_SURESI} saniyedir baret takmiyor!", 
-                                "CRITICAL"
-                            )
-                            data['warned'] = True
-            
-            # İhlal listesi temizliği
-            for person_id in list(self.ihlal_takip_listesi.keys()):
-                if person_id not in current_frame_person_ids_no_helmet:
-                    if self.ihlal_takip_listesi[person_id]['warned']:
-                        self.alert_signal.emit(f"KISI ID {person_id} - İhlal durumu düzeltildi", "INFO")
-                    del self.ihlal_takip_listesi[person_id]
-            
-            # İlişkisiz baretler
-            for helmet in helmets:
-                if helmet['id'] not in drawn_helmet_ids:
-                    bbox = helmet['bbox']
-                    cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), 
-                                RENKLER['unassigned'], 2)
-
-            # Sayaçları güncelle
-            self.update_counts_signal.emit(baret_takan_sayisi, baret_takmayan_sayisi)
-            
-            # Görüntüyü QImage'e çevir
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            convert_to_qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            self.change_pixmap_signal.emit(convert_to_qt_format)
-
+            # Model çalıştırma (tek ön işleme, iki model) ve ilişkilendirme
+            det = self.pipeline.detect(frame)
+            no_helmet = det.person_helmet < 0
+            baret_takmayan_sayisi = int(no_helmet.sum())
+            baret_takan_sayisi = len(det.person_ids) - baret_takmayan_sayisi
+
+            # Kişi ID'si bazlı ihlal zamanlayıcısı
+            warned, resolved = self.violations.update(det.person_ids[no_helmet].tolist(),
+                                                      now=session_start + cap.timestamp,
+                                                      boxes=det.person_boxes[no_helmet].tolist(),
+                                                      confs=det.person_confs[no_helmet].tolist())
+            for person_id in warned:
+                self.alert_signal.emit(
+                    f"KISI ID {person_id} - {self.violations.warn_after:g} saniyedir baret takmiyor!", 
+                    "CRITICAL"
+                )
+                if recorder is not None:
+                    recorder.trigger(person_id, now=cap.timestamp)
+            for person_id in resolved:
+                self.alert_signal.emit(f"KISI ID {person_id} - İhlal durumu düzeltildi", "INFO")
+            timer.lap('violations')
+
+            draw_detections(frame, det)
+            timer.lap('draw')
+            if recorder is not None:
+                recorder.push(frame, now=cap.timestamp)
+                timer.lap('clip')
+
+            # Etiket boyutuna bir kez küçültülüp havuz tamponunu saran BGR888 QImage olarak,
+            # sayaçlarla birlikte son-değer yuvasına yazılır (arayüz gösterilmeyeni atlar)
+            display_frame = self.frame_slot.display_pool.render(frame)
+            self.frame_slot.publish(display_frame, (baret_takan_sayisi, baret_takmayan_sayisi))
+            timer.lap('qimage')
+            timer.commit()
+
+            if timer.enabled and time.monotonic() - diagnostics_time >= 1.0:
+                diagnostics_time = time.monotonic()
+                self.diagnostics_signal.emit(dict(
+                    loop_diagnostics(timer, cap, self.event_store, recorder),
+                    display_skipped=self.frame_slot.coalesced + self.frame_slot.display_pool.dropped))
+
+        if cap.frames_dropped:
+            self.alert_signal.emit(
+                f"Atlanan kare: {cap.frames_dropped}/{cap.frames_captured}, "
+                f"en büyük gecikme: {cap.max_age * 1000:.0f} ms", "INFO")
+        if cap.reconnects:
+            self.alert_signal.emit(
+                f"Yeniden bağlanma: {cap.reconnects}, toplam kesinti: {cap.stall_seconds:.1f} sn", "INFO")
+        if cap.frames_skipped:
+            self.alert_signal.emit(
+                f"Çözülmeden atlanan kare (adım {FRAME_STRIDE}): {cap.frames_skipped}", "INFO")
+        gate = self.pipeline.motion_gate
+        if gate is not None and gate.frames:
+            self.alert_signal.emit(
+                f"Hareketsiz sahne nedeniyle model çalıştırılmayan kare: {gate.skipped}/{gate.frames} "
+                f"(%{gate.skipped_ratio * 100:.1f})", "INFO")
+        watcher.stop()
+        self.config.close()
+        # Süren ihlaller oturum bitişiyle (son karenin video zamanında) kapatılır
+        self.violations.finish(now=session_start + cap.timestamp)
+        if recorder is not None:
+            recorder.close()
         cap.release()
         self.finished_signal.emit()
 
@@ -221,18 +251,144 @@ class VideoThread(QThread):
         self._running = False
         self.wait()
 
+# --- SÜREÇ MODU İŞ PARÇACIĞI ---
+class ProcessVideoThread(QThread):
+    """
+    Hattı ayrı bir işçi süreçte çalıştırır (process_mode.py). Bu iş parçacığı
+    sadece küçük kayıtları kuyruktan okur ve işaretlenmiş kareyi paylaşımlı
+    bellekten alır; VideoThread gibi son-değer yuvasına yazar ve aynı sinyalleri yayar.
+    """
+    alert_signal = pyqtSignal(str, str)  # (message, level)
+    finished_signal = pyqtSignal()
+    fps_signal = pyqtSignal(float)
+    capture_signal = pyqtSignal(float, int)
+    diagnostics_signal = pyqtSignal(dict)  # İşçinin aşama özeti, sayaçları ve kuyrukları
+
+    def __init__(self, source, frame_slot):
+        super().__init__()
+        self.source = source
+        self.frame_slot = frame_slot
+        self.camera = None
+        self._diagnostics = False
+        self._running = True
+
+    def set_diagnostics(self, enabled):
+        # Arayüz iş parçacığından çağrılır; işçi ölçümü süreçler arası bir bayrakla açar
+        self._diagnostics = enabled
+        camera = self.camera
+        if camera is not None:
+            camera.set_diagnostics(enabled)
+
+    def run(self):
+        # İşçi süreç dosyayı kendisi de izler; değişiklikler yeniden başlatmadan uygulanır
+        config = camera_config(CAMERA_ID, CONFIG_FILE, log=self.alert_signal.emit)
+        settings = {
+            'model_person_path': config['model_person_path'],
+            'model_helmet_path': config['model_helmet_path'],
+            'backend': INFERENCE_BACKEND,
+            'person_conf': config['person_conf'],
+            'helmet_conf': config['helmet_conf'],
+            'warn_after': config['warn_after'],
+            'top_percentage': config['top_percentage'],
+            'config_file': CONFIG_FILE,
+            'frame_stride': FRAME_STRIDE,
+            'loop': SOURCE_LOOP,
+            'helmet_stride': HELMET_STRIDE,
+            'helmet_mode': HELMET_MODE,
+            'crop_imgsz': HELMET_CROP_IMGSZ,
+            'tile_size': HELMET_TILE_SIZE,
+            'tile_overlap': HELMET_TILE_OVERLAP,
+            'tile_persons_only': HELMET_TILE_PERSONS_ONLY,
+            'track_helmets': HELMET_TRACKING,
+            'motion_gate': MOTION_GATE,
+            'motion_max_skip': MOTION_MAX_SKIP,
+            'event_db': EVENT_DB,
+            'clips': clip_settings(),
+        }
+        camera = CameraProcess(CAMERA_ID, self.source, settings)
+        self.camera = camera
+        camera.set_diagnostics(self._diagnostics)
+        camera.start()
+        try:
+            while self._running:
+                try:
+                    record = camera.records.get(timeout=0.1)
+                except queue.Empty:
+                    if not camera.process.is_alive():
+                        break
+                    continue
+                kind = record[0]
+                if kind == 'frame':
+                    frame = camera.read_frame()
+                    display_frame = self.frame_slot.display_pool.render(frame) if frame is not None else None
+                    self.frame_slot.publish(display_frame, (record[3], record[4]))
+                elif kind == 'alert':
+                    self.alert_signal.emit(record[2], record[3])
+                elif kind == 'fps':
+                    self.fps_signal.emit(record[2])
+                    self.capture_signal.emit(record[3], record[4])
+                elif kind == 'diagnostics':
+                    self.diagnostics_signal.emit(dict(
+                        record[2],
+                        display_skipped=self.frame_slot.coalesced + self.frame_slot.display_pool.dropped))
+                elif kind == 'finished':
+                    break
+        finally:
+            camera.stop()
+        self.finished_signal.emit()
+
+    def stop(self):
+        self._running = False
+        self.wait()
+
 # --- ANA ARAYÜZ ---
 class MainWindow(QMainWindow):
-    def __init__(self):
+    pool_log_signal = pyqtSignal(str, str)  # Havuz arka plan iş parçacığından gelen loglar
+    pool_ready_signal = pyqtSignal(str)  # Havuz yüklemesi bitti (hata mesajı ya da boş)
+
+    def __init__(self, process_mode=False):
         super().__init__()
+        self.process_mode = process_mode
         self.setWindowTitle("İş Sağlığı ve Güvenliği - Baret Takip Sistemi v2.0")
         self.setGeometry(50, 50, 1600, 900)
         self.thread = None
+        self.display = FrameDisplayPool()  # Kaynaklar arasında yeniden kullanılan görüntü tamponları
+        self.frame_slot = LatestFrameSlot(self.display)
+        # Süreç modunda işçi süreç kendi deposunu açar
+        self.event_store = EventStore(EVENT_DB) if EVENT_DB and not process_mode else None
         self.total_violations = 0
         self.session_start = None
         
         self.setup_ui()
         self.apply_stylesheet()
+
+        # Modeller uygulama ömrü boyunca bir kez yüklenir ve kaynaklar arasında paylaşılır.
+        # Süreç modunda modelleri işçi süreç kendisi yükler. Havuz, pencere göründükten
+        # sonra start_model_pool() ile başlatılır.
+        self.model_pool = None
+        if not self.process_mode:
+            self.pool_log_signal.connect(self.log_message)
+            self.pool_ready_signal.connect(self.model_pool_ready)
+            # Açılışta CONFIG_FILE'daki ayarlarla yüklenir; sonraki değişiklikleri VideoThread uygular
+            config = camera_config(CAMERA_ID, CONFIG_FILE, log=self.log_message)
+            self.model_pool = ModelPool(
+                config['model_person_path'], config['model_helmet_path'], config['person_conf'],
+                config['helmet_conf'], backend=INFERENCE_BACKEND,
+                pipeline_kwargs={
+                    'top_percentage': config['top_percentage'],
+                    'helmet_stride': HELMET_STRIDE,
+                    'helmet_mode': HELMET_MODE,
+                    'crop_imgsz': HELMET_CROP_IMGSZ,
+                    'tile_size': HELMET_TILE_SIZE,
+                    'tile_overlap': HELMET_TILE_OVERLAP,
+                    'tile_persons_only': HELMET_TILE_PERSONS_ONLY,
+                    'track_helmets': HELMET_TRACKING,
+                    'motion_gate': MotionGate(max_skip=MOTION_MAX_SKIP) if MOTION_GATE else None,
+                },
+                log=lambda message: self.pool_log_signal.emit(message, "INFO"),
+                on_ready=lambda error: self.pool_ready_signal.emit(str(error) if error else ""))
+            self.status_label.setText("● Modeller yükleniyor")
+            self.image_label.setText("⚙\n\nModeller yükleniyor...\n\nKaynak şimdiden seçilebilir")
         
         # Saat güncelleyici
         self.clock_timer = QTimer()
@@ -240,6 +396,11 @@ class MainWindow(QMainWindow):
         self.clock_timer.start(1000)
         self.update_clock()
 
+        # Görüntü ve sayaçlar işçinin hızında değil, sabit yenileme hızında çekilir
+        self.refresh_timer = QTimer()
+        self.refresh_timer.setInterval(int(1000 / DISPLAY_REFRESH_HZ))
+        self.refresh_timer.timeout.connect(self.refresh_display)
+
     def setup_ui(self):
         # Ana widget ve layout
         central_widget = QWidget()
@@ -282,13 +443,28 @@ class MainWindow(QMainWindow):
         status_layout = QHBoxLayout()
         self.fps_label = QLabel("FPS: --")
         self.fps_label.setObjectName("statusLabel")
+        self.latency_label = QLabel("Gecikme: -- | Atlanan: 0")
+        self.latency_label.setObjectName("statusLabel")
         self.status_label = QLabel("● Beklemede")
         self.status_label.setObjectName("statusLabel")
+        self.btn_diagnostics = QPushButton("⏱ Tanılama")
+        self.btn_diagnostics.setObjectName("diagButton")
+        self.btn_diagnostics.setCheckable(True)
         status_layout.addWidget(self.fps_label)
+        status_layout.addWidget(self.latency_label)
+        status_layout.addWidget(self.btn_diagnostics)
         status_layout.addStretch()
         status_layout.addWidget(self.status_label)
         video_layout.addLayout(status_layout)
 
+        # Tanılama paneli (katlanır): aşama gecikmeleri, kuyruk derinliği, atılan kareler.
+        # Panel kapalıyken işçi iş parçacığında zamanlayıcı da kapalıdır.
+        self.diag_label = QLabel()
+        self.diag_label.setObjectName("diagPanel")
+        self.diag_label.setVisible(False)
+        video_layout.addWidget(self.diag_label)
+        self.ui_timer = StageTimer(window=120, enabled=False)  # Arayüzdeki kare çizim süresi
+
         # Kontrol butonları
         control_frame = QFrame()
         control_frame.setObjectName("controlFrame")
@@ -381,9 +557,8 @@ class MainWindow(QMainWindow):
         log_group.setObjectName("statsGroup")
         log_layout = QVBoxLayout(log_group)
         
-        self.log_box = QTextEdit()
+        self.log_box = LogView(LOG_VIEW_MAX_LINES, LOG_COLORS)
         self.log_box.setObjectName("logBox")
-        self.log_box.setReadOnly(True)
         self.log_box.setMinimumHeight(250)
         
         log_layout.addWidget(self.log_box)
@@ -398,6 +573,7 @@ class MainWindow(QMainWindow):
         self.btn_webcam.clicked.connect(self.start_webcam)
         self.btn_video.clicked.connect(self.start_video_file)
         self.btn_stop.clicked.connect(self.stop_processing)
+        self.btn_diagnostics.toggled.connect(self.toggle_diagnostics)
 
     def apply_stylesheet(self):
         self.setStyleSheet("""
@@ -569,6 +745,30 @@ class MainWindow(QMainWindow):
                 margin: 3px;
             }
             
+            #diagButton {
+                background-color: #2a2a2a;
+                color: #b0b0b0;
+                font-size: 12px;
+                border: 1px solid #404040;
+                border-radius: 5px;
+                padding: 4px 10px;
+            }
+            
+            #diagButton:checked {
+                background-color: #404040;
+                color: #FFB300;
+            }
+            
+            #diagPanel {
+                background-color: #0a0a0a;
+                color: #b0b0b0;
+                border: 1px solid #404040;
+                border-radius: 5px;
+                font-family: 'Consolas', 'Courier New', monospace;
+                font-size: 12px;
+                padding: 8px;
+            }
+            
             #logBox {
                 background-color: #0a0a0a;
                 color: #00ff00;
@@ -591,6 +791,23 @@ class MainWindow(QMainWindow):
             seconds = elapsed % 60
             self.session_label.setText(f"Oturum Süresi: {hours:02d}:{minutes:02d}:{seconds:02d}")
 
+    def start_model_pool(self):
+        if self.model_pool is not None:
+            self.model_pool.start()
+
+    @pyqtSlot(str)
+    def model_pool_ready(self, error):
+        # Bu arada bir kaynak başlatıldıysa VideoThread havuzu zaten bekliyordur
+        if self.thread is not None:
+            return
+        if error:
+            self.status_label.setText("● Model hatası")
+            self.status_label.setStyleSheet("color: #F44336;")
+            self.image_label.setText(f"⚠\n\nModeller yüklenemedi\n\n{error}")
+            return
+        self.status_label.setText("● Beklemede")
+        self.image_label.setText("📹\n\nSistem Hazır\n\nİzlemeyi başlatmak için kaynak seçin")
+
     def start_webcam(self):
         self.start_processing("0")
 
@@ -607,38 +824,81 @@ class MainWindow(QMainWindow):
             self.log_message("Sistem zaten çalışıyor!", "WARNING")
             return
 
-        self.thread = VideoThread(source)
-        self.thread.change_pixmap_signal.connect(self.update_image)
-        self.thread.update_counts_signal.connect(self.update_counts)
+        size = self.image_label.contentsRect().size()
+        self.display.set_target_size(size.width(), size.height())
+        if self.process_mode:
+            self.thread = ProcessVideoThread(source, self.frame_slot)
+        else:
+            self.thread = VideoThread(source, self.model_pool, self.frame_slot, self.event_store)
+        self.thread.diagnostics_signal.connect(self.update_diagnostics)
+        self.thread.set_diagnostics(self.btn_diagnostics.isChecked())
         self.thread.alert_signal.connect(self.log_message)
         self.thread.finished_signal.connect(self.processing_finished)
         self.thread.fps_signal.connect(self.update_fps)
+        self.thread.capture_signal.connect(self.update_capture_stats)
         
         self.btn_webcam.setEnabled(False)
         self.btn_video.setEnabled(False)
         self.btn_stop.setEnabled(True)
         self.status_label.setText("● İşleniyor")
         self.status_label.setStyleSheet("color: #4CAF50;")
-        self.image_label.setText("⚙\n\nModeller yükleniyor...\n\nLütfen bekleyin")
+        if self.model_pool is None or not self.model_pool.ready:
+            self.image_label.setText("⚙\n\nModeller yükleniyor...\n\nLütfen bekleyin")
+        else:
+            self.image_label.setText("⚙\n\nKaynak açılıyor...")
         
         self.session_start = datetime.now()
         self.total_violations = 0
         self.thread.start()
+        self.refresh_timer.start()
 
     def stop_processing(self):
         if self.thread:
             self.thread.stop()
             self.log_message("Durdurma komutu gönderildi", "INFO")
 
-    @pyqtSlot(QImage)
-    def update_image(self, qt_image):
-        pixmap = QPixmap.fromImage(qt_image)
-        scaled_pixmap = pixmap.scaled(
-            self.image_label.size(), 
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self.image_label.setPixmap(scaled_pixmap)
+    @pyqtSlot()
+    def refresh_display(self):
+        display_frame, counts = self.frame_slot.take()
+        if counts is not None:
+            self.update_counts(*counts)
+        if display_frame is None:
+            return
+        self.ui_timer.begin()
+        # Kare işçide etiket boyutuna küçültüldü; burada sadece pixmap'e aktarılır
+        pixmap = QPixmap.fromImage(display_frame.image)
+        self.display.release(display_frame)
+        self.image_label.setPixmap(pixmap)
+        size = self.image_label.contentsRect().size()
+        self.display.set_target_size(size.width(), size.height())
+        self.ui_timer.lap('ui_paint')
+        self.ui_timer.commit()
+
+    @pyqtSlot(bool)
+    def toggle_diagnostics(self, checked):
+        self.diag_label.setVisible(checked)
+        self.ui_timer.enabled = checked
+        self.ui_timer.reset()
+        if self.thread is not None:
+            self.thread.set_diagnostics(checked)
+        if checked:
+            self.diag_label.setText("Ölçümler toplanıyor...")
+
+    @pyqtSlot(dict)
+    def update_diagnostics(self, diagnostics):
+        if not self.diag_label.isVisible():
+            return
+        stages = dict(diagnostics['stages'])
+        stages.update(self.ui_timer.summary())
+        lines = [f"{'Aşama':<14}{'p50 ms':>9}{'p95 ms':>9}"]
+        for stage, row in stages.items():
+            lines.append(f"{stage:<14}{row['p50']:>9.1f}{row['p95']:>9.1f}")
+        lines.append(f"Yakalama yaşı: {diagnostics['capture_age_ms']:.0f} ms | "
+                     f"Atılan kare: {diagnostics['dropped']}/{diagnostics['captured']} | "
+                     f"Gösterilmeyen: {diagnostics['display_skipped']}")
+        lines.append(f"Yeniden bağlanma: {diagnostics['reconnects']} | Kesinti: {diagnostics['stall_s']:.1f} sn")
+        lines.append("Kuyruk: " + " | ".join(f"{name} {depth}" for name, depth in diagnostics['queues'].items()))
+        self.diag_label.setText("\n".join(lines))
 
     @pyqtSlot(int, int)
     def update_counts(self, takan, takmayan):
@@ -649,48 +909,24 @@ class MainWindow(QMainWindow):
     def update_fps(self, fps):
         self.fps_label.setText(f"FPS: {fps:.1f}")
 
+    @pyqtSlot(float, int)
+    def update_capture_stats(self, age_ms, dropped):
+        self.latency_label.setText(f"Gecikme: {age_ms:.0f} ms | Atlanan: {dropped}")
+
     @pyqtSlot(str, str)
     def log_message(self, message, level):
         timestamp = datetime.now().strftime('%H:%M:%S')
-        
-        # Renk kodları
-        colors = {
-            "INFO": "#00ff00",
-            "SUCCESS": "#00ff00",
-            "WARNING": "#FFB300",
-            "ERROR": "#ff0000",
-            "CRITICAL": "#ff0000"
-        }
-        
-        symbols = {
-            "INFO": "ℹ",
-            "SUCCESS": "✓",
-            "WARNING": "⚠",
-            "ERROR": "✗",
-            "CRITICAL": "🚨"
-        }
-        
-        color = colors.get(level, "#00ff00")
-        symbol = symbols.get(level, "•")
-        
-        formatted_msg = f'<span style="color:{color}">[{timestamp}] {symbol} {message}</span>'
-        self.log_box.append(formatted_msg)
-        self.log_box.verticalScrollBar().setValue(self.log_box.verticalScrollBar().maximum())
-        
-        # Loglama
-        if level == "ERROR" or level == "CRITICAL":
-            logging.error(message)
-            if level == "CRITICAL":
-                self.total_violations += 1
-                self.violation_label.setText(f"Toplam İhlal: {self.total_violations}")
-        elif level == "WARNING":
-            logging.warning(message)
-        else:
-            logging.info(message)
+        self.log_box.append_line(f"[{timestamp}] {LOG_SYMBOLS.get(level, '•')} {message}", level)
+        # Dosyaya yazma kuyruk üzerinden arka planda yapılır
+        log_event(message, level)
+        if level == "CRITICAL":
+            self.total_violations += 1
+            self.violation_label.setText(f"Toplam İhlal: {self.total_violations}")
 
     @pyqtSlot()
     def processing_finished(self):
         self.log_message("İzleme durduruldu", "INFO")
+        self.refresh_timer.stop()
         self.btn_webcam.setEnabled(True)
         self.btn_video.setEnabled(True)
         self.btn_stop.setEnabled(False)
@@ -699,25 +935,48 @@ class MainWindow(QMainWindow):
         self.image_label.clear()
         self.image_label.setText("📹\n\nSistem Hazır\n\nİzlemeyi başlatmak için kaynak seçin")
         self.fps_label.setText("FPS: --")
+        self.latency_label.setText("Gecikme: -- | Atlanan: 0")
         self.session_start = None
         
         if self.thread:
             self.thread.quit()
             self.thread.wait()
             self.thread = None
+        # Gösterilmeden kalan son kare havuza geri verilir
+        self.frame_slot.clear()
 
     def closeEvent(self, event):
         """Uygulama kapatılırken thread'i düzgün sonlandır"""
         if self.thread and self.thread.isRunning():
             self.thread.stop()
+        if self.event_store is not None:
+            self.event_store.close()
         event.accept()
 
 # --- UYGULAMA BAŞLATMA ---
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    arg_parser = argparse.ArgumentParser(description="Baret Takip Sistemi arayüzü")
+    arg_parser.add_argument('--process-mode', action='store_true',
+                            help="Kamera hattını ayrı bir süreçte çalıştır (paylaşımlı bellek ile)")
+    arg_parser.add_argument('--startup-profile', action='store_true',
+                            help="Açılışın aşamalarına göre süre raporunu yazdır")
+    args, qt_args = arg_parser.parse_known_args()
+    PROFILE.enabled = args.startup_profile
+    # Dosyaya yazma arka plan iş parçacığında yapılır. Sadece ana süreçte kurulur: 'spawn' ile
+    # başlayan işçiler bu modülü yeniden içe aktarır ve kayıtlarını ana sürece kuyrukla gönderir
+    setup_logging(LOG_FILE)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle('Fusion')  # Modern görünüm için
     
-    window = MainWindow()
+    window = MainWindow(process_mode=args.process_mode)
     window.show()
+    # Pencere çizilmeden arka plan yüklemesi başlamasın (torch içe aktarması GIL'i meşgul eder)
+    app.processEvents()
+    PROFILE.mark("pencere gösterildi")
+    if window.model_pool is not None:
+        window.start_model_pool()
+    elif PROFILE.enabled:
+        print(PROFILE.report())
     
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Açılış süresi profili.
+
+Arayüz dosyaları bu modülü ilk iş olarak içe aktarır; sıfır noktası buradaki
+zaman damgasıdır. Açılışın aşamaları (arayüz içe aktarmaları, pencerenin
+görünmesi, torch/ultralytics içe aktarmaları, model yükleme, ısıtma)
+PROFILE.mark() ile işaretlenir ve --startup-profile verildiğinde rapor
+yazdırılır. İçe aktarma ayrıntısı için: python -X importtime son.py
+"""
+import threading
+import time
+
+_T0 = time.perf_counter()
+
+
+class StartupProfile:
+    def __init__(self):
+        self.enabled = False
+        self.marks = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Aşamanın bittiği anı (açılıştan itibaren saniye) kaydeder."""
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - _T0))
+
+    def report(self):
+        lines = [f"{'Aşama':<36} {'Süre (ms)':>10} {'Toplam (ms)':>12}"]
+        previous = 0.0
+        with self._lock:
+            marks = list(self.marks)
+        for name, at in marks:
+            lines.append(f"{name:<36} {(at - previous) * 1000:>10.0f} {at * 1000:>12.0f}")
+            previous = at
+        return "\n".join(lines)
+
+
+PROFILE = StartupProfile()
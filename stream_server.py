@@ -0,0 +1,132 @@
+"""
+Ağ kamerası yerine geçen yerel MJPEG akış sunucusu (test için).
+
+Bir video dosyasını kendi FPS'inde, sonsuz döngüde HTTP üzerinden
+multipart MJPEG olarak yayınlar; OpenCV (FFmpeg) bu adresi bir IP kamera
+gibi açar. --drop-every ile akış belirli aralıklarla kesilir ve sunucu
+--down-for süresince bağlantıları 503 ile reddeder; böylece yeniden
+bağlanma, bekleme süreleri ve kesinti metrikleri yerelde denenebilir.
+
+Kullanım:
+    python stream_server.py --file kayit.mp4 --port 8554 --drop-every 20 --down-for 5
+    python son.py  # kaynak: http://127.0.0.1:8554/stream.mjpg
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+STREAM_PATH = '/stream.mjpg'
+BOUNDARY = 'frame'
+
+
+class StreamServer(ThreadingHTTPServer):
+    """Dosyayı döngüde MJPEG olarak yayınlayan, istenirse kesinti üreten HTTP sunucusu."""
+
+    daemon_threads = True
+
+    def __init__(self, address, path, drop_every=0.0, down_for=0.0, jpeg_quality=80):
+        super().__init__(address, StreamHandler)
+        self.path = path
+        self.drop_every = drop_every
+        self.down_for = down_for
+        self.jpeg_quality = jpeg_quality
+        self.down_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{STREAM_PATH}"
+
+    def is_down(self):
+        return time.monotonic() < self.down_until
+
+    def go_down(self):
+        with self._lock:
+            if not self.is_down():
+                self.down_until = time.monotonic() + self.down_for
+                print(f"[SUNUCU] Akış kesildi, {self.down_for:.0f} sn bağlantı kabul edilmeyecek.")
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if self.path != STREAM_PATH:
+            self.send_error(404)
+            return
+        if server.is_down():
+            self.send_error(503)
+            return
+        cap = cv2.VideoCapture(server.path)
+        if not cap.isOpened():
+            self.send_error(500, f"Dosya açılamadı: {server.path}")
+            return
+        interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 25.0)
+        params = [cv2.IMWRITE_JPEG_QUALITY, server.jpeg_quality]
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        print(f"[SUNUCU] İstemci bağlandı: {self.client_address[0]}")
+        started = time.monotonic()
+        next_frame = started
+        try:
+            while not server.is_down():
+                if server.drop_every and time.monotonic() - started >= server.drop_every:
+                    server.go_down()
+                    break
+                success, frame = cap.read()
+                if not success:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Dosya bitince başa sar
+                    continue
+                ok, jpeg = cv2.imencode('.jpg', frame, params)
+                if not ok:
+                    continue
+                data = jpeg.tobytes()
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(data)}\r\n\r\n".encode('ascii'))
+                self.wfile.write(data)
+                self.wfile.write(b"\r\n")
+                # Dosyanın kendi hızında yayınlanır; geride kalınırsa beklenmez
+                next_frame += interval
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError):
+            print(f"[SUNUCU] İstemci ayrıldı: {self.client_address[0]}")
+        finally:
+            cap.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video dosyasını ağ kamerası gibi yayınlayan yerel MJPEG sunucusu")
+    parser.add_argument('--file', required=True, help="Yayınlanacak video dosyası")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8554)
+    parser.add_argument('--drop-every', type=float, default=0.0,
+                        help="Her bağlantıyı bu kadar saniye sonra kes (0 = kesme)")
+    parser.add_argument('--down-for', type=float, default=5.0,
+                        help="Kesintiden sonra bağlantıların reddedileceği süre (sn)")
+    parser.add_argument('--jpeg-quality', type=int, default=80)
+    args = parser.parse_args()
+
+    server = StreamServer((args.host, args.port), args.file, args.drop_every, args.down_for, args.jpeg_quality)
+    print(f"[SUNUCU] '{args.file}' yayında: {server.url} (durdurmak için Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Baret modeli adımının (helmet_stride) doğruluk kaybını ölçer.
+
+Aynı video, tam hızda (her karede baret modeli) çalışan referans hat ile
+verilen adımlarla çalışan hatlardan aynı anda geçirilir. ultralytics takip
+ID'lerini süreç genelinde tek sayaçtan dağıttığı için hatların kişi ID'leri
+birbirini tutmaz; her karede adımlı hattın kişileri referans kişilere kutu
+IoU'suyla eşlenir ve eşlenen her kişi-kare için "baret var/yok" kararları
+karşılaştırılır. Modeller uygulamanın kullandığı arka uçla yüklenir.
+
+Kullanım:
+    python stride_eval.py --source kayit.mp4 --strides 2 3 5
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from association import box_iou
+from backends import BACKENDS, load_models
+from live_config import CONFIG_FILE, DEFAULT_CAMERA, camera_config
+from pipeline import DetectionPipeline, find_helmet_class_id
+
+MATCH_IOU = 0.5  # Adımlı hattaki kişinin referans kişiyle aynı sayılması için en düşük IoU
+
+
+def match_persons(reference_boxes, boxes, threshold=MATCH_IOU):
+    """
+    İki hattın kişi kutularını IoU'ya göre açgözlü biçimde bire bir eşler;
+    (referans indeksi, adımlı hat indeksi) çiftlerini döndürür.
+    """
+    if len(reference_boxes) == 0 or len(boxes) == 0:
+        return []
+    boxes = np.asarray(boxes, dtype=np.float64)
+    iou = np.stack([box_iou(box, boxes) for box in np.asarray(reference_boxes, dtype=np.float64)])
+    ref_idx, idx = np.nonzero(iou >= threshold)
+    pairs = []
+    ref_used, used = set(), set()
+    for k in np.argsort(-iou[ref_idx, idx], kind='stable'):
+        r, i = int(ref_idx[k]), int(idx[k])
+        if r not in ref_used and i not in used:
+            ref_used.add(r)
+            used.add(i)
+            pairs.append((r, i))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baret modeli adımı için doğruluk/maliyet raporu")
+    parser.add_argument('--source', required=True, help="Değerlendirilecek video dosyası")
+    parser.add_argument('--strides', type=int, nargs='+', default=[2, 3, 5])
+    parser.add_argument('--max-frames', type=int, default=0, help="0 = tüm video")
+    parser.add_argument('--backend', choices=('auto',) + BACKENDS, default='auto')
+    parser.add_argument('--config', default=CONFIG_FILE, help="Eşiklerin ve model yollarının okunduğu ayar dosyası")
+    parser.add_argument('--camera', default=DEFAULT_CAMERA, help="Ayar dosyasında kullanılacak kamera adı")
+    args = parser.parse_args()
+
+    config = camera_config(args.camera, args.config)
+    model_person, model_helmet, backend = load_models(config['model_person_path'], config['model_helmet_path'],
+                                                      args.backend)
+    print(f"[BİLGİ] Çıkarım arka ucu: {backend}")
+    helmet_class_id = find_helmet_class_id(model_helmet)
+    if helmet_class_id is None:
+        print(f"Hata: '{config['model_helmet_path']}' içinde 'helmet' sınıfı bulunamadı.")
+        return
+
+    strides = [1] + sorted(set(s for s in args.strides if s > 1))
+    pipelines = {s: DetectionPipeline(model_person, model_helmet, helmet_class_id,
+                                      config['person_conf'], config['helmet_conf'],
+                                      top_percentage=config['top_percentage'], helmet_stride=s)
+                 for s in strides}
+    stats = {s: {'time': 0.0, 'person_frames': 0, 'unmatched': 0, 'agree': 0, 'false_safe': 0,
+                 'false_unsafe': 0}
+             for s in strides}
+
+    cap = cv2.VideoCapture(args.source)
+    if not cap.isOpened():
+        print(f"Hata: Kaynak '{args.source}' açılamadı.")
+        return
+
+    frames = 0
+    while True:
+        success, frame = cap.read()
+        if not success or (args.max_frames and frames >= args.max_frames):
+            break
+        frames += 1
+
+        reference = None
+        for s in strides:
+            start = time.perf_counter()
+            det = pipelines[s].detect(frame)
+            stats[s]['time'] += time.perf_counter() - start
+            if s == 1:
+                reference = det
+                continue
+            pairs = match_persons(reference.person_boxes, det.person_boxes)
+            stats[s]['unmatched'] += len(reference.person_boxes) - len(pairs)
+            for r, i in pairs:
+                ref_safe = reference.person_helmet[r] >= 0
+                safe = det.person_helmet[i] >= 0
+                stats[s]['person_frames'] += 1
+                if safe == ref_safe:
+                    stats[s]['agree'] += 1
+                elif safe:
+                    stats[s]['false_safe'] += 1      # Referans: baret yok, adımlı: var
+                else:
+                    stats[s]['false_unsafe'] += 1    # Referans: baret var, adımlı: yok
+    cap.release()
+
+    if frames == 0:
+        print("Hiç kare okunamadı.")
+        return
+
+    base_ms = stats[1]['time'] / frames * 1000
+    print(f"{frames} kare işlendi. Referans (adım 1): {base_ms:.1f} ms/kare")
+    print(f"{'Adım':>5} {'ms/kare':>9} {'Hız':>6} {'Uyum %':>8} {'Yanlış güvenli':>15} {'Yanlış tehlike':>15} "
+          f"{'Eşlenmeyen':>11}")
+    for s in strides[1:]:
+        st = stats[s]
+        ms = st['time'] / frames * 1000
+        # Hiç kişi eşlenmediyse uyum ölçülemez
+        agree = f"{100.0 * st['agree'] / st['person_frames']:>8.2f}" if st['person_frames'] else f"{'-':>8}"
+        print(f"{s:>5} {ms:>9.1f} {base_ms / ms:>5.2f}x {agree} "
+              f"{st['false_safe']:>15} {st['false_unsafe']:>15} {st['unmatched']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from association import associate, box_iou, box_ios, is_on_shoulders, nms, shoulder_matrix
+
+
+def helmet_at(cx, cy, half=10):
+    """Merkezi (cx, cy) olan kare baret kutusu."""
+    return [cx - half, cy - half, cx + half, cy + half]
+
+
+def test_shared_helmet_goes_to_one_person_only():
+    # Yan yana duran iki kişi; baret ikisinin de omuz bandında ama soldakinin başına daha yakın
+    persons = np.array([[0, 0, 100, 300], [50, 0, 150, 300]])
+    helmets = np.array([helmet_at(60, 40)])
+    assert shoulder_matrix(helmets, persons).all()
+
+    result = associate(persons, helmets)
+    assert result.person_helmet.tolist() == [0, -1]
+    assert result.helmet_used.tolist() == [True]
+
+
+def test_each_person_gets_its_own_helmet():
+    persons = np.array([[0, 0, 100, 300], [50, 0, 150, 300]])
+    helmets = np.array([helmet_at(95, 45), helmet_at(55, 45)])
+    result = associate(persons, helmets)
+    assert result.person_helmet.tolist() == [1, 0]
+    assert result.helmet_used.tolist() == [True, True]
+
+
+def test_helmet_closest_to_head_point_wins():
+    # Beklenen baş noktası (50, 45); iki baret de omuz bandında, indeks sırası yanıltıcı
+    persons = np.array([[0, 0, 100, 300]])
+    helmets = np.array([helmet_at(20, 80), helmet_at(52, 44)])
+    result = associate(persons, helmets)
+    assert result.person_helmet.tolist() == [1]
+    assert result.helmet_used.tolist() == [False, True]
+
+
+def test_helmet_below_shoulders_is_not_assigned():
+    persons = np.array([[0, 0, 100, 300]])
+    helmets = np.array([helmet_at(50, 150)])
+    result = associate(persons, helmets)
+    assert result.person_helmet.tolist() == [-1]
+    assert result.helmet_used.tolist() == [False]
+
+
+def test_shoulder_matrix_matches_scalar_rule():
+    rng = np.random.default_rng(0)
+    persons = rng.integers(0, 200, size=(8, 2))
+    persons = np.hstack([persons, persons + rng.integers(20, 200, size=(8, 2))])
+    helmets = rng.integers(0, 400, size=(12, 2))
+    helmets = np.hstack([helmets, helmets + 15])
+    matrix = shoulder_matrix(helmets, persons)
+    for i, person in enumerate(persons):
+        for j, helmet in enumerate(helmets):
+            assert matrix[i, j] == is_on_shoulders(helmet, person)
+
+
+@pytest.mark.parametrize('persons, helmets', [
+    (np.zeros((0, 4)), np.array([helmet_at(50, 40)])),
+    (np.array([[0, 0, 100, 300]]), np.zeros((0, 4))),
+    (np.zeros((0, 4)), np.zeros((0, 4))),
+])
+def test_empty_inputs(persons, helmets):
+    result = associate(persons, helmets)
+    assert result.person_helmet.tolist() == [-1] * len(persons)
+    assert result.helmet_used.tolist() == [False] * len(helmets)
+    assert shoulder_matrix(helmets, persons).shape == (len(persons), len(helmets))
+
+
+def test_box_iou_and_ios():
+    box = np.array([0, 0, 10, 10])
+    others = np.array([[5, 0, 15, 10], [0, 0, 20, 20], [20, 20, 30, 30]])
+    assert box_iou(box, others) == pytest.approx([1 / 3, 0.25, 0.0])
+    assert box_ios(box, others) == pytest.approx([0.5, 1.0, 0.0])
+
+
+def test_nms_suppresses_overlapping_lower_scores():
+    boxes = np.array([[0, 0, 10, 10], [1, 0, 11, 10], [50, 50, 60, 60]])
+    scores = np.array([0.6, 0.9, 0.7])
+    assert nms(boxes, scores).tolist() == [1, 2]
+
+
+def test_nms_ios_threshold_drops_box_cut_by_tile_edge():
+    # Karo kenarında kesilmiş yarım baret: IoU düşük ama büyük ölçüde diğerinin içinde
+    boxes = np.array([[0, 0, 20, 20], [0, 0, 20, 8]])
+    scores = np.array([0.9, 0.8])
+    assert nms(boxes, scores).tolist() == [0, 1]
+    assert nms(boxes, scores, ios_threshold=0.8).tolist() == [0]
+
+
+def test_nms_empty():
+    keep = nms(np.zeros((0, 4)), np.zeros(0))
+    assert keep.dtype == np.int64
+    assert len(keep) == 0
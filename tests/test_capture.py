@@ -0,0 +1,66 @@
+import cv2
+import pytest
+
+import capture
+from capture import StridedReader
+from violations import ViolationTracker
+
+
+class FakeCapture:
+    """Her read() çağrısında boş bir kare veren, sadece FPS bildiren kaynak."""
+
+    def __init__(self, fps=10.0):
+        self.fps = fps
+
+    def read(self):
+        return True, object()
+
+    def grab(self):
+        return True
+
+    def get(self, prop):
+        return self.fps if prop == cv2.CAP_PROP_FPS else 0.0
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """capture modülünün gördüğü monotonic saati elle ilerletir."""
+    now = [1000.0]
+    monkeypatch.setattr(capture.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_live_timestamp_excludes_reconnect_outage(clock):
+    reader = StridedReader(FakeCapture(), live=True)
+    reader.read()
+    clock[0] += 0.1
+    reader.read()
+    assert reader.timestamp == pytest.approx(0.1)
+
+    clock[0] += 60.0  # Kaynak bir dakika koptu
+    reader.reopen(FakeCapture())
+    reader.read()
+    assert reader.timestamp == pytest.approx(0.2)
+
+    clock[0] += 0.1  # Kesintiden sonra zaman yine gerçek hızda akar
+    reader.read()
+    assert reader.timestamp == pytest.approx(0.3)
+
+
+def test_outage_does_not_trigger_violation_warning(clock):
+    reader = StridedReader(FakeCapture(), live=True)
+    violations = ViolationTracker(warn_after=10)
+    reader.read()
+    assert violations.update([1, 2], now=reader.timestamp) == ([], [])
+
+    clock[0] += 30.0
+    reader.reopen(FakeCapture())
+    reader.read()
+    assert violations.update([1, 2], now=reader.timestamp) == ([], [])
+
+    clock[0] += 10.0  # Kesintisiz 10 sn'yi geçince uyarı yine verilir
+    reader.read()
+    assert violations.update([1, 2], now=reader.timestamp) == ([1, 2], [])
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+import event_store
+from event_store import EventStore, query_violations, summarize
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "ihlaller.db")
+
+
+@pytest.fixture
+def held_writer(monkeypatch):
+    """Yazıcı iş parçacığını bağlantı açılışında bekletir; olaylar kuyrukta birikir."""
+    release = threading.Event()
+    connect = event_store.connect
+
+    def held_connect(path):
+        release.wait(5.0)
+        return connect(path)
+
+    monkeypatch.setattr(event_store, 'connect', held_connect)
+    return release
+
+
+def test_queued_events_are_written_in_batches(db, held_writer, monkeypatch):
+    batches = []
+    write = EventStore._write
+
+    def recording_write(self, conn, batch):
+        batches.append(len(batch))
+        write(self, conn, batch)
+
+    monkeypatch.setattr(EventStore, '_write', recording_write)
+
+    store = EventStore(db, max_batch=3)
+    for person_id in range(7):
+        store.violation_started('cam0', person_id, 100.0 + person_id)
+    assert store.queued == 7
+    held_writer.set()
+    store.close()
+
+    assert store.queued == 0
+    assert batches == [3, 3, 1]
+    assert store.written == 7
+    assert len(query_violations(db)) == 7
+
+
+def test_end_in_same_batch_updates_started_row(db, held_writer):
+    store = EventStore(db)
+    store.violation_started('cam0', 5, 100.0, bbox=(1.7, 2, 30, 40), confidence=0.5)
+    store.violation_ended('cam0', 5, 100.0, 112.5)
+    held_writer.set()
+    store.close()
+
+    (row,) = query_violations(db)
+    assert (row['x1'], row['y1'], row['x2'], row['y2']) == (1, 2, 30, 40)
+    assert row['end_time'] == 112.5
+    assert row['duration'] == pytest.approx(12.5)
+
+
+def test_close_flushes_pending_events_and_stops_writer(db):
+    store = EventStore(db)
+    store.violation_started('cam0', 1, 100.0)
+    store.violation_started('cam1', 2, 101.0)
+    store.close()
+
+    assert not store._thread.is_alive()
+    assert store.written == 2
+    assert {row['camera'] for row in query_violations(db)} == {'cam0', 'cam1'}
+
+
+@pytest.fixture
+def filled_db(db):
+    store = EventStore(db)
+    for camera, person_id, start, end in [('cam0', 1, 100.0, 110.0),
+                                          ('cam0', 2, 200.0, 230.0),
+                                          ('cam1', 3, 150.0, 155.0),
+                                          ('cam1', 4, 300.0, None)]:
+        store.violation_started(camera, person_id, start)
+        if end is not None:
+            store.violation_ended(camera, person_id, start, end)
+    store.close()
+    return db
+
+
+def test_query_violations_filters(filled_db):
+    assert [row['person_id'] for row in query_violations(filled_db)] == [4, 2, 3, 1]
+    assert [row['person_id'] for row in query_violations(filled_db, camera='cam0')] == [2, 1]
+    assert [row['person_id'] for row in query_violations(filled_db, since=150.0, until=300.0)] == [2, 3]
+    assert [row['person_id'] for row in query_violations(filled_db, limit=2)] == [4, 2]
+    assert query_violations(filled_db, camera='cam9') == []
+
+
+def test_summarize_counts_and_durations(filled_db):
+    cam0, cam1 = summarize(filled_db)
+    assert (cam0['camera'], cam0['count']) == ('cam0', 2)
+    assert cam0['total_duration'] == pytest.approx(40.0)
+    assert cam0['mean_duration'] == pytest.approx(20.0)
+    # Süren ihlal sayılır ama süre ortalamasına girmez
+    assert (cam1['camera'], cam1['count']) == ('cam1', 2)
+    assert cam1['mean_duration'] == pytest.approx(5.0)
+
+    assert summarize(filled_db, since=150.0) == [
+        {'camera': 'cam0', 'count': 1, 'total_duration': 30.0, 'mean_duration': 30.0},
+        {'camera': 'cam1', 'count': 2, 'total_duration': 5.0, 'mean_duration': 5.0},
+    ]
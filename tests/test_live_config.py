@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from live_config import DEFAULTS, ConfigApplier, ConfigWatcher, camera_config, load_camera_config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "kameralar.yaml"
+
+    def write(text):
+        # Dosya sistemi zaman çözünürlüğüne takılmamak için mtime elle ilerletilir
+        mtime = os.stat(path).st_mtime_ns + 1_000_000_000 if path.exists() else None
+        path.write_text(text, encoding='utf-8')
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    write.path = str(path)
+    return write
+
+
+def test_camera_section_overrides_defaults_section(config_file):
+    config_file("defaults:\n  helmet_conf: 0.6\n  warn_after: 5\n"
+                "cameras:\n  cam1:\n    helmet_conf: 0.7\n")
+    assert load_camera_config(config_file.path, 'cam1', DEFAULTS) == dict(DEFAULTS, helmet_conf=0.7, warn_after=5.0)
+    assert load_camera_config(config_file.path, 'cam2', DEFAULTS) == dict(DEFAULTS, helmet_conf=0.6, warn_after=5.0)
+    assert load_camera_config(config_file.path, None, DEFAULTS)['helmet_conf'] == 0.6
+
+
+def test_missing_file_gives_defaults(tmp_path):
+    assert load_camera_config(str(tmp_path / "yok.yaml"), 'cam0', DEFAULTS) == DEFAULTS
+
+
+@pytest.mark.parametrize('text, message', [
+    ("defaults:\n  helmet_cof: 0.5\n", "bilinmeyen ayar"),
+    ("defaults:\n  helmet_conf: 1.5\n", "aralık dışında"),
+    ("defaults:\n  warn_after: -1\n", "aralık dışında"),
+    ("defaults:\n  person_conf: yes\n", "sayı olmalı"),
+    ("defaults:\n  person_conf: '0.5'\n", "sayı olmalı"),
+    ("cameras:\n  cam0:\n    model_helmet_path: ''\n", "dosya yolu olmalı"),
+    ("cameras:\n  cam0: [0.5]\n", "eşlemesi olmalı"),
+    ("cameras: [cam0]\n", "eşlemesi olmalı"),
+    ("- defaults\n", "en üst seviyede"),
+    ("defaults: {helmet_conf: 0.5\n", "okunamadı"),
+])
+def test_invalid_file_is_rejected(config_file, text, message):
+    config_file(text)
+    with pytest.raises(ValueError, match=message):
+        load_camera_config(config_file.path, 'cam0', DEFAULTS)
+    # Ön uçlar hatayı loglayıp sabitlerle açılır
+    logged = []
+    assert camera_config('cam0', config_file.path, log=lambda *args: logged.append(args)) == DEFAULTS
+    assert logged[0][1] == "ERROR"
+
+
+def test_integer_thresholds_become_floats(config_file):
+    config_file("defaults:\n  warn_after: 3\n")
+    warn_after = load_camera_config(config_file.path, 'cam0', DEFAULTS)['warn_after']
+    assert warn_after == 3.0 and isinstance(warn_after, float)
+
+
+def test_watcher_reports_changed_keys_after_mtime_change(config_file):
+    config_file("defaults:\n  helmet_conf: 0.6\n")
+    calls = []
+    watcher = ConfigWatcher('cam0', DEFAULTS, lambda config, changed: calls.append((config, changed)),
+                            path=config_file.path)
+    assert watcher.config['helmet_conf'] == 0.6
+    assert watcher.check() == []  # Dosya değişmedi
+
+    config_file("defaults:\n  helmet_conf: 0.6\n  warn_after: 20\n")
+    assert watcher.check() == ['warn_after']
+    assert calls == [(dict(DEFAULTS, helmet_conf=0.6, warn_after=20.0), ['warn_after'])]
+
+
+def test_watcher_reverts_deleted_key_to_default(config_file):
+    config_file("cameras:\n  cam0:\n    top_percentage: 0.4\n")
+    watcher = ConfigWatcher('cam0', DEFAULTS, lambda config, changed: None, path=config_file.path)
+    config_file("cameras:\n  cam0: {}\n")
+    assert watcher.check() == ['top_percentage']
+    assert watcher.config == DEFAULTS
+
+
+def test_watcher_keeps_last_valid_config_on_error(config_file):
+    config_file("defaults:\n  helmet_conf: 0.6\n")
+    logged = []
+    watcher = ConfigWatcher('cam0', DEFAULTS, lambda config, changed: None, path=config_file.path,
+                            log=lambda *args: logged.append(args))
+    config_file("defaults:\n  helmet_conf: 2\n")
+    assert watcher.check() == []
+    assert watcher.config['helmet_conf'] == 0.6
+    assert logged[0][1] == "ERROR"
+
+    config_file("defaults:\n  helmet_conf: 0.5\n")
+    assert watcher.check() == ['helmet_conf']
+
+
+class FakePool:
+    """Yükleme isteklerini kaydeden, tamamlanmalarını testin elle tetiklediği model havuzu."""
+
+    def __init__(self):
+        self.model_person_path = DEFAULTS['model_person_path']
+        self.model_helmet_path = DEFAULTS['model_helmet_path']
+        self.loads = []
+        self.cancelled = 0
+
+    def load_replacement(self, model_person_path, model_helmet_path, on_done):
+        self.loads.append(((model_person_path, model_helmet_path), on_done))
+
+    def cancel_replacement(self):
+        self.cancelled += 1
+
+
+def test_applier_ignores_result_of_superseded_load():
+    pool = FakePool()
+    applier = ConfigApplier(pool, log=lambda *args: None)
+    applier.request(dict(DEFAULTS, model_helmet_path='best_v2.pt'))
+    applier.request(dict(DEFAULTS, model_helmet_path='best_v3.pt'))
+    (_, old_done), (_, new_done) = pool.loads
+
+    # Eski yükleme havuzun eskime kontrolünü yeni istekten hemen önce geçmiş olabilir
+    old_done('v2', None)
+    assert applier._pending_models is None
+    applier.request(dict(DEFAULTS, model_helmet_path='best_v3.pt'))
+    assert len(pool.loads) == 2  # v3 hâlâ yükleniyor; aynı yükleme tekrar başlatılmaz
+
+    new_done('v3', None)
+    assert applier._pending_models == 'v3'
+
+
+def test_applier_cancels_load_when_file_returns_to_running_models():
+    pool = FakePool()
+    applier = ConfigApplier(pool, log=lambda *args: None)
+    applier.request(dict(DEFAULTS, model_helmet_path='best_v2.pt'))
+    applier.request(dict(DEFAULTS))
+    assert pool.cancelled == 1
+    assert applier._loading_paths is None
@@ -0,0 +1,76 @@
+"""
+Kamera başına takipçi durumu.
+
+model.track(persist=True) takipçiyi modelin predictor'ına bağlar; bu yüzden
+aynı model nesnesini birden fazla kamera paylaştığında ID'ler birbirine
+karışır. Burada takipçiler modelden ayrı tutulur: model sadece tespit
+(predict) yapar, her kamera kendi kişi/baret takipçisini günceller.
+"""
+import inspect
+
+import torch
+from ultralytics.trackers.bot_sort import BOTSORT
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import IterableSimpleNamespace
+from ultralytics.utils.checks import check_yaml
+
+try:
+    from ultralytics.utils import yaml_load
+except ImportError:  # Yeni sürümlerde yaml_load yerine YAML.load
+    from ultralytics.utils import YAML
+    yaml_load = YAML.load
+
+# model.track() ile aynı varsayılan takipçi ayarı
+DEFAULT_TRACKER_CFG = 'botsort.yaml'
+TRACKER_MAP = {'bytetrack': BYTETracker, 'botsort': BOTSORT}
+
+
+def make_tracker(tracker_cfg=DEFAULT_TRACKER_CFG, frame_rate=30):
+    """Ultralytics takipçi yapılandırmasından yeni bir takipçi oluşturur."""
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_cfg)))
+    if cfg.tracker_type not in TRACKER_MAP:
+        raise ValueError(f"Desteklenmeyen takipçi türü: {cfg.tracker_type}")
+    tracker_class = TRACKER_MAP[cfg.tracker_type]
+    # Yeni sürümlerde kurucu sadece args alır
+    if 'frame_rate' in inspect.signature(tracker_class.__init__).parameters:
+        return tracker_class(args=cfg, frame_rate=frame_rate)
+    return tracker_class(args=cfg)
+
+
+def update_tracker(tracker, result):
+    """
+    Bir predict sonucunu takipçiden geçirir ve kutuları takip ID'li kutularla
+    yerinde değiştirir (ultralytics'in track geri çağrısıyla aynı davranış).
+    """
+    det = result.boxes.cpu().numpy()
+    if len(det) == 0:
+        return result
+    tracks = tracker.update(det, result.orig_img)
+    if len(tracks) == 0:
+        # Boş ama "takipli" (7 sütunlu) kutular; extract_boxes boş sonuç döndürür
+        result.update(boxes=torch.zeros((0, 7)))
+        return result
+    result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+    return result
+
+
+class TrackerState:
+    """Bir kameranın kişi ve (track_helmets=True ise) baret takipçileri."""
+
+    def __init__(self, tracker_cfg=DEFAULT_TRACKER_CFG, frame_rate=30, track_helmets=True):
+        self.tracker_cfg = tracker_cfg
+        self.frame_rate = frame_rate
+        self.person = make_tracker(tracker_cfg, frame_rate)
+        self.helmet = make_tracker(tracker_cfg, frame_rate) if track_helmets else None
+
+    def update(self, result_person, result_helmet=None):
+        update_tracker(self.person, result_person)
+        # Baret modeli atlanan karelerde sadece kişi takipçisi ilerler
+        if result_helmet is not None and self.helmet is not None:
+            update_tracker(self.helmet, result_helmet)
+
+    def reset(self):
+        """Takipçileri sıfırlar (model ağırlıkları yeniden yüklenmez)."""
+        self.person.reset()
+        if self.helmet is not None:
+            self.helmet.reset()
@@ -0,0 +1,61 @@
+"""
+Kişi ID'si bazlı baretsizlik zamanlayıcısı.
+
+Bir kişi warn_after saniyeden uzun süre baretsiz görülürse bir kez uyarı
+üretilir; kişi bareti taktığında veya kadrajdan çıktığında kaydı silinir,
+daha önce uyarı verilmişse "düzeltildi" olarak bildirilir.
+
+store (event_store.EventStore) verilirse uyarılan her ihlal başlangıç
+zamanı, son kutusu ve güveniyle, bittiğinde de bitiş zamanıyla depoya
+bildirilir; depo yazmayı arka planda yapar.
+"""
+import time
+
+
+class ViolationTracker:
+    def __init__(self, warn_after, store=None, camera="cam0"):
+        self.warn_after = warn_after
+        self.store = store
+        self.camera = camera
+        self.ihlal_takip_listesi = {}
+
+    def update(self, person_ids_no_helmet, now=None, boxes=None, confs=None):
+        """
+        Bu karedeki baretsiz kişi ID'leriyle zamanlayıcıları günceller.
+        boxes/confs verilirse ID'lerle aynı sıradadır ve depoya yazılan olaylarda
+        kullanılır. (yeni uyarı verilecek ID'ler, ihlali sona eren uyarılmış ID'ler)
+        döndürür.
+        """
+        now = time.time() if now is None else now
+        current = set(person_ids_no_helmet)
+        warned = []
+        for i, person_id in enumerate(person_ids_no_helmet):
+            data = self.ihlal_takip_listesi.get(person_id)
+            if data is None:
+                data = self.ihlal_takip_listesi[person_id] = {'start_time': now, 'warned': False}
+            if boxes is not None:
+                data['bbox'] = boxes[i]
+                data['conf'] = confs[i] if confs is not None else None
+            if now - data['start_time'] > self.warn_after and not data['warned']:
+                data['warned'] = True
+                warned.append(person_id)
+                if self.store is not None:
+                    self.store.violation_started(self.camera, person_id, data['start_time'],
+                                                 data.get('bbox'), data.get('conf'))
+
+        resolved = []
+        for person_id in list(self.ihlal_takip_listesi.keys()):
+            if person_id not in current:
+                data = self.ihlal_takip_listesi.pop(person_id)
+                if data['warned']:
+                    resolved.append(person_id)
+                    if self.store is not None:
+                        self.store.violation_ended(self.camera, person_id, data['start_time'], now)
+        return warned, resolved
+
+    def finish(self, now=None):
+        """Oturum biterken süren uyarılmış ihlalleri kapatır ve ID'lerini döndürür."""
+        return self.update((), now=now)[1]
+
+    def reset(self):
+        self.ihlal_takip_listesi.clear()
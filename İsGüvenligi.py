@@ -1,72 +1,75 @@
 import cv2
-from ultralytics import YOLO
 import argparse 
+import json
+import os
 import time
 
-# --- AYARLAR ---
-MODEL_HELMET_PATH = 'best.pt'     # Sizin özel modeliniz
-MODEL_PERSON_PATH = 'yolov8n.pt'  # Standart YOLOv8 Nano
-
-# Güven eşikleri
-HELMET_GUVEN_ESIGI = 0.80 # Sadece %80 üzeri baretleri dikkate al
-PERSON_GUVEN_ESIGI = 0.20 # İnsan tespiti için minimum eşik (takip için)
-
-# Uyarı Süresi
-UYARI_SURESI = 10  # saniye
-
-# Renkler (BGR formatında)
-RENKLER = {
-    'takan': (0, 255, 0),     # Yeşil (Baret Var)
-    'takmayan': (0, 0, 255),   # Kırmızı (Baret Yok)
-    'unassigned': (128, 128, 128) # Gri (İlişkisiz nesne)
-}
-
-# --- YARDIMCI FONKSİYONLAR ---
-
-def get_bbox_center(bbox):
-    """Bir sınırlayıcı kutunun (x1, y1, x2, y2) merkez noktasını (cx, cy) döndürür."""
-    x1, y1, x2, y2 = bbox
-    cx = int((x1 + x2) / 2)
-    cy = int((y1 + y2) / 2)
-    return cx, cy
-
-def is_on_shoulders(head_or_helmet_bbox, person_bbox, top_percentage=0.3):
-    """
-    Bir kafa/baret kutusunun, bir kişi kutusunun omuzlarında (üst %'lik diliminde)
-    olup olmadığını kontrol eder.
-    """
-    h_cx, h_cy = get_bbox_center(head_or_helmet_bbox)
-    p_x1, p_y1, p_x2, p_y2 = person_bbox
-    
-    # 1. Yatay Kontrol: Kafa/Baret, kişinin yatay sınırları içinde mi?
-    is_horizontally_aligned = (p_x1 < h_cx < p_x2)
-    
-    # 2. Dikey Kontrol: Kafa/Baret, kişinin üst %'lik diliminde mi?
-    #    (p_y1 < h_cy < omuz_seviyesi)
-    person_height = p_y2 - p_y1
-    shoulder_level = p_y1 + (person_height * top_percentage)
-    is_vertically_aligned = (p_y1 < h_cy < shoulder_level)
-    
-    return is_horizontally_aligned and is_vertically_aligned
-
-# --- / YARDIMCI FONKSİYONLAR ---
+from backends import BACKENDS, load_models
+from capture import LatestFrameCapture, StridedReader, is_live_source
+from drawing import RENKLER, draw_detections
+from live_config import CONFIG_FILE, DEFAULT_CAMERA, DEFAULTS, ConfigApplier, ConfigWatcher, load_camera_config
+from motion import MotionGate
+from pipeline import DetectionPipeline, find_helmet_class_id
+from violations import ViolationTracker
 
+# --- AYARLAR ---
+# Model yolları, güven eşikleri ve uyarı süresi --config dosyasından okunur; dosyada
+# verilmeyenler tüm ön uçların ortak sabitleridir (live_config.DEFAULTS). Pencereli
+# modda dosya izlenir; eşik, uyarı süresi ve omuz bandı değişiklikleri hemen uygulanır
 
 # --- Argüman Ayrıştırıcı ---
 parser = argparse.ArgumentParser(description="YOLOv8 ile Çift Modelli İş Güvenliği Takibi")
 parser.add_argument('--source', type=str, default='0',
                     help="Giriş kaynağı: '0' (webcam) veya video yolu ('video.mp4')")
+parser.add_argument('--frame-stride', type=int, default=1,
+                    help="Kaynağın her N karesinin biri işlenir; atlanan kareler çözülmeden geçilir "
+                         "(ör. 25 fps arşivi 5 fps denetlemek için 5)")
+parser.add_argument('--helmet-stride', type=int, default=1,
+                    help="Baret modeli her N karede bir çalışır; ara karelerde baretler kişi takibiyle taşınır")
+parser.add_argument('--helmet-mode', choices=['full', 'crop', 'tiled'], default='full',
+                    help="'full': baret modeli tüm karede, 'crop': sadece kişilerin baş bölgesi kırpıntılarında, "
+                         "'tiled': örtüşen karolarda tam çözünürlükte çalışır (4K kameralar)")
+parser.add_argument('--crop-imgsz', type=int, default=160,
+                    help="'crop' modunda kırpıntıların model girdi boyutu")
+parser.add_argument('--tile-size', type=int, default=640,
+                    help="'tiled' modunda karo kenarı (piksel)")
+parser.add_argument('--tile-overlap', type=float, default=0.2,
+                    help="'tiled' modunda komşu karoların örtüşme oranı")
+parser.add_argument('--tile-persons-only', action='store_true',
+                    help="'tiled' modunda sadece kişilerin baş bölgesine değen karoları çalıştır")
+parser.add_argument('--no-helmet-tracking', action='store_true',
+                    help="Baretler için ayrı takipçi çalıştırma; baretin kimliği sahibi kişinin ID'si olur")
+parser.add_argument('--motion-gate', action='store_true',
+                    help="Sahne değişmeyen karelerde modelleri çalıştırmadan son sonuçları kullan")
+parser.add_argument('--motion-max-skip', type=int, default=15,
+                    help="Hareketsiz sahnede üst üste atlanabilecek en fazla kare sayısı")
+parser.add_argument('--backend', choices=('auto',) + BACKENDS, default='auto',
+                    help="Çıkarım arka ucu; 'auto' ilk çalıştırmada kurulu arka uçları ölçüp en hızlısını kaydeder")
+parser.add_argument('--headless', action='store_true',
+                    help="Çizim ve pencere olmadan, modellerin izin verdiği hızda işle; ihlalleri JSON Lines olarak yaz")
+parser.add_argument('--output', default=None,
+                    help="--headless modunda ihlal kayıtlarının yazılacağı .jsonl dosyası "
+                         "(varsayılan: <kaynak>_ihlaller.jsonl)")
+parser.add_argument('--config', default=CONFIG_FILE,
+                    help="Kamera başına ayar dosyası (YAML); varsa eşikler, uyarı süresi ve model yolları buradan okunur")
+parser.add_argument('--camera', default=DEFAULT_CAMERA, help="Ayar dosyasında kullanılacak kamera adı")
 args = parser.parse_args()
 
+# --- Kamera Yapılandırması ---
+try:
+    config = load_camera_config(args.config, args.camera, DEFAULTS)
+except ValueError as e:
+    print(f"Hata: {e}")
+    exit()
+MODEL_PERSON_PATH, MODEL_HELMET_PATH = config['model_person_path'], config['model_helmet_path']
+PERSON_GUVEN_ESIGI, HELMET_GUVEN_ESIGI = config['person_conf'], config['helmet_conf']
+UYARI_SURESI = config['warn_after']
+
 # --- Modelleri Yükle ---
 try:
-    print(f"Kişi modeli ({MODEL_PERSON_PATH}) yükleniyor...")
-    model_person = YOLO(MODEL_PERSON_PATH)
-    print("Kişi modeli yüklendi.")
-    
-    print(f"Özel baret modeli ({MODEL_HELMET_PATH}) yükleniyor...")
-    model_helmet = YOLO(MODEL_HELMET_PATH)
-    print("Özel baret modeli yüklendi.")
+    print(f"Modeller ({MODEL_PERSON_PATH}, {MODEL_HELMET_PATH}) yükleniyor...")
+    model_person, model_helmet, backend = load_models(MODEL_PERSON_PATH, MODEL_HELMET_PATH, args.backend)
+    print(f"Modeller yüklendi (arka uç: {backend}).")
 except Exception as e:
     print(f"Hata: Modeller yüklenemedi. Dosya yolları doğru mu?")
     print(f"Detay: {e}")
@@ -74,11 +77,7 @@ except Exception as e:
 
 # Özel modeldeki 'helmet' sınıfının ID'sini bul
 helmet_names = model_helmet.names
-HELMET_CLASS_ID = None
-for class_id, name in helmet_names.items():
-    if name == 'helmet':
-        HELMET_CLASS_ID = class_id
-        break
+HELMET_CLASS_ID = find_helmet_class_id(model_helmet)
 
 if HELMET_CLASS_ID is None:
     print(f"Hata: Özel modelinizde ('{MODEL_HELMET_PATH}') 'helmet' adında bir sınıf bulunamadı.")
@@ -87,8 +86,120 @@ if HELMET_CLASS_ID is None:
 else:
     print(f"'helmet' sınıfı ID {HELMET_CLASS_ID} olarak bulundu.")
 
-# COCO modelinde 'person' sınıfı her zaman 0'dır
-PERSON_CLASS_ID = 0
+# Kare bir kez letterbox'lanır, aynı tensör iki modele de verilir
+pipeline = DetectionPipeline(model_person, model_helmet, HELMET_CLASS_ID,
+                             PERSON_GUVEN_ESIGI, HELMET_GUVEN_ESIGI, top_percentage=config['top_percentage'],
+                             helmet_stride=args.helmet_stride, helmet_mode=args.helmet_mode,
+                             crop_imgsz=args.crop_imgsz, tile_size=args.tile_size,
+                             tile_overlap=args.tile_overlap, tile_persons_only=args.tile_persons_only,
+                             track_helmets=not args.no_helmet_tracking,
+                             motion_gate=MotionGate(max_skip=args.motion_max_skip) if args.motion_gate else None)
+
+
+def report_motion_gate():
+    gate = pipeline.motion_gate
+    if gate is not None and gate.frames:
+        print(f"[BİLGİ] Hareketsiz sahne nedeniyle model çalıştırılmayan kare: "
+              f"{gate.skipped}/{gate.frames} (%{gate.skipped_ratio * 100:.1f})")
+
+
+# --- Başsız (headless) Mod ---
+def run_headless(source, output_path):
+    """
+    Kaynağı çizim/gösterim yapmadan işler ve ihlalleri JSON Lines olarak yazar.
+
+    Süreler duvar saatiyle değil karelerin video zamanıyla ölçülür; böylece video
+    gerçek zamandan hızlı ya da --frame-stride ile seyreltilerek işlendiğinde de
+    UYARI_SURESI doğru uygulanır. Kayıtlardaki 'frame' kaynaktaki kare sırasıdır.
+    Her ihlal için iki kayıt yazılır: uyarı anında 'violation' ve ihlal bittiğinde
+    (ya da video sona erdiğinde) toplam süreyle 'resolved'.
+    """
+    # Dosyalarda kare atılmaz; kod çözme ayrı iş parçacığında çıkarımla örtüşür
+    cap = LatestFrameCapture(source, stride=args.frame_stride)
+    if not cap.isOpened():
+        print(f"Hata: Kaynak '{source}' açılamadı.")
+        return
+    live = is_live_source(source)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if not live else 0
+    cap.start()
+
+    violations = ViolationTracker(UYARI_SURESI)
+    last_bbox = {}  # Önceki karede baretsiz görülen kişilerin kutuları
+    events = 0
+
+    def write_event(f, event, frame_index, video_time, person_id, bbox, start_time):
+        nonlocal events
+        f.write(json.dumps({
+            'event': event,
+            'frame': frame_index,
+            'video_time': round(video_time, 3),
+            'person_id': person_id,
+            'bbox': bbox,
+            'duration': round(video_time - start_time, 3),
+        }) + "\n")
+        events += 1
+
+    print(f"[BİLGİ] Başsız mod: '{source}' işleniyor, ihlaller '{output_path}' dosyasına yazılıyor.")
+    wall_start = time.monotonic()
+    last_progress = wall_start
+    frame_index = -1
+    processed = 0
+    video_time = 0.0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                if not cap.ended:
+                    continue  # Canlı kaynağa yeniden bağlanılıyor
+                break
+            processed += 1
+            frame_index = cap.frame_index
+            video_time = cap.timestamp
+
+            det = pipeline.detect(frame)
+            no_helmet = det.person_helmet < 0
+            current_bbox = dict(zip(det.person_ids[no_helmet].tolist(), det.person_boxes[no_helmet].tolist()))
+            # Sona eren ihlallerin başlangıcı, update() kaydı silmeden önce alınır
+            start_times = {person_id: data['start_time']
+                           for person_id, data in violations.ihlal_takip_listesi.items()}
+            warned, resolved = violations.update(current_bbox.keys(), now=video_time)
+            for person_id in warned:
+                write_event(f, 'violation', frame_index, video_time, person_id, current_bbox[person_id],
+                            start_times[person_id])
+            for person_id in resolved:
+                # Kişi bu karede baretli ya da kadraj dışı; baretsiz görüldüğü son kutu yazılır
+                write_event(f, 'resolved', frame_index, video_time, person_id, last_bbox[person_id],
+                            start_times[person_id])
+            last_bbox = current_bbox
+
+            now = time.monotonic()
+            if now - last_progress >= 5.0:
+                last_progress = now
+                speed = video_time / (now - wall_start)
+                progress = f"{frame_index + 1}/{total_frames} kare" if total_frames else f"{frame_index + 1} kare"
+                print(f"[BİLGİ] {progress}, hız: {speed:.1f}x gerçek zaman, {events} kayıt")
+
+        # Video bittiğinde hâlâ süren uyarılmış ihlaller kapatılır
+        for person_id, data in violations.ihlal_takip_listesi.items():
+            if data['warned']:
+                write_event(f, 'resolved', frame_index, video_time, person_id, last_bbox[person_id],
+                            data['start_time'])
+    cap.release()
+
+    elapsed = time.monotonic() - wall_start
+    print(f"[BİLGİ] {processed} kare {elapsed:.1f} sn'de işlendi "
+          f"({video_time / elapsed if elapsed else 0:.1f}x gerçek zaman), {events} kayıt yazıldı.")
+    if cap.reconnects:
+        print(f"[BİLGİ] Yeniden bağlanma: {cap.reconnects}, toplam kesinti: {cap.stall_seconds:.1f} sn")
+    if cap.frames_skipped:
+        print(f"[BİLGİ] Çözülmeden atlanan kare (adım {args.frame_stride}): {cap.frames_skipped}")
+    report_motion_gate()
+
+
+if args.headless:
+    output_path = args.output or f"{os.path.splitext(os.path.basename(args.source))[0]}_ihlaller.jsonl"
+    run_headless(args.source, output_path)
+    exit()
 
 # --- Video Kaynağını Başlat ---
 source = args.source
@@ -105,118 +216,56 @@ if not cap.isOpened():
     print(f"Hata: Kaynak '{source}' açılamadı.")
     exit()
 
+# Atlanan kareler çözülmeden geçilir; zamanlayıcı karelerin video zamanını kullanır
+reader = StridedReader(cap, args.frame_stride, live=is_live_source(source))
+
 # --- NESNE TAKİBİ DEĞİŞKENLERİ ---
-# Key: person_id
-ihlal_takip_listesi = {} 
+# Kişi ID'si bazlı zamanlayıcı; süreler karelerin video zamanıyla ölçülür
+violations = ViolationTracker(UYARI_SURESI)
+
+
+def log(message, level):
+    print(f"[{level}] {message}")
+
+
+# Ayar dosyası değişince eşikler ve uyarı süresi karelerin arasında uygulanır
+config_applier = ConfigApplier(log=log)
+watcher = ConfigWatcher(args.camera, DEFAULTS, config_applier.on_change, path=args.config, log=log).start()
 
 print("-" * 30)
-print(f"[BİLGİ] {UYARI_SURESI} saniye baret takmayan 'KİŞİ ID'leri' için uyarı verilecek.")
+print(f"[BİLGİ] {UYARI_SURESI:g} saniye baret takmayan 'KİŞİ ID'leri' için uyarı verilecek.")
 print("-" * 30)
 
 while True:
-    success, frame = cap.read()
+    if config_applier.pending:
+        config_applier.apply(pipeline, violations)
+    success, frame = reader.read()
     if not success:
         print("Akış sonlandı.")
         break
+    video_time = reader.timestamp
 
     # --- 1. Adım: Her İki Model ile Takip Yap ---
-    
-    # Kişileri Takip Et (Sadece 'person' sınıfı [0])
-    results_person = model_person.track(frame, persist=True, classes=[PERSON_CLASS_ID], 
-                                          conf=PERSON_GUVEN_ESIGI, verbose=False)
-    
-    # Baretleri Takip Et (Sadece 'helmet' sınıfı [HELMET_CLASS_ID])
-    results_helmet = model_helmet.track(frame, persist=True, classes=[HELMET_CLASS_ID], 
-                                          conf=HELMET_GUVEN_ESIGI, verbose=False)
-
-    # --- 2. Adım: Tespitleri Listelere Aktar ---
-    persons = []
-    helmets = []
-    
-    if results_person[0].boxes:
-        for box in results_person[0].boxes:
-            if box.id is not None:
-                persons.append({
-                    'id': int(box.id[0]),
-                    'bbox': list(map(int, box.xyxy[0])),
-                    'conf': float(box.conf[0])
-                })
-
-    if results_helmet[0].boxes:
-        for box in results_helmet[0].boxes:
-            if box.id is not None:
-                helmets.append({
-                    'id': int(box.id[0]), # Bu ID, helmet modeline aittir
-                    'bbox': list(map(int, box.xyxy[0])),
-                    'conf': float(box.conf[0])
-                })
-
-    # --- 3. Adım: Kişi Merkezli Mantığı Çalıştır ---
-    
-    baret_takan_sayisi = 0
-    baret_takmayan_sayisi = 0
-    current_frame_person_ids_no_helmet = set()
-    drawn_helmet_ids = set() # Çizilen (ilişkilendirilen) baret ID'leri
-
-    for person in persons:
-        person_id = person['id']
-        person_bbox = person['bbox']
-        
-        status = "takmayan" # Güvenlik için varsayılan: Takmıyor
-        matched_helmet_bbox = None
-
-        # Bu kişiye uyan bir baret ara
-        for helmet in helmets:
-            if is_on_shoulders(helmet['bbox'], person_bbox):
-                status = "takan"
-                matched_helmet_bbox = helmet['bbox']
-                drawn_helmet_ids.add(helmet['id']) # Bu bareti 'ilişkili' olarak işaretle
-                break # Bu kişi için baret bulundu, aramayı durdur
-        
-        # Durumu işle
-        if status == "takan":
-            baret_takan_sayisi += 1
-            # Kişinin giydiği bareti yeşil çiz
-            label = f"ID {person_id}: BARET TAKIYOR"
-            cv2.rectangle(frame, (matched_helmet_bbox[0], matched_helmet_bbox[1]), (matched_helmet_bbox[2], matched_helmet_bbox[3]), RENKLER['takan'], 2)
-            cv2.putText(frame, label, (matched_helmet_bbox[0], matched_helmet_bbox[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, RENKLER['takan'], 2)
-        
-        else: # status == "takmayan"
-            baret_takmayan_sayisi += 1
-            current_frame_person_ids_no_helmet.add(person_id)
-            
-            # Kişinin kendisini kırmızı çiz
-            label = f"ID {person_id}: BARET YOK"
-            cv2.rectangle(frame, (person_bbox[0], person_bbox[1]), (person_bbox[2], person_bbox[3]), RENKLER['takmayan'], 2)
-            cv2.putText(frame, label, (person_bbox[0], person_bbox[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, RENKLER['takmayan'], 2)
-
-            # --- KİŞİ ID'Sİ BAZLI ZAMANLAYICI ---
-            if person_id not in ihlal_takip_listesi:
-                ihlal_takip_listesi[person_id] = {'start_time': time.time(), 'warned': False}
-            else:
-                data = ihlal_takip_listesi[person_id]
-                gecen_sure = time.time() - data['start_time']
-                
-                if gecen_sure > UYARI_SURESI and not data['warned']:
-                    print(f"\n[UYARI] {time.strftime('%H:%M:%S')} - KISI ID {person_id} {UYARI_SURESI} saniyedir baret takmiyor!\n")
-                    data['warned'] = True
-
-    # --- 4. Adım: İhlal Listesi Temizliği ---
-    for person_id in list(ihlal_takip_listesi.keys()):
-        if person_id not in current_frame_person_ids_no_helmet:
-            if ihlal_takip_listesi[person_id]['warned']:
-                print(f"[BİLGİ] KISI ID {person_id} icin ihlal durumu sona erdi.")
-            del ihlal_takip_listesi[person_id]
-
-    # --- 5. Adım: İlişkisiz Kalan Baretleri Çiz ---
-    for helmet in helmets:
-        if helmet['id'] not in drawn_helmet_ids:
-            bbox = helmet['bbox']
-            label = f"ID {helmet['id']}: Iliskisiz Baret"
-            cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), RENKLER['unassigned'], 2)
-            cv2.putText(frame, label, (bbox[0], bbox[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, RENKLER['unassigned'], 2)
-
-    # --- 6. Adım: Ekran Bilgileri ---
+    # Kare tek sefer ön işlenir; kişi ('person' [0]) ve baret ('helmet' [HELMET_CLASS_ID])
+    # modelleri aynı tensörü kullanır, kutular kare koordinatlarına bir kez çevrilir.
+    # Her kişiye omuz bandındaki en uygun baret bire bir atanmıştır
+    det = pipeline.detect(frame)
+    no_helmet = det.person_helmet < 0
+    baret_takmayan_sayisi = int(no_helmet.sum())
+    baret_takan_sayisi = len(det.person_ids) - baret_takmayan_sayisi
+
+    # --- 2. Adım: Kişi ID'si Bazlı Zamanlayıcı ---
+    warned, resolved = violations.update(det.person_ids[no_helmet].tolist(), now=video_time)
+    for person_id in warned:
+        print(f"\n[UYARI] {time.strftime('%H:%M:%S')} - KISI ID {person_id} {violations.warn_after:g} saniyedir baret takmiyor!\n")
+    for person_id in resolved:
+        print(f"[BİLGİ] KISI ID {person_id} icin ihlal durumu sona erdi.")
+
+    # --- 3. Adım: Kişileri, Baretleri ve İlişkisiz Baretleri Çiz ---
+    draw_detections(frame, det, safe_text="BARET TAKIYOR", unsafe_text="BARET YOK",
+                    thickness=2, font_scale=0.7, label_unassigned=True)
+
+    # --- 4. Adım: Ekran Bilgileri ---
     text_no_helmet = f"Baret Takmayan Sayisi: {baret_takmayan_sayisi}"
     cv2.putText(frame, text_no_helmet, (10, 30), 
                 cv2.FONT_HERSHEY_SIMPLEX, 1, RENKLER['takmayan'], 2, cv2.LINE_AA)
@@ -234,6 +283,8 @@ while True:
     if key == ord('q'):
         break
 
+watcher.stop()
 cap.release()
 cv2.destroyAllWindows()
+report_motion_gate()
 print("Program sonlandırıldı.")
\ No newline at end of file